@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from project import compile_problem, get_problem_data_default, validate_schedule
+
+# التحقق الدفعي من أعداد كبيرة من الجداول المقترحة (ملف JSON Lines) عبر مجموعة عمليات
+
+_worker_model = None
+
+def _init_worker(problem_data):
+    """تُجمّع المسألة مرة واحدة في كل عملية عاملة."""
+    global _worker_model
+    _worker_model = compile_problem(problem_data)
+
+def _validate_chunk(chunk):
+    """تتحقق من مجموعة جداول داخل عملية عاملة."""
+    return [(index, schedule_id, validate_schedule(schedule, _worker_model)) for index, schedule_id, schedule in chunk]
+
+def load_problem_data(path):
+    """تقرأ بيانات المشكلة من ملف JSON (بنفس بنية get_problem_data_default)."""
+    with open(path, encoding="utf-8") as problem_file:
+        return json.load(problem_file)
+
+def read_schedules_jsonl(lines):
+    """
+    تقرأ الجداول سطراً بسطر دون تحميل الملف كاملاً. كل سطر إما جدول مباشرة
+    أو كائن {"id": ..., "schedule": {...}}. تُرجع (المعرّف، الجدول).
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if "schedule" in record:
+            yield record.get("id", line_number), record["schedule"]
+        else:
+            yield line_number, record
+
+def validate_schedules_batch(problem_data, schedules, workers=None, chunk_size=256):
+    """
+    تتحقق من سلسلة جداول (معرّف، جدول) مقابل مسألة واحدة وتُرجع النتائج بترتيب الإدخال
+    كقواميس {"index", "id", "valid", "violations"}. تعمل بشكل تدفقي: لا يُقرأ من المدخلات
+    إلا ما يكفي لإبقاء العمليات العاملة مشغولة. workers=0 يعني التحقق داخل العملية الحالية.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    indexed = ((index, schedule_id, schedule) for index, (schedule_id, schedule) in enumerate(schedules))
+
+    def chunks():
+        while True:
+            chunk = list(islice(indexed, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def to_results(validated_chunk):
+        for index, schedule_id, violations in validated_chunk:
+            yield {"index": index, "id": schedule_id, "valid": not violations, "violations": violations}
+
+    if workers == 0:
+        _init_worker(problem_data)
+        for chunk in chunks():
+            yield from to_results(_validate_chunk(chunk))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(problem_data,)) as executor:
+        pending = deque()
+        for chunk in chunks():
+            pending.append(executor.submit(_validate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from to_results(pending.popleft().result())
+        while pending:
+            yield from to_results(pending.popleft().result())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="التحقق الدفعي من جداول مقترحة في ملف JSON Lines.")
+    parser.add_argument("schedules", help="ملف JSON Lines (أو - للقراءة من الإدخال القياسي)")
+    parser.add_argument("--problem", help="ملف JSON لبيانات المشكلة (الافتراضي: get_problem_data_default)")
+    parser.add_argument("--output", help="ملف JSON Lines لسجلات النتائج (الافتراضي: الإخراج القياسي)")
+    parser.add_argument("--workers", type=int, default=None, help="عدد العمليات العاملة (0 = بدون مجموعة عمليات)")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--invalid-only", action="store_true", help="كتابة نتائج الجداول غير الصالحة فقط")
+    args = parser.parse_args()
+
+    problem_data = load_problem_data(args.problem) if args.problem else get_problem_data_default()
+    input_file = sys.stdin if args.schedules == "-" else open(args.schedules, encoding="utf-8")
+    output_file = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    start = time.perf_counter()
+    total = valid = 0
+    try:
+        for result in validate_schedules_batch(problem_data, read_schedules_jsonl(input_file), args.workers, args.chunk_size):
+            total += 1
+            valid += result["valid"]
+            if not (args.invalid_only and result["valid"]):
+                output_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"تم التحقق من {total} جدول ({valid} صالح، {total - valid} غير صالح) "
+          f"في {elapsed:.2f} ثانية — {rate:.0f} جدول/ثانية", file=sys.stderr)
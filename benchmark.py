@@ -0,0 +1,1101 @@
+import argparse
+import asyncio
+import copy
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import project
+from project import (
+    SOLVER_MODES,
+    apply_problem_delta,
+    backtracking_search_forward_checking,
+    build_feasibility_tensor,
+    build_possible_times_and_rooms,
+    check_no_overlap_constraints,
+    compact_schedule,
+    compile_problem,
+    copy_compact_schedule,
+    count_solutions,
+    diagnose_infeasibility,
+    expand_schedule,
+    feasibility_domains,
+    format_search_stats,
+    iter_solutions,
+    local_search_schedule,
+    new_occupancy,
+    occupancy_add,
+    occupancy_has_conflict,
+    optimize_schedule,
+    problem_fingerprint,
+    repair_schedule,
+    solve_iteratively,
+    solve_with_restarts,
+    start_instrumentation,
+    stop_instrumentation,
+    validate_schedule,
+)
+from problem_generator import (
+    GENERATOR_PRESETS,
+    generate_chain_problem,
+    generate_identical_rooms_problem,
+    generate_problem_data,
+    generate_soft_constraints,
+    generate_student_enrollments,
+)
+from service import open_client, request_json
+from solution_cache import close_solution_cache, open_solution_cache, solve_cached
+
+
+def run_solver_once(solver_mode, problem_data):
+    """تشغّل نمط حل واحد على المسألة وتُرجع (الحل، الزمن بالثواني)."""
+    courses_names = [c["name"] for c in problem_data["courses"]]
+    initial_schedule = {
+        course_name: {"start_time": None, "end_time": None, "room": None}
+        for course_name in courses_names
+    }
+    possible_times_and_rooms = build_possible_times_and_rooms(problem_data)
+
+    start = time.perf_counter()
+    solution = SOLVER_MODES[solver_mode](initial_schedule, problem_data, courses_names, possible_times_and_rooms)
+    return solution, time.perf_counter() - start
+
+
+@contextmanager
+def time_limit(seconds):
+    """ترفع TimeoutError إذا تجاوز الجزء المحاط seconds ثانية (عبر SIGALRM، حيث يتوفر)."""
+    if not seconds or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def on_timeout(signum, frame):
+        raise TimeoutError
+
+    previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def measure_solver_run(solver_mode, problem_data, timeout=None, track_memory=True):
+    """
+    تشغّل نمط حل واحد وتُرجع قاموس قياس: status (solved / no_solution / timeout)، time_ms
+    (بدون أي قياس مفعّل)، ثم من تشغيل ثانٍ بأدوات قياس البحث (بالعدّ فقط): nodes و backtracks
+    و max_depth و checks (استدعاءات check_all_constraints)، و peak_kb (ذروة الذاكرة عبر tracemalloc).
+    """
+    model = compile_problem(problem_data)
+    courses_names = list(model["course_names"])
+    possible_times_and_rooms = build_possible_times_and_rooms(model)
+
+    def solve():
+        initial_schedule = {name: {"start_time": None, "end_time": None, "room": None} for name in courses_names}
+        return SOLVER_MODES[solver_mode](initial_schedule, model, courses_names, possible_times_and_rooms)
+
+    record = {"status": "timeout", "time_ms": None, "nodes": None, "backtracks": None, "max_depth": None,
+              "checks": None, "peak_kb": None}
+    start = time.perf_counter()
+    try:
+        with time_limit(timeout):
+            solution = solve()
+    except TimeoutError:
+        return record
+    record["time_ms"] = (time.perf_counter() - start) * 1000
+    record["status"] = "solved" if solution else "no_solution"
+
+    if track_memory:
+        tracemalloc.start()
+    start_instrumentation(time_checkers=False)
+    try:
+        with time_limit(timeout and timeout * 5):
+            solve()
+    except TimeoutError:
+        return record
+    finally:
+        search_stats = stop_instrumentation()
+        if track_memory:
+            peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+    for key in ("nodes", "backtracks", "max_depth", "checks"):
+        record[key] = search_stats[key]
+    if track_memory:
+        record["peak_kb"] = peak_kb
+    return record
+
+
+def profile_solver_run(solver_mode, problem_data, trace_path=None):
+    """تشغّل نمط حل واحد مع قياس زمن كل دالة تحقق وتطبع إحصاءات البحث (وتكتب ملف تتبع إن طُلب)."""
+    model = compile_problem(problem_data)
+    courses_names = list(model["course_names"])
+    possible_times_and_rooms = build_possible_times_and_rooms(model)
+    initial_schedule = {name: {"start_time": None, "end_time": None, "room": None} for name in courses_names}
+
+    start_instrumentation(trace_path=trace_path)
+    try:
+        solution = SOLVER_MODES[solver_mode](initial_schedule, model, courses_names, possible_times_and_rooms)
+    finally:
+        search_stats = stop_instrumentation()
+    print(f"  {solver_mode} | {len(courses_names)} دورة | {'حل' if solution else 'لا حل'} | "
+          f"{search_stats['elapsed_ms']:.1f} مللي ثانية")
+    for line in format_search_stats(search_stats):
+        print(line)
+    return search_stats
+
+
+def benchmark_solver_suite(sizes, seeds=range(3), solver_mode="deepcopy", preset="default", timeout=30.0,
+                           track_memory=True):
+    """
+    تشغّل نمط حل على مسائل مولّدة بأحجام وبذور مختلفة وتطبع لكل حجم: نسبة النجاح،
+    وسيط الزمن، متوسط العقد وفحوص القيود، وذروة الذاكرة. تُرجع قائمة سجلات قابلة للحفظ كـ JSON.
+    """
+    summaries = []
+    for num_courses in sizes:
+        runs = []
+        for seed in seeds:
+            problem_data = generate_problem_data(num_courses, seed=seed, **GENERATOR_PRESETS[preset])
+            runs.append(measure_solver_run(solver_mode, problem_data, timeout, track_memory))
+
+        finished = [run for run in runs if run["status"] != "timeout"]
+        summary = {
+            "mode": solver_mode,
+            "preset": preset,
+            "courses": num_courses,
+            "runs": len(runs),
+            "solved": sum(run["status"] == "solved" for run in runs),
+            "timeouts": len(runs) - len(finished),
+            "median_time_ms": statistics.median(run["time_ms"] for run in finished) if finished else None,
+            "mean_nodes": statistics.mean(run["nodes"] for run in finished) if finished else None,
+            "mean_backtracks": statistics.mean(run["backtracks"] for run in finished) if finished else None,
+            "max_depth": max((run["max_depth"] for run in finished), default=None),
+            "mean_checks": statistics.mean(run["checks"] for run in finished) if finished else None,
+            "max_peak_kb": max((run["peak_kb"] for run in finished if run["peak_kb"] is not None), default=None),
+        }
+        summaries.append(summary)
+        print(format_suite_summary(summary))
+    return summaries
+
+
+def format_suite_summary(summary):
+    """سطر نصي لملخص حجم واحد من benchmark_solver_suite."""
+    def number(value, spec):
+        return "-" if value is None else format(value, spec)
+
+    return (f"  {summary['mode']:<16} | {summary['courses']:>5} دورة | "
+            f"نجاح {summary['solved']}/{summary['runs']} (مهلة: {summary['timeouts']}) | "
+            f"{number(summary['median_time_ms'], '>9.1f')} مللي ثانية | "
+            f"عقد: {number(summary['mean_nodes'], '>8.0f')} | تراجعات: {number(summary.get('mean_backtracks'), '>8.0f')} | "
+            f"فحوص: {number(summary['mean_checks'], '>10.0f')} | "
+            f"ذاكرة: {number(summary['max_peak_kb'], '>8.0f')} ك.ب")
+
+
+def compare_suite_results(summaries, baseline_summaries, tolerance=0.2):
+    """
+    تقارن ملخصات التشغيل الحالي بملخصات محفوظة من تشغيل سابق وتطبع الأحجام التي تباطأت
+    بأكثر من tolerance أو تغيّر فيها عدد العقد أو نسبة النجاح. تُرجع عدد التراجعات.
+    """
+    baseline = {(s["mode"], s["preset"], s["courses"]): s for s in baseline_summaries}
+    regressions = 0
+    for summary in summaries:
+        previous = baseline.get((summary["mode"], summary["preset"], summary["courses"]))
+        if previous is None:
+            continue
+        problems = []
+        if summary["solved"] < previous["solved"]:
+            problems.append(f"نجاح {previous['solved']} → {summary['solved']}")
+        if summary["mean_nodes"] != previous["mean_nodes"]:
+            problems.append(f"عقد {previous['mean_nodes']} → {summary['mean_nodes']}")
+        if summary["median_time_ms"] and previous["median_time_ms"] and \
+           summary["median_time_ms"] > previous["median_time_ms"] * (1 + tolerance):
+            problems.append(f"زمن ×{summary['median_time_ms'] / previous['median_time_ms']:.2f}")
+        if problems:
+            regressions += 1
+            print(f"  ⚠️ {summary['mode']} {summary['courses']} دورة: " + "، ".join(problems))
+    if not regressions:
+        print("  ✅ لا تراجع مقارنة بالتشغيل السابق.")
+    return regressions
+
+
+def compare_solver_modes(num_courses, modes, seed=0):
+    """تقارن أزمنة أنماط الحل على نفس المسألة وتتحقق من تطابق الحلول."""
+    problem_data = generate_problem_data(num_courses, seed=seed)
+    results = {}
+    for mode in modes:
+        solution, elapsed = run_solver_once(mode, problem_data)
+        results[mode] = (solution, elapsed)
+        status = "حل" if solution else "لا حل"
+        if mode != modes[0] and solution != results[modes[0]][0]:
+            status += f" (يختلف عن {modes[0]})"
+        print(f"  {mode:<16} | {num_courses:>5} دورة | {elapsed * 1000:>10.1f} مللي ثانية | {status}")
+    return results
+
+
+def split_room_availability(problem_data, break_start=12.0, break_end=13.0):
+    """تقسم توفر نصف القاعات إلى فترتين (قبل الاستراحة وبعدها) لاختبار تعدد فترات التوفر."""
+    problem_data = dict(problem_data)
+    rooms = []
+    for room_index, room in enumerate(problem_data["rooms"]):
+        room = dict(room)
+        if room_index % 2:
+            window_start, window_end = room["available_times"][0]
+            room["available_times"] = [(window_start, break_start), (break_end, window_end)]
+        rooms.append(room)
+    problem_data["rooms"] = rooms
+    return problem_data
+
+
+def benchmark_time_granularity(num_courses, increments=(1.0, 0.5, 0.25), seed=0):
+    """
+    تقارن زمن الحل (الفحص الأمامي شاملاً بناء المجالات) وعدد القيم بين شبكات أوقات بدقة مختلفة
+    (ساعة، نصف ساعة، ربع ساعة) على نفس المسألة مع قاعات متعددة فترات التوفر، وتتحقق من صلاحية كل حل.
+    """
+    model = compile_problem(split_room_availability(generate_problem_data(num_courses, seed=seed)))
+    courses_names = list(model["course_names"])
+    baseline = None
+    timings = {}
+    for time_increment in increments:
+        start = time.perf_counter()
+        possible_times_and_rooms = build_possible_times_and_rooms(model, time_increment)
+        solution = backtracking_search_forward_checking(
+            {name: {"start_time": None, "end_time": None, "room": None} for name in courses_names},
+            model, courses_names, possible_times_and_rooms, strict_precedence=True)
+        elapsed = time.perf_counter() - start
+        timings[time_increment] = elapsed
+        if baseline is None:
+            baseline = elapsed
+        if solution is None:
+            status = "لا حل"
+        else:
+            status = "حل صالح" if not validate_schedule(solution, model) else "⚠️ حل غير صالح"
+        print(f"  {num_courses:>5} دورة | شبكة {time_increment * 60:>4.0f} دقيقة | {len(possible_times_and_rooms):>6} قيمة | "
+              f"{elapsed * 1000:>9.1f} مللي ثانية (×{elapsed / baseline:.2f}) | {status}")
+    return timings
+
+
+def benchmark_local_search(num_courses, seed=0, preset="default", time_limit=10.0):
+    """تشغّل البحث المحلي (min-conflicts + tabu) على مسألة مولّدة وتطبع المخالفات المتبقية والزمن."""
+    model = compile_problem(generate_problem_data(num_courses, seed=seed, **GENERATOR_PRESETS[preset]))
+    result = local_search_schedule(model, time_limit=time_limit, seed=seed)
+    kinds = {}
+    for violation in result["violations"]:
+        kinds[violation["constraint"]] = kinds.get(violation["constraint"], 0) + 1
+    details = "، ".join(f"{kind}: {count}" for kind, count in sorted(kinds.items())) or "لا مخالفات"
+    print(f"  {num_courses:>6} دورة ({preset}) | {result['elapsed_ms']:>9.1f} مللي ثانية | "
+          f"{result['iterations']:>7} خطوة | {result['status']:<16} | {details}")
+    return result
+
+
+def benchmark_branch_and_bound(num_courses, seed=0, preset="default", time_limit=30.0, group_density=0.1,
+                               balance_weight=0.05):
+    """
+    تقارن التحسين بالتفرع والتحديد مع قطع الفروع بالحد الأدنى وبدونه (نفس ترتيب القيم ونفس الميزانية):
+    كلفة أول حل وأفضل حل، زمن الوصول إليه، الفجوة عن الحد الأدنى، العقد، وهل أُثبتت الأمثلية.
+    فراغات مجموعات الطلاب لا تدخل الحد الأدنى إلا عند اكتمال المجموعة، لذا تُثبت الأمثلية أسرع مع group_density=0.
+    """
+    problem_data = generate_soft_constraints(generate_problem_data(num_courses, seed=seed, **GENERATOR_PRESETS[preset]),
+                                             seed=seed, group_density=group_density, balance_weight=balance_weight)
+    model = compile_problem(problem_data)
+    possible_times_and_rooms = build_possible_times_and_rooms(model)
+    results = {}
+    for use_bound in (True, False):
+        result = optimize_schedule(model, possible_times_and_rooms, time_limit=time_limit, use_bound=use_bound)
+        results[use_bound] = result
+        label = "مع الحد" if use_bound else "بدون حد"
+        if result["schedule"] is None:
+            print(f"  {num_courses:>5} دورة | {label:<8} | {result['status']:<10} | {result['elapsed_ms']:>9.1f} مللي ثانية")
+            continue
+        valid = "صالح" if not validate_schedule(result["schedule"], model) else "⚠️ غير صالح"
+        best_cost = result["cost"]["total"]
+        gap = (best_cost - result["lower_bound"]) / best_cost * 100 if best_cost else 0.0
+        print(f"  {num_courses:>5} دورة | {label:<8} | {result['status']:<10} | أول كلفة: {result['first_cost']:>8.2f} | "
+              f"أفضل كلفة: {best_cost:>8.2f} ({result['solutions']:>3} تحسين، بعد {result['time_to_best_ms']:>8.1f} مللي ثانية) | "
+              f"الحد الأدنى: {result['lower_bound']:>8.2f} (فجوة {gap:>5.1f}%) | {result['nodes']:>8} عقدة | "
+              f"{result['prunes']:>8} قطع | {result['elapsed_ms']:>9.1f} مللي ثانية | {valid}")
+    return results
+
+
+def benchmark_iterative_budget(num_courses, seed=0, preset="default", time_limit=5.0, progress_interval=1.0):
+    """
+    تشغّل البحث التكراري بمهلة time_limit ثانية وتطبع أحداث التقدّم، ثم الحالة وعدد العقد والعمق الذي وصل إليه
+    الجدول الجزئي عند التوقف (لا حد لعدد الدورات بخلاف الأنماط التكرارية).
+    """
+    model = compile_problem(generate_problem_data(num_courses, seed=seed, **GENERATOR_PRESETS[preset]))
+
+    def report_progress(event):
+        print(f"      ... {event['elapsed_ms']:>9.1f} مللي ثانية | عمق {event['depth']:>6} (الأقصى {event['max_depth']}) | "
+              f"{event['nodes']:>8} عقدة ({event['nodes_per_second']:.0f} عقدة/ثانية)")
+
+    result = solve_iteratively(model, time_limit=time_limit, on_progress=report_progress,
+                               progress_interval=progress_interval, strict_precedence=True)
+    print(f"  {num_courses:>6} دورة ({preset}) | {result['status']:<10} | {result['nodes']:>8} عقدة | "
+          f"مجدول: {num_courses - len(result['unscheduled']):>6}/{num_courses} | {result['elapsed_ms']:>9.1f} مللي ثانية")
+    return result
+
+def _traced_size(build):
+    """حجم الذاكرة (بايت) الذي تحجزه build() ويبقى محجوزاً ما دامت نتيجتها موجودة (عبر tracemalloc)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()  # يُبقي النتيجة حيّة حتى تُقرأ الذاكرة
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return size
+
+def benchmark_schedule_memory(num_courses, seed=0, repeats=200):
+    """
+    تقارن صيغة القاموس بالجدول المضغوط على حل كامل لمسألة مولّدة: حجم الحل المحفوظ الواحد، زمن نسخه
+    (كلفة كل عقدة في البحث بالنسخ العميق)، وذروة الذاكرة لبحث كامل بالفحص الأمامي التكراري على قاموس (مع سجل
+    تراجع، وقد يصل إلى حد التكرار) مقابل البحث التكراري على الجدول المضغوط.
+    """
+    model = compile_problem(generate_problem_data(num_courses, seed=seed))
+    course_names = list(dict.fromkeys(model["course_names"]))
+    possible_times_and_rooms = build_possible_times_and_rooms(model)
+    solution = solve_iteratively(model, possible_times_and_rooms)["schedule"]
+    if solution is None:
+        print(f"  {num_courses:>6} دورة | لا حل")
+        return None
+    compact = compact_schedule(solution, model)
+    assert expand_schedule(compact, model, course_names) == solution
+
+    dict_bytes = _traced_size(lambda: copy.deepcopy(solution))
+    compact_bytes = _traced_size(lambda: copy_compact_schedule(compact))
+    start = time.perf_counter()
+    for _ in range(repeats):
+        copy.deepcopy(solution)
+    dict_copy_us = (time.perf_counter() - start) / repeats * 1e6
+    start = time.perf_counter()
+    for _ in range(repeats):
+        copy_compact_schedule(compact)
+    compact_copy_us = (time.perf_counter() - start) / repeats * 1e6
+
+    peaks = {}
+    for label, solve in (
+        ("قاموس", lambda: backtracking_search_forward_checking(
+            {course_name: {"start_time": None, "end_time": None, "room": None} for course_name in course_names},
+            model, course_names, possible_times_and_rooms)),
+        ("مضغوط", lambda: solve_iteratively(model, possible_times_and_rooms)),
+    ):
+        tracemalloc.start()
+        try:
+            solve()
+            peaks[label] = f"{tracemalloc.get_traced_memory()[1] / 1024 / 1024:.2f} م.ب"
+        except RecursionError:
+            peaks[label] = "RecursionError"
+        finally:
+            tracemalloc.stop()
+
+    print(f"  {num_courses:>6} دورة | حل محفوظ: قاموس {dict_bytes / 1024:>8.1f} ك.ب، مضغوط {compact_bytes / 1024:>7.1f} ك.ب "
+          f"({dict_bytes / max(compact_bytes, 1):.0f}x) | نسخة لكل عقدة: {dict_copy_us:>8.1f} مقابل {compact_copy_us:>6.1f} ميكروثانية | "
+          f"ذروة البحث: قاموس {peaks['قاموس']}، مضغوط {peaks['مضغوط']}")
+    return {"dict_bytes": dict_bytes, "compact_bytes": compact_bytes, "dict_copy_us": dict_copy_us,
+            "compact_copy_us": compact_copy_us, "peaks": peaks}
+
+def benchmark_symmetry_breaking(num_courses, num_rooms, seed=0, sections=3, loads=(0.9, 1.2), time_limit=30.0):
+    """
+    تقارن الفحص الأمامي مع كسر التماثل وبدونه على مسائل قاعات متطابقة وشُعب متطابقة: عدد العقد،
+    الفروع المتخطاة، والزمن (حتى time_limit ثانية لكل تشغيل)، لمسائل قابلة للحل (حمل حتى 1) وبلا حل (حمل أكبر من 1).
+    """
+    results = []
+    for load in loads:
+        model = compile_problem(generate_identical_rooms_problem(num_courses, num_rooms, seed, sections, load))
+        working_start, working_end = model["working_hours"]
+        actual_load = num_courses / (num_rooms * (working_end - working_start))
+        course_names = list(dict.fromkeys(model["course_names"]))
+        possible_times_and_rooms = build_possible_times_and_rooms(model)
+        for symmetry_breaking in (False, True):
+            schedule = {course_name: {"start_time": None, "end_time": None, "room": None} for course_name in course_names}
+            start = time.perf_counter()
+            deadline = start + time_limit
+            solution, stats = solve_with_restarts(schedule, model, course_names, possible_times_and_rooms,
+                                                  should_stop=lambda: time.perf_counter() >= deadline,
+                                                  strict_precedence=True, symmetry_breaking=symmetry_breaking)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            label = "مع كسر التماثل" if symmetry_breaking else "بدون كسر"
+            print(f"  {num_courses:>5} دورة، {num_rooms:>3} قاعة (حمل {actual_load:.2f}) | {label:<14} | {stats['status']:<10} | "
+                  f"{stats['nodes']:>9} عقدة | {stats['symmetry_prunes']:>9} فرع متماثل متخطى | {elapsed_ms:>9.1f} مللي ثانية")
+            results.append({"load": actual_load, "symmetry_breaking": symmetry_breaking, "status": stats["status"],
+                            "nodes": stats["nodes"], "symmetry_prunes": stats["symmetry_prunes"], "elapsed_ms": elapsed_ms,
+                            "valid": solution is None or not validate_schedule(solution, model)})
+    return results
+
+
+def benchmark_temporal_propagation(num_courses, chain_length, seed=0, slacks=(1.0, 0.0, -1.0), time_limit=10.0):
+    """
+    تقارن البحث التكراري مع نشر الحدود الزمنية عبر سلاسل الأسبقية وبدونه على مسائل generate_chain_problem:
+    الحالة، عدد العقد، عدد القيم التي حذفها النشر، والزمن (حتى time_limit ثانية لكل تشغيل).
+    السلاسل المستحيلة (slack سالب) يكتشفها النشر قبل أول عقدة.
+    """
+    results = []
+    for slack in slacks:
+        model = compile_problem(generate_chain_problem(num_courses, chain_length, seed, slack))
+        possible_times_and_rooms = build_possible_times_and_rooms(model)
+        for temporal_propagation in (False, True):
+            result = solve_iteratively(model, possible_times_and_rooms, time_limit=time_limit,
+                                       temporal_propagation=temporal_propagation)
+            label = "مع نشر الحدود" if temporal_propagation else "بدون نشر"
+            print(f"  {num_courses:>5} دورة، سلاسل بطول {chain_length:>3} (فائض {slack:+.1f} ساعة) | {label:<13} | "
+                  f"{result['status']:<10} | {result['nodes']:>9} عقدة | {result['temporal_prunes']:>7} قيمة محذوفة بالنشر | "
+                  f"{result['elapsed_ms']:>9.1f} مللي ثانية")
+            results.append({"slack": slack, "temporal_propagation": temporal_propagation, "status": result["status"],
+                            "nodes": result["nodes"], "elapsed_ms": result["elapsed_ms"],
+                            "valid": result["schedule"] is None or not validate_schedule(result["schedule"], model)})
+    return results
+
+def benchmark_solution_cache(num_courses, seed=0, repeats=20, cache_path=None):
+    """
+    تقارن الحل الأول (تخزين في الذاكرة الدائمة) بالطلبات المتطابقة اللاحقة (قراءة مع إعادة التحقق)،
+    وتتحقق من أن إعادة ترتيب الدورات والقاعات والقيود لا تغيّر البصمة.
+    """
+    problem_data = generate_problem_data(num_courses, seed=seed)
+    shuffled = json.loads(json.dumps(problem_data))
+    rng = random.Random(seed)
+    for items in [shuffled["courses"], shuffled["rooms"]] + [value for value in shuffled["constraints"].values()
+                                                              if isinstance(value, list)]:
+        rng.shuffle(items)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = open_solution_cache(cache_path or os.path.join(temp_dir, "solutions.sqlite"))
+        try:
+            cold = solve_cached(problem_data, cache)
+            warm = sorted(solve_cached(problem_data, cache)["elapsed_ms"] for _ in range(repeats))
+            shuffled_result = solve_cached(shuffled, cache)
+        finally:
+            close_solution_cache(cache)
+
+    start = time.perf_counter()
+    problem_fingerprint(problem_data)
+    fingerprint_ms = (time.perf_counter() - start) * 1000
+    same = "نفس البصمة" if shuffled_result["fingerprint"] == cold["fingerprint"] and shuffled_result["cache_hit"] \
+        else "⚠️ بصمة مختلفة"
+    print(f"  {num_courses:>5} دورة | {cold['status']:<10} | أول طلب: {cold['elapsed_ms']:>9.2f} مللي ثانية | "
+          f"طلب متطابق: {warm[len(warm) // 2]:>7.3f} مللي ثانية (الوسيط، منها البصمة {fingerprint_ms:.3f}) | "
+          f"ترتيب مختلف: {same}")
+    return cold, warm
+
+
+def greedy_schedule(model, possible_times_and_rooms):
+    """
+    تبني جدولاً جزئياً بلا تداخل: تضع كل دورة في أول (وقت، قاعة) لا يتعارض فيه الإشغال.
+    تُرجع (الجدول، جداول الإشغال).
+    """
+    schedule = {}
+    occupancy = new_occupancy()
+    for course_id, course_name in enumerate(model["course_names"]):
+        duration = model["course_durations"][course_id]
+        for start_time, room in possible_times_and_rooms:
+            end_time = start_time + duration
+            if not occupancy_has_conflict(occupancy, model, course_id, start_time, end_time, room):
+                occupancy_add(occupancy, model, course_id, start_time, end_time, room)
+                schedule[course_name] = {"start_time": start_time, "end_time": end_time, "room": room}
+                break
+    return schedule, occupancy
+
+
+def benchmark_overlap_checks(num_courses, seed=0, probes=2000):
+    """
+    تقارن زمن فحص التداخل بالمرور الخطي على الجدول مقابل جداول الإشغال
+    على جدول مكتمل تقريباً، وتتحقق من تطابق النتائج.
+    """
+    model = compile_problem(generate_problem_data(num_courses, seed=seed))
+    possible_times_and_rooms = build_possible_times_and_rooms(model)
+    schedule, occupancy = greedy_schedule(model, possible_times_and_rooms)
+
+    rng = random.Random(seed)
+    probe_schedule = {name: dict(details) for name, details in schedule.items()}
+    probes_list = []
+    for _ in range(probes):
+        course_id = rng.randrange(num_courses)
+        start_time, room = rng.choice(possible_times_and_rooms)
+        probes_list.append((course_id, start_time, room))
+
+    def run_probes(use_occupancy):
+        results = []
+        for course_id, start_time, room in probes_list:
+            course_name = model["course_names"][course_id]
+            saved_entry = probe_schedule.get(course_name)
+            end_time = start_time + model["course_durations"][course_id]
+            probe_schedule[course_name] = {"start_time": start_time, "end_time": end_time, "room": room}
+            if use_occupancy:
+                results.append(check_no_overlap_constraints(probe_schedule, course_name, model, occupancy))
+            else:
+                results.append(check_no_overlap_constraints(probe_schedule, course_name, model))
+            if saved_entry is None:
+                del probe_schedule[course_name]
+            else:
+                probe_schedule[course_name] = saved_entry
+        return results
+
+    start = time.perf_counter()
+    linear_results = run_probes(False)
+    linear_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    occupancy_results = run_probes(True)
+    occupancy_elapsed = time.perf_counter() - start
+
+    print(f"  {num_courses:>5} دورة ({len(schedule)} مجدولة) | "
+          f"خطي: {linear_elapsed / probes * 1e6:>8.1f} ميكروثانية/فحص | "
+          f"إشغال: {occupancy_elapsed / probes * 1e6:>6.1f} ميكروثانية/فحص | "
+          f"تسريع ×{linear_elapsed / occupancy_elapsed:.0f}")
+    if linear_results != occupancy_results:
+        print("  ⚠️ نتائج الفحص غير متطابقة!")
+    return linear_elapsed, occupancy_elapsed
+
+
+def benchmark_student_conflicts(num_courses, num_students, seed=0, probes=2000, time_limit=10.0):
+    """
+    تقيس كلفة قيود تعارض الطلاب: بناء الـ bitsets ورسم التعارض عند التجميع، فحص التعارض لتعيين مقترح
+    (تقاطع bitsets مقابل مقارنة قوائم التسجيل لكل دورة مجدولة متداخلة زمنياً)، حساب درجة التعارض لكل
+    الدورات غير المجدولة في تمريرة MCV واحدة (عدّ بتات مقابل تقاطع القوائم)، التحقق من جدول كامل،
+    ثم الحل التكراري بمهلة time_limit. نتائج الطريقتين في كل فحص يجب أن تتطابق.
+    """
+    base_problem = generate_problem_data(num_courses, seed=seed)
+    problem_data = generate_student_enrollments(copy.deepcopy(base_problem), num_students, seed=seed)
+
+    start = time.perf_counter()
+    base_model = compile_problem(base_problem)
+    base_compile_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    model = compile_problem(problem_data)
+    compile_ms = (time.perf_counter() - start) * 1000
+    num_edges = sum(len(neighbours) for neighbours in model["course_conflicts"]) // 2
+
+    course_ids = model["course_ids"]
+    enrolled_students = [[] for _ in model["course_names"]]
+    for enrollment in problem_data["constraints"]["student_enrollments"]:
+        for course_name in enrollment["courses"]:
+            enrolled_students[course_ids[course_name]].append(enrollment["student"])
+
+    possible_times_and_rooms = build_possible_times_and_rooms(model)
+    schedule, occupancy = greedy_schedule(model, possible_times_and_rooms)
+    base_occupancy = new_occupancy()
+    for course_name, details in schedule.items():
+        occupancy_add(base_occupancy, base_model, course_ids[course_name], details["start_time"], details["end_time"],
+                      details["room"])
+    scheduled = [(course_ids[course_name], details["start_time"], details["end_time"])
+                 for course_name, details in schedule.items()]
+
+    rng = random.Random(seed)
+    probes_list = []
+    for _ in range(probes):
+        course_id = rng.randrange(num_courses)
+        start_time, room = rng.choice(possible_times_and_rooms)
+        probes_list.append((course_id, start_time, start_time + model["course_durations"][course_id], room))
+
+    def pairwise_conflict(course_id, start_time, end_time, room):
+        if occupancy_has_conflict(base_occupancy, base_model, course_id, start_time, end_time, room):
+            return True
+        students = enrolled_students[course_id]
+        for other_id, other_start, other_end in scheduled:
+            if other_id != course_id and start_time < other_end and other_start < end_time and \
+               any(student in students for student in enrolled_students[other_id]):
+                return True
+        return False
+
+    start = time.perf_counter()
+    pairwise_results = [pairwise_conflict(*probe) for probe in probes_list]
+    pairwise_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    bitset_results = [occupancy_has_conflict(occupancy, model, *probe) for probe in probes_list]
+    bitset_elapsed = time.perf_counter() - start
+
+    unassigned = [course_id for course_id in range(num_courses) if rng.random() < 0.5]
+    start = time.perf_counter()
+    enrolled_sets = [set(students) for students in enrolled_students]
+    pairwise_degrees = [sum(1 for other_id in unassigned if other_id != course_id and
+                            not enrolled_sets[course_id].isdisjoint(enrolled_students[other_id]))
+                        for course_id in unassigned]
+    pairwise_degree_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    unassigned_mask = 0
+    for course_id in unassigned:
+        unassigned_mask |= 1 << course_id
+    bitset_degrees = [(model["course_conflict_masks"][course_id] & unassigned_mask).bit_count() for course_id in unassigned]
+    bitset_degree_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    violations = validate_schedule(schedule, model)
+    validate_ms = (time.perf_counter() - start) * 1000
+    result = solve_iteratively(model, possible_times_and_rooms, time_limit=time_limit)
+
+    print(f"  {num_courses:>5} دورة، {num_students:>6} طالب | رسم التعارض: {num_edges} حافة | "
+          f"التجميع: {compile_ms:>7.1f} مللي ثانية (بدون تسجيلات {base_compile_ms:.1f}) | "
+          f"التحقق من جدول ({len(schedule)} مجدولة، {len(violations)} مخالفة): {validate_ms:.1f} مللي ثانية")
+    print(f"      فحص التعارض: قوائم {pairwise_elapsed / probes * 1e6:>8.1f} ميكروثانية | "
+          f"bitsets {bitset_elapsed / probes * 1e6:>6.1f} ميكروثانية | تسريع ×{pairwise_elapsed / bitset_elapsed:.0f}")
+    print(f"      درجة التعارض ({len(unassigned)} دورة): قوائم {pairwise_degree_ms:>8.1f} مللي ثانية | "
+          f"bitsets {bitset_degree_ms:>6.2f} مللي ثانية | تسريع ×{pairwise_degree_ms / max(bitset_degree_ms, 1e-9):.0f}")
+    print(f"      الحل التكراري: {result['status']} | {result['nodes']} عقدة | "
+          f"{len(result['unscheduled'])} غير مجدولة | {result['elapsed_ms']:.1f} مللي ثانية")
+    if pairwise_results != bitset_results or pairwise_degrees != bitset_degrees:
+        print("  ⚠️ نتائج الفحص غير متطابقة!")
+    return {"compile_ms": compile_ms, "edges": num_edges, "check_us": (pairwise_elapsed / probes * 1e6,
+                                                                         bitset_elapsed / probes * 1e6),
+            "degree_ms": (pairwise_degree_ms, bitset_degree_ms), "validate_ms": validate_ms, "status": result["status"]}
+
+
+def inject_conflict(problem_data, kind, seed=0):
+    """
+    تُرجع نسخة من المسألة بتعارض مضاف من نوع kind، وقائمة القيود المضافة (التعارض المتوقع مع قيود المسألة):
+    "unary" نافذة زمنية فارغة لدورة، "propagation" دورة لاحقة في أسبقية يجب أن تنتهي قبل أن تتسع لها ولسابقتها،
+    و "search" ثلاث دورات لمحاضر واحد محصورة في آخر ساعتين (لا يكشفه AC-3 لأن كل زوج منها متسق).
+    """
+    rng = random.Random(seed)
+    courses = problem_data["courses"]
+    working_start = problem_data["constraints"]["working_hours_constraints"]["start"]
+    working_end = problem_data["constraints"]["working_hours_constraints"]["end"]
+    added = {"absolute_time_constraints": [], "precedence_constraints": []}
+    if kind == "unary":
+        course = rng.choice(courses)
+        added["absolute_time_constraints"] = [
+            {"course_name": course["name"], "type": "start_after", "time_value": 14.0},
+            {"course_name": course["name"], "type": "end_before", "time_value": 13.0}]
+    elif kind == "propagation":
+        y_course, x_course = rng.sample(courses, 2)
+        added["precedence_constraints"] = [{"y_course": y_course["name"], "x_course": x_course["name"]}]
+        added["absolute_time_constraints"] = [
+            {"course_name": x_course["name"], "type": "end_before",
+             "time_value": working_start + x_course["duration"] + y_course["duration"] - 0.5}]
+    else:
+        by_instructor = {}
+        for course in courses:
+            by_instructor.setdefault(course["instructor"], []).append(course)
+        candidates = [group for group in by_instructor.values() if len(group) >= 3]
+        added["absolute_time_constraints"] = [
+            {"course_name": course["name"], "type": "start_after", "time_value": working_end - 2.0}
+            for course in rng.choice(candidates)[:3]]
+    added = {key: value for key, value in added.items() if value}
+    return apply_problem_delta(problem_data, {"add_constraints": added}), added
+
+def benchmark_diagnosis(num_courses, seed=0, kinds=("unary", "propagation", "search"), node_limit=20000):
+    """
+    تقارن استخراج مجموعة القيود المتعارضة الأصغرية بـ QuickXplain مقابل مرشح الحذف البسيط (فحص لكل قيد)
+    على مسائل generate_problem_data مع تعارض مضاف (inject_conflict): المرحلة، حجم المجموعة، عدد الفحوص، والزمن.
+    """
+    problem_data = generate_problem_data(num_courses, seed=seed)
+    results = []
+    for kind in kinds:
+        infeasible, _ = inject_conflict(problem_data, kind, seed)
+        for method in ("quickxplain", "deletion"):
+            diagnosis = diagnose_infeasibility(infeasible, node_limit=node_limit, method=method)
+            print(f"  {num_courses:>5} دورة | تعارض {kind:<11} | {method:<11} | {diagnosis['status']:<8} "
+                  f"(مرحلة {diagnosis['stage'] or '-':<11}) | {len(diagnosis['items']):>3} قيد | "
+                  f"{diagnosis['checks']:>5} فحص | {diagnosis['elapsed_ms']:>9.1f} مللي ثانية")
+            results.append({"kind": kind, "method": method, "status": diagnosis["status"], "stage": diagnosis["stage"],
+                            "size": len(diagnosis["items"]), "checks": diagnosis["checks"],
+                            "elapsed_ms": diagnosis["elapsed_ms"]})
+    return results
+
+
+def _collect_solutions(search):
+    """تستهلك مولّد iter_solutions وتُرجع (الحلول المنتَجة، الملخص)."""
+    solutions = []
+    while True:
+        try:
+            solutions.append(next(search))
+        except StopIteration as stop:
+            return solutions, stop.value
+
+def benchmark_enumeration(num_courses, seed=0, limit=20, min_distance=None, samples=200, time_limit=30.0):
+    """
+    تعداد الحلول وعدّها على مسألة generate_problem_data: زمن أول حل ومتوسط كل حل تالٍ من iter_solutions،
+    مجموعة بدائل متنوعة (min_distance، الافتراضي ربع عدد الدورات)، ثم العدّ الدقيق (حتى time_limit ثانية)
+    مقابل تقدير Knuth. إذا اكتمل العدّ الدقيق لعدد معقول من الحلول يُتحقق منه بتعدادها كلها.
+    """
+    model = compile_problem(generate_problem_data(num_courses, seed=seed))
+    possible_times_and_rooms = build_possible_times_and_rooms(model)
+    if min_distance is None:
+        min_distance = max(2, num_courses // 4)
+
+    solutions, summary = _collect_solutions(iter_solutions(model, possible_times_and_rooms, limit=limit,
+                                                           time_limit=time_limit))
+    valid = all(not validate_schedule(solution["schedule"], model) for solution in solutions)
+    if solutions:
+        first_ms = solutions[0]["elapsed_ms"]
+        next_ms = (solutions[-1]["elapsed_ms"] - first_ms) / max(1, len(solutions) - 1)
+        print(f"  {num_courses:>5} دورة | تعداد    | {len(solutions):>4} حل ({summary['status']}) | أول حل: {first_ms:>9.1f} "
+              f"مللي ثانية | كل حل تالٍ: {next_ms:>7.3f} مللي ثانية | {'صالحة' if valid else '⚠️ غير صالحة'}")
+
+    diverse, summary = _collect_solutions(iter_solutions(model, possible_times_and_rooms, limit=limit,
+                                                         min_distance=min_distance, time_limit=time_limit))
+    distances = [solution["distance"] for solution in diverse[1:]]
+    print(f"  {num_courses:>5} دورة | متنوعة   | {len(diverse):>4} حل بمسافة >= {min_distance} ({summary['status']}، "
+          f"{summary['rejected']} مرفوض) | أقل مسافة فعلية: {min(distances) if distances else '-'} | "
+          f"{summary['nodes']:>7} عقدة | {summary['elapsed_ms']:>9.1f} مللي ثانية")
+
+    exact = count_solutions(model, possible_times_and_rooms, time_limit=time_limit)
+    estimate = count_solutions(model, possible_times_and_rooms, method="estimate", samples=samples, time_limit=time_limit)
+    exact_text = f"10^{exact['log10_count']:.2f}" if exact["count"] else str(exact["count"])
+    print(f"  {num_courses:>5} دورة | عدّ دقيق | {exact['status']:<10} | {exact_text:>12} | {exact['nodes']:>8} عقدة | "
+          f"{exact['cache_hits']:>8} من الذاكرة | {exact['elapsed_ms']:>9.1f} مللي ثانية")
+    print(f"  {num_courses:>5} دورة | تقدير    | {'estimate':<10} | 10^{estimate['log10_count']:.2f} | "
+          f"مكوّنات {estimate['components'][:5]} | {estimate['elapsed_ms']:>9.1f} مللي ثانية")
+
+    if exact["count"] is not None and exact["count"] <= 200000:
+        enumerated, summary = _collect_solutions(iter_solutions(model, possible_times_and_rooms))
+        match = "مطابق" if len(enumerated) == exact["count"] else "⚠️ غير مطابق"
+        print(f"  {num_courses:>5} دورة | تحقق     | تعداد كل الحلول: {len(enumerated)} ({match}) | "
+              f"{summary['elapsed_ms']:>9.1f} مللي ثانية")
+    return {"solutions": len(solutions), "diverse": len(diverse), "exact": exact, "estimate": estimate}
+
+
+def benchmark_feasibility_tensor(num_courses, seed=0):
+    """تقارن زمن بناء مصفوفة الجدوى والمجالات الأولية بـ NumPy مقابل حلقات بايثون."""
+    model = compile_problem(generate_problem_data(num_courses, seed=seed))
+    possible_times_and_rooms = build_possible_times_and_rooms(model)
+
+    timings = {}
+    domains = {}
+    # بدون NumPy يرجع use_numpy=True إلى حلقات بايثون نفسها، فلا يُقاس كعمود NumPy
+    variants = (False, True) if project.np is not None else (False,)
+    for use_numpy in variants:
+        start = time.perf_counter()
+        tensor = build_feasibility_tensor(model, possible_times_and_rooms, use_numpy=use_numpy)
+        domains[use_numpy] = feasibility_domains(tensor)
+        timings[use_numpy] = time.perf_counter() - start
+
+    cells = num_courses * len(possible_times_and_rooms)
+    numpy_column = (f"{timings[True] * 1000:>7.1f} مللي ثانية" if True in timings
+                    else "غير مثبتة (تُخطّي القياس)")
+    print(f"  {num_courses:>5} دورة × {len(possible_times_and_rooms)} قيمة ({cells} خلية) | "
+          f"بايثون: {timings[False] * 1000:>8.1f} مللي ثانية | "
+          f"NumPy: {numpy_column}")
+    if True in domains and domains[False] != domains[True]:
+        print("  ⚠️ المجالات غير متطابقة!")
+    return timings
+
+
+def benchmark_repair(num_courses, seed=0, time_limit=30.0):
+    """
+    تقارن إصلاح حل قائم بعد تعديلات محلية نموذجية بإعادة الحل من الصفر،
+    من حيث الزمن وعدد التعيينات التي تغيّرت. الإصلاح بمهلة time_limit ثانية.
+    """
+    problem_data = generate_problem_data(num_courses, seed=seed)
+    model = compile_problem(problem_data)
+    courses_names = list(model["course_names"])
+    possible_times_and_rooms = build_possible_times_and_rooms(model)
+    empty_schedule = lambda: {name: {"start_time": None, "end_time": None, "room": None} for name in courses_names}
+    solution = backtracking_search_forward_checking(empty_schedule(), model, courses_names, possible_times_and_rooms,
+                                                    strict_precedence=True)
+    if solution is None:
+        print(f"  {num_courses:>5} دورة | لا يوجد حل أولي")
+        return
+
+    instructor = problem_data["courses"][0]["instructor"]
+    deltas = {
+        "محاضر غير متاح": {"add_constraints": {"instructor_availability_constraints": [
+            {"instructor_name": instructor, "unavailable_times": [(9.0, 11.0)]}]}},
+        "قاعة خارج الخدمة": {"remove_rooms": [problem_data["rooms"][0]["name"]]},
+        "شعبة جديدة": {"add_courses": [{"name": "شعبة إضافية", "duration": 1.0, "instructor": instructor, "num_students": 20}]},
+    }
+    for delta_name, delta in deltas.items():
+        repair_result = repair_schedule(solution, problem_data, delta, time_limit=time_limit)
+
+        new_model = compile_problem(apply_problem_delta(problem_data, delta))
+        new_names = list(new_model["course_names"])
+        start = time.perf_counter()
+        scratch = backtracking_search_forward_checking(
+            {name: {"start_time": None, "end_time": None, "room": None} for name in new_names}, new_model, new_names,
+            build_possible_times_and_rooms(new_model), strict_precedence=True)
+        scratch_elapsed = time.perf_counter() - start
+        scratch_changed = sum(1 for name in solution if scratch and name in scratch and
+                              (solution[name]["start_time"], solution[name]["room"]) != (scratch[name]["start_time"], scratch[name]["room"]))
+
+        print(f"  {num_courses:>5} دورة | {delta_name:<16} | إصلاح ({repair_result['status']}): "
+              f"{repair_result['elapsed_ms']:>7.1f} مللي ثانية، {repair_result['num_changed']:>4} تغيير | من الصفر: {scratch_elapsed * 1000:>7.1f} مللي ثانية، {scratch_changed:>4} تغيير")
+
+
+async def _run_service_load(host, port, problems, num_requests, concurrency, seed, mix):
+    """
+    تحمّل المسائل في الخدمة وتحل كل منها مرة (إحماء)، ثم ترسل num_requests طلباً عبر concurrency اتصالاً
+    متزامناً بنسب mix ({"solve"، "validate"، "what-if"}). طلبات الحل والماذا-لو تتكرر بين المسائل
+    نفسها فتُدمج الجارية منها في الخدمة. تُرجع (أزمنة كل نوع بالمللي ثانية، الزمن الكلي، إحصاءات الخدمة).
+    """
+    connection = await open_client(host, port)
+    problem_ids, solutions = [], []
+    for problem_data in problems:
+        problem_id = (await request_json(connection, "POST", "/problems", {"problem": problem_data}))[1]["problem_id"]
+        problem_ids.append(problem_id)
+        solutions.append((await request_json(connection, "POST", "/solve", {"problem_id": problem_id}))[1]["schedule"])
+
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=num_requests)
+    requests = []
+    for kind in kinds:
+        index = rng.randrange(len(problems))
+        payload = {"problem_id": problem_ids[index]}
+        if kind == "validate":
+            payload["schedule"] = solutions[index]
+        elif kind == "what-if":
+            room = rng.choice(problems[index]["rooms"])["name"]
+            payload.update({"schedule": solutions[index], "delta": {"remove_rooms": [room]}})
+        requests.append((kind, "/" + kind, payload))
+
+    latencies = {kind: [] for kind in mix}
+    pending = iter(requests)
+
+    async def client():
+        client_connection = await open_client(host, port)
+        try:
+            for kind, path, payload in pending:
+                start = time.perf_counter()
+                status, _ = await request_json(client_connection, "POST", path, payload)
+                if status == 200:
+                    latencies[kind].append((time.perf_counter() - start) * 1000)
+        finally:
+            client_connection[1].close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stats = (await request_json(connection, "GET", "/stats"))[1]
+    connection[1].close()
+    return latencies, elapsed, stats
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))] if ordered else float("nan")
+
+def benchmark_service(num_courses, num_problems=4, num_requests=500, concurrency=16, workers=None, seed=0,
+                      mix=None, host="127.0.0.1", port=None):
+    """
+    اختبار حمل لخدمة الجدولة (service.py): تُشغَّل الخدمة في عملية منفصلة على منفذ حر (أو تُستخدم خدمة
+    قائمة على port)، ثم تُقاس أزمنة الاستجابة p50/p99 لكل نوع طلب وعدد الطلبات في الثانية
+    وعدد الطلبات التي دُمجت في مهام جارية.
+    """
+    mix = mix or {"solve": 0.3, "validate": 0.6, "what-if": 0.1}
+    problems = [generate_problem_data(num_courses, seed=seed + index) for index in range(num_problems)]
+    process = None
+    if port is None:
+        command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "service.py"),
+                   "--host", host, "--port", "0"]
+        if workers is not None:
+            command += ["--workers", str(workers)]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        line = process.stdout.readline()
+        while line and not line.startswith("listening on"):
+            line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("تعذّر بدء الخدمة")
+        port = int(line.rsplit(":", 1)[1])
+    try:
+        latencies, elapsed, stats = asyncio.run(_run_service_load(host, port, problems, num_requests, concurrency,
+                                                                  seed, mix))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    completed = sum(len(values) for values in latencies.values())
+    print(f"  {num_courses:>5} دورة × {num_problems} مسائل | {concurrency:>3} اتصال | {completed}/{num_requests} طلب "
+          f"في {elapsed:.2f} ثانية — {completed / elapsed:.0f} طلب/ثانية | مهام: {stats['jobs']}، "
+          f"مدموجة: {stats['coalesced']}")
+    for kind, values in latencies.items():
+        print(f"      {kind:<9} | {len(values):>5} طلب | p50 {_percentile(values, 50):>8.1f} مللي ثانية | "
+              f"p99 {_percentile(values, 99):>8.1f} مللي ثانية")
+    return {"requests_per_second": completed / elapsed, "completed": completed, "stats": stats,
+            "latency_ms": {kind: {"p50": _percentile(values, 50), "p99": _percentile(values, 99)}
+                           for kind, values in latencies.items()}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="قياس أداء خوارزميات الجدولة على مسائل اصطناعية.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    solvers_parser = subparsers.add_parser("solvers", help="مقارنة أنماط الحل")
+    solvers_parser.add_argument("--courses", type=int, nargs="+", default=[20, 50, 200])
+    solvers_parser.add_argument("--modes", nargs="+", default=list(SOLVER_MODES), choices=list(SOLVER_MODES))
+    solvers_parser.add_argument("--seed", type=int, default=0)
+
+    overlap_parser = subparsers.add_parser("overlap", help="فحص التداخل الخطي مقابل جداول الإشغال")
+    overlap_parser.add_argument("--courses", type=int, nargs="+", default=[500, 1000, 2000])
+    overlap_parser.add_argument("--seed", type=int, default=0)
+
+    feasibility_parser = subparsers.add_parser("feasibility", help="بناء مصفوفة الجدوى بـ NumPy مقابل حلقات بايثون")
+    feasibility_parser.add_argument("--courses", type=int, nargs="+", default=[200, 1000, 2000])
+    feasibility_parser.add_argument("--seed", type=int, default=0)
+
+    repair_parser = subparsers.add_parser("repair", help="إصلاح حل قائم مقابل إعادة الحل من الصفر")
+    repair_parser.add_argument("--courses", type=int, nargs="+", default=[100, 200, 500])
+    repair_parser.add_argument("--time-limit", type=float, default=30.0, help="مهلة الإصلاح بالثواني")
+    repair_parser.add_argument("--seed", type=int, default=1)
+
+    granularity_parser = subparsers.add_parser("granularity", help="زمن الحل لشبكات أوقات بدقة مختلفة")
+    granularity_parser.add_argument("--courses", type=int, nargs="+", default=[50, 200])
+    granularity_parser.add_argument("--increments", type=float, nargs="+", default=[1.0, 0.5, 0.25])
+    granularity_parser.add_argument("--seed", type=int, default=0)
+
+    suite_parser = subparsers.add_parser("suite", help="مجموعة قياس لنمط حل عبر أحجام وبذور مختلفة")
+    suite_parser.add_argument("--courses", type=int, nargs="+", default=[5, 10, 20, 40])
+    suite_parser.add_argument("--seeds", type=int, default=3, help="عدد المسائل (البذور) لكل حجم")
+    suite_parser.add_argument("--mode", default="deepcopy", choices=list(SOLVER_MODES))
+    suite_parser.add_argument("--preset", default="default", choices=list(GENERATOR_PRESETS))
+    suite_parser.add_argument("--timeout", type=float, default=30.0, help="المهلة لكل مسألة بالثواني")
+    suite_parser.add_argument("--no-memory", action="store_true", help="تخطي قياس ذروة الذاكرة")
+    suite_parser.add_argument("--save", help="حفظ الملخصات في ملف JSON")
+    suite_parser.add_argument("--baseline", help="ملف JSON من تشغيل سابق للمقارنة")
+
+    profile_parser = subparsers.add_parser("profile", help="إحصاءات بحث مفصلة لمسألة واحدة")
+    profile_parser.add_argument("--courses", type=int, default=20)
+    profile_parser.add_argument("--mode", default="deepcopy", choices=list(SOLVER_MODES))
+    profile_parser.add_argument("--preset", default="default", choices=list(GENERATOR_PRESETS))
+    profile_parser.add_argument("--seed", type=int, default=0)
+    profile_parser.add_argument("--trace", help="ملف JSON Lines لأحداث البحث")
+
+    local_parser = subparsers.add_parser("local", help="البحث المحلي (min-conflicts + tabu) للمسائل الكبيرة")
+    local_parser.add_argument("--courses", type=int, nargs="+", default=[1000, 5000])
+    local_parser.add_argument("--preset", default="default", choices=list(GENERATOR_PRESETS))
+    local_parser.add_argument("--time-limit", type=float, default=10.0, help="الميزانية الزمنية بالثواني")
+    local_parser.add_argument("--seed", type=int, default=0)
+
+    optimize_parser = subparsers.add_parser("optimize", help="التفرع والتحديد للقيود المرنة مع قطع الفروع وبدونه")
+    optimize_parser.add_argument("--courses", type=int, nargs="+", default=[50, 200, 400])
+    optimize_parser.add_argument("--preset", default="default", choices=list(GENERATOR_PRESETS))
+    optimize_parser.add_argument("--time-limit", type=float, default=30.0, help="الميزانية الزمنية لكل تشغيل بالثواني")
+    optimize_parser.add_argument("--group-density", type=float, default=0.1, help="عدد مجموعات الطلاب كنسبة من الدورات")
+    optimize_parser.add_argument("--balance-weight", type=float, default=0.05, help="وزن توازن استخدام القاعات")
+    optimize_parser.add_argument("--seed", type=int, default=0)
+
+    cache_parser = subparsers.add_parser("cache", help="ذاكرة الحلول الدائمة: الطلب الأول مقابل الطلبات المتطابقة")
+    cache_parser.add_argument("--courses", type=int, nargs="+", default=[5, 50, 200])
+    cache_parser.add_argument("--seed", type=int, default=0)
+    cache_parser.add_argument("--cache", help="ملف ذاكرة الحلول (الافتراضي: ملف مؤقت)")
+
+    memory_parser = subparsers.add_parser("memory", help="حجم الجدول ونسخه: صيغة القاموس مقابل الجدول المضغوط")
+    memory_parser.add_argument("--courses", type=int, nargs="+", default=[100, 1000])
+    memory_parser.add_argument("--seed", type=int, default=0)
+
+    budget_parser = subparsers.add_parser("budget", help="البحث التكراري بمهلة زمنية وأحداث تقدّم")
+    budget_parser.add_argument("--courses", type=int, nargs="+", default=[1000, 2000, 5000])
+    budget_parser.add_argument("--preset", default="default", choices=list(GENERATOR_PRESETS))
+    budget_parser.add_argument("--time-limit", type=float, default=5.0, help="المهلة لكل تشغيل بالثواني")
+    budget_parser.add_argument("--progress-interval", type=float, default=1.0)
+    budget_parser.add_argument("--seed", type=int, default=0)
+
+    symmetry_parser = subparsers.add_parser("symmetry", help="كسر التماثل على مسائل قاعات وشُعب متطابقة")
+    symmetry_parser.add_argument("--courses", type=int, nargs="+", default=[24, 36, 48])
+    symmetry_parser.add_argument("--rooms", type=int, default=6, help="عدد القاعات المتطابقة")
+    symmetry_parser.add_argument("--sections", type=int, default=3, help="عدد الشُعب المتطابقة لكل دورة")
+    symmetry_parser.add_argument("--loads", type=float, nargs="+", default=[0.9, 1.2],
+                                 help="نسبة الدورات إلى سعة القاعات (أكبر من 1 = بلا حل)")
+    symmetry_parser.add_argument("--time-limit", type=float, default=30.0, help="الميزانية الزمنية لكل تشغيل بالثواني")
+    symmetry_parser.add_argument("--seed", type=int, default=0)
+
+    chains_parser = subparsers.add_parser("chains", help="نشر الحدود الزمنية عبر سلاسل أسبقية طويلة")
+    chains_parser.add_argument("--courses", type=int, nargs="+", default=[40, 80])
+    chains_parser.add_argument("--chain-length", type=int, default=8)
+    chains_parser.add_argument("--slacks", type=float, nargs="+", default=[1.0, 0.0, -1.0],
+                               help="ساعات العمل الزائدة عن أطول سلسلة (سالب = بلا حل)")
+    chains_parser.add_argument("--time-limit", type=float, default=10.0, help="المهلة لكل تشغيل بالثواني")
+    chains_parser.add_argument("--seed", type=int, default=0)
+
+    students_parser = subparsers.add_parser("students", help="تعارض الطلاب: bitsets مقابل مقارنة قوائم التسجيل")
+    students_parser.add_argument("--courses", type=int, nargs="+", default=[1000])
+    students_parser.add_argument("--students", type=int, default=10000)
+    students_parser.add_argument("--probes", type=int, default=2000)
+    students_parser.add_argument("--time-limit", type=float, default=10.0, help="مهلة الحل التكراري بالثواني")
+    students_parser.add_argument("--seed", type=int, default=0)
+
+    service_parser = subparsers.add_parser("service", help="اختبار حمل لخدمة الجدولة: p50/p99 وعدد الطلبات في الثانية")
+    service_parser.add_argument("--courses", type=int, nargs="+", default=[50, 200])
+    service_parser.add_argument("--problems", type=int, default=4, help="عدد المسائل المحمّلة في الخدمة")
+    service_parser.add_argument("--requests", type=int, default=500)
+    service_parser.add_argument("--concurrency", type=int, default=16, help="عدد الاتصالات المتزامنة")
+    service_parser.add_argument("--workers", type=int, default=None, help="عدد العمليات العاملة في الخدمة")
+    service_parser.add_argument("--port", type=int, default=None, help="منفذ خدمة قائمة (الافتراضي: تشغيل خدمة جديدة)")
+    service_parser.add_argument("--seed", type=int, default=0)
+
+    diagnose_parser = subparsers.add_parser("diagnose", help="تشخيص القيود المتعارضة: QuickXplain مقابل مرشح الحذف")
+    diagnose_parser.add_argument("--courses", type=int, nargs="+", default=[50, 200])
+    diagnose_parser.add_argument("--kinds", nargs="+", default=["unary", "propagation", "search"],
+                                 choices=["unary", "propagation", "search"], help="أنواع التعارض المضاف")
+    diagnose_parser.add_argument("--node-limit", type=int, default=20000, help="ميزانية كل فحص بحث بالعقد")
+    diagnose_parser.add_argument("--seed", type=int, default=0)
+
+    enumerate_parser = subparsers.add_parser("enumerate", help="تعداد الحلول بكسل وعدّها (دقيق وتقدير Knuth)")
+    enumerate_parser.add_argument("--courses", type=int, nargs="+", default=[6, 8, 50, 200])
+    enumerate_parser.add_argument("--limit", type=int, default=20, help="عدد الحلول المطلوبة في التعداد")
+    enumerate_parser.add_argument("--min-distance", type=int, default=None,
+                                  help="أقل مسافة Hamming بين البدائل (الافتراضي ربع عدد الدورات)")
+    enumerate_parser.add_argument("--samples", type=int, default=200, help="عدد مسارات تقدير Knuth لكل مكوّن")
+    enumerate_parser.add_argument("--time-limit", type=float, default=30.0, help="ميزانية كل تشغيل بالثواني")
+    enumerate_parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == "solvers":
+        for num_courses in args.courses:
+            compare_solver_modes(num_courses, args.modes, seed=args.seed)
+    elif args.command == "overlap":
+        for num_courses in args.courses:
+            benchmark_overlap_checks(num_courses, seed=args.seed)
+    elif args.command == "feasibility":
+        for num_courses in args.courses:
+            benchmark_feasibility_tensor(num_courses, seed=args.seed)
+    elif args.command == "repair":
+        for num_courses in args.courses:
+            benchmark_repair(num_courses, seed=args.seed, time_limit=args.time_limit)
+    elif args.command == "granularity":
+        for num_courses in args.courses:
+            benchmark_time_granularity(num_courses, args.increments, seed=args.seed)
+    elif args.command == "suite":
+        summaries = benchmark_solver_suite(args.courses, range(args.seeds), args.mode, args.preset,
+                                           args.timeout, not args.no_memory)
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as baseline_file:
+                compare_suite_results(summaries, json.load(baseline_file))
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as save_file:
+                json.dump(summaries, save_file, ensure_ascii=False, indent=2)
+    elif args.command == "profile":
+        profile_solver_run(args.mode, generate_problem_data(args.courses, seed=args.seed, **GENERATOR_PRESETS[args.preset]),
+                           args.trace)
+    elif args.command == "local":
+        for num_courses in args.courses:
+            benchmark_local_search(num_courses, seed=args.seed, preset=args.preset, time_limit=args.time_limit)
+    elif args.command == "optimize":
+        for num_courses in args.courses:
+            benchmark_branch_and_bound(num_courses, seed=args.seed, preset=args.preset, time_limit=args.time_limit,
+                                       group_density=args.group_density, balance_weight=args.balance_weight)
+    elif args.command == "memory":
+        for num_courses in args.courses:
+            benchmark_schedule_memory(num_courses, seed=args.seed)
+    elif args.command == "budget":
+        for num_courses in args.courses:
+            benchmark_iterative_budget(num_courses, seed=args.seed, preset=args.preset, time_limit=args.time_limit,
+                                       progress_interval=args.progress_interval)
+    elif args.command == "symmetry":
+        for num_courses in args.courses:
+            benchmark_symmetry_breaking(num_courses, args.rooms, seed=args.seed, sections=args.sections,
+                                        loads=args.loads, time_limit=args.time_limit)
+    elif args.command == "chains":
+        for num_courses in args.courses:
+            benchmark_temporal_propagation(num_courses, args.chain_length, seed=args.seed, slacks=args.slacks,
+                                           time_limit=args.time_limit)
+    elif args.command == "students":
+        for num_courses in args.courses:
+            benchmark_student_conflicts(num_courses, args.students, seed=args.seed, probes=args.probes,
+                                        time_limit=args.time_limit)
+    elif args.command == "diagnose":
+        for num_courses in args.courses:
+            benchmark_diagnosis(num_courses, seed=args.seed, kinds=args.kinds, node_limit=args.node_limit)
+    elif args.command == "enumerate":
+        for num_courses in args.courses:
+            benchmark_enumeration(num_courses, seed=args.seed, limit=args.limit, min_distance=args.min_distance,
+                                  samples=args.samples, time_limit=args.time_limit)
+    elif args.command == "service":
+        for num_courses in args.courses:
+            benchmark_service(num_courses, num_problems=args.problems, num_requests=args.requests,
+                              concurrency=args.concurrency, workers=args.workers, seed=args.seed, port=args.port)
+    elif args.command == "cache":
+        for num_courses in args.courses:
+            benchmark_solution_cache(num_courses, seed=args.seed, cache_path=args.cache)
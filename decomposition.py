@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import time
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from problem_generator import generate_problem_data
+from project import (
+    SOLVER_MODES,
+    build_possible_times_and_rooms,
+    compile_problem,
+    course_components,
+    restrict_problem,
+    run_solver_mode,
+    solve_iteratively,
+)
+
+# حل المسألة مكوّناً مكوّناً: المكوّنات المستقلة في رسم القيود تُحل في مجموعة عمليات وتُدمج حلولها
+
+_stop_event = None
+
+def _init_part_worker(stop_event):
+    """تهيئة كل عملية عاملة بحدث الإيقاف المشترك (يُمرَّر عند إنشاء العملية لأنه لا يُرسل مع المهام)."""
+    global _stop_event
+    _stop_event = stop_event
+
+def _solve_part(problem_data, solver_mode, time_increment):
+    """
+    تحل مسألة جزئية (مكوّن أو عدة مكوّنات صغيرة) وتُرجع (الحل أو None، الحالة، الزمن بالمللي ثانية).
+    في عملية عاملة يتوقف البحث تعاونياً (الحالة "cancelled") عند ضبط حدث الإيقاف المشترك.
+    """
+    start = time.perf_counter()
+    model = compile_problem(problem_data)
+    course_names = list(dict.fromkeys(model["course_names"]))
+    schedule = {course_name: {"start_time": None, "end_time": None, "room": None} for course_name in course_names}
+    possible_times_and_rooms = build_possible_times_and_rooms(model, time_increment)
+    should_stop = None if _stop_event is None else _stop_event.is_set
+    if solver_mode is None:
+        result = solve_iteratively(model, possible_times_and_rooms, should_stop=should_stop, strict_precedence=True)
+    else:
+        result = run_solver_mode(solver_mode, schedule, model, course_names, possible_times_and_rooms,
+                                 should_stop=should_stop)
+    return result["schedule"], result["status"], (time.perf_counter() - start) * 1000
+
+def pack_components(components, min_part_size=50):
+    """
+    تجمع المكوّنات الصغيرة في أجزاء لا يقل حجمها عن min_part_size دورة (تقليلاً لكلفة إرسال المهام)،
+    مع إبقاء كل مكوّن كبير جزءاً مستقلاً. جمع مكوّنات مستقلة في جزء واحد لا يغيّر قابلية حله.
+    """
+    parts = []
+    current = []
+    for component in components:
+        if len(component) >= min_part_size:
+            parts.append(list(component))
+            continue
+        current.extend(component)
+        if len(current) >= min_part_size:
+            parts.append(current)
+            current = []
+    if current:
+        parts.append(current)
+    return parts
+
+def solve_by_components(problem_data, workers=None, solver_mode=None, time_increment=1.0, min_part_size=50):
+    """
+    تفكك المسألة إلى مكوّنات مستقلة (course_components) وتحل كل جزء وحده ثم تدمج الحلول في جدول واحد.
+    workers=0 يعني الحل داخل العملية الحالية، وإلا تُوزَّع الأجزاء (الأكبر أولاً) على مجموعة عمليات.
+    solver_mode من SOLVER_MODES (الافتراضي: الفحص الأمامي مع فرض الأسبقية في الاتجاهين).
+    إذا تعذّر حل أي جزء فالمسألة كلها بلا حل وتُلغى بقية الأجزاء: التي لم تبدأ تُحذف من الطابور، والجارية
+    تتوقف تعاونياً عبر حدث مشترك، ولا يُنتظر انتهاؤها قبل الرجوع.
+    تُرجع قاموساً: schedule (أو None)، status ("solved" أو حالة أول جزء لم يُحل)، components (أحجام المكوّنات)،
+    parts (حجم وزمن وحالة كل جزء)، elapsed_ms.
+    """
+    start = time.perf_counter()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    components = course_components(problem_data)
+    parts = pack_components(components, min_part_size)
+    part_problems = [restrict_problem(problem_data, part) for part in parts]
+
+    schedule = {}
+    part_stats = [{"courses": len(part), "elapsed_ms": None, "status": None} for part in parts]
+    status = "solved"
+    if workers == 0:
+        for part_index, part_problem in enumerate(part_problems):
+            solution, part_status, part_stats[part_index]["elapsed_ms"] = _solve_part(part_problem, solver_mode,
+                                                                                      time_increment)
+            part_stats[part_index]["status"] = part_status
+            if solution is None:
+                status = part_status
+                break
+            schedule.update(solution)
+    else:
+        stop_event = multiprocessing.Event()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_part_worker, initargs=(stop_event,))
+        try:
+            pending = {executor.submit(_solve_part, part_problem, solver_mode, time_increment): part_index
+                       for part_index, part_problem in enumerate(part_problems)}
+            while pending and status == "solved":
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    part_index = pending.pop(future)
+                    solution, part_status, part_stats[part_index]["elapsed_ms"] = future.result()
+                    part_stats[part_index]["status"] = part_status
+                    if solution is None:
+                        status = part_status
+                        break
+                    schedule.update(solution)
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return {
+        "schedule": schedule if status == "solved" else None,
+        "status": status,
+        "components": [len(component) for component in components],
+        "parts": part_stats,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+def generate_departmental_problem(num_departments, courses_per_department, seed=0, **generator_options):
+    """
+    تولّد مسألة من عدة أقسام مستقلة: لكل قسم دورات ومحاضرون وقاعات خاصة به (عبر generate_problem_data)
+    ودورات كل قسم مقيّدة بقاعاته (الحقل "rooms")، فلا ربط بين الأقسام ويكون لرسم القيود مكوّن واحد
+    على الأقل لكل قسم.
+    """
+    courses, rooms = [], []
+    constraints = {"precedence_constraints": [], "absolute_time_constraints": [],
+                   "instructor_availability_constraints": []}
+    for department in range(num_departments):
+        department_data = generate_problem_data(courses_per_department, seed=seed * 1000 + department, **generator_options)
+        prefix = f"ق{department + 1}/"
+        renamed = {course["name"]: prefix + course["name"] for course in department_data["courses"]}
+        department_rooms = [prefix + room["name"] for room in department_data["rooms"]]
+        for course in department_data["courses"]:
+            courses.append(dict(course, name=renamed[course["name"]], instructor=prefix + course["instructor"],
+                                rooms=department_rooms))
+        for room in department_data["rooms"]:
+            rooms.append(dict(room, name=prefix + room["name"]))
+        department_constraints = department_data["constraints"]
+        for p_const in department_constraints["precedence_constraints"]:
+            constraints["precedence_constraints"].append(
+                {"y_course": renamed[p_const["y_course"]], "x_course": renamed[p_const["x_course"]]})
+        for abs_const in department_constraints["absolute_time_constraints"]:
+            constraints["absolute_time_constraints"].append(dict(abs_const, course_name=renamed[abs_const["course_name"]]))
+        for inst_const in department_constraints["instructor_availability_constraints"]:
+            constraints["instructor_availability_constraints"].append(
+                dict(inst_const, instructor_name=prefix + inst_const["instructor_name"]))
+        constraints["working_hours_constraints"] = department_constraints["working_hours_constraints"]
+    return {"courses": courses, "rooms": rooms, "constraints": constraints}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="حل المسألة بتفكيكها إلى مكوّنات مستقلة ومقارنته بالحل الكامل.")
+    parser.add_argument("--problem", help="ملف JSON لبيانات المشكلة (الافتراضي: أقسام اصطناعية مستقلة)")
+    parser.add_argument("--departments", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--courses-per-department", type=int, default=50)
+    parser.add_argument("--mode", default=None, choices=list(SOLVER_MODES),
+                        help="نمط الحل (الافتراضي: الفحص الأمامي مع فرض الأسبقية في الاتجاهين)")
+    parser.add_argument("--workers", type=int, default=None, help="عدد العمليات (0 = داخل العملية الحالية)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.problem:
+        with open(args.problem, encoding="utf-8") as problem_file:
+            problems = [("ملف", json.load(problem_file))]
+    else:
+        problems = [(f"{num_departments} قسم", generate_departmental_problem(num_departments, args.courses_per_department,
+                                                                             seed=args.seed))
+                    for num_departments in args.departments]
+
+    for label, problem_data in problems:
+        _, _, whole_ms = _solve_part(problem_data, args.mode, 1.0)
+        result = solve_by_components(problem_data, workers=args.workers, solver_mode=args.mode)
+        largest = max((part["elapsed_ms"] or 0.0 for part in result["parts"]), default=0.0)
+        status = "حل" if result["schedule"] is not None else "لا حل"
+        print(f"  {label:<10} | {len(problem_data['courses']):>5} دورة | {len(result['components']):>4} مكوّن "
+              f"(الأكبر {max(result['components'], default=0)}) | كامل: {whole_ms:>9.1f} مللي ثانية | "
+              f"مفكك: {result['elapsed_ms']:>9.1f} مللي ثانية (أبطأ جزء {largest:.1f}) | {status}")
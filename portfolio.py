@@ -0,0 +1,142 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+from problem_generator import generate_problem_data
+from project import (
+    build_possible_times_and_rooms,
+    compile_problem,
+    get_problem_data_default,
+    solve_with_restarts,
+)
+
+# حل المحفظة (portfolio): عدة عمليات بحث بإعدادات مختلفة على أنوية المعالج، وأول حل كامل يفوز
+
+def default_portfolio_configs(num_workers):
+    """
+    تولّد إعدادات بحث متنوعة: الأول هو البحث الحتمي الافتراضي (نفس نتيجة الفحص الأمامي)،
+    والبقية تمزج ترتيب القيم، كسر التعادل العشوائي في MRV، البذور وسياسات إعادة التشغيل.
+    """
+    configs = [{"value_order": "ascending", "tie_break": "first", "seed": 0, "restart_policy": "none"}]
+    value_orders = ["random", "ascending", "descending", "random"]
+    restart_policies = ["luby", "geometric", "luby", "none"]
+    worker_index = 1
+    while len(configs) < num_workers:
+        configs.append({
+            "value_order": value_orders[worker_index % len(value_orders)],
+            "tie_break": "random",
+            "seed": worker_index,
+            "restart_policy": restart_policies[worker_index % len(restart_policies)],
+        })
+        worker_index += 1
+    return configs
+
+def _portfolio_worker(worker_index, problem_data, config, time_increment, strict_precedence, stop_event, result_queue):
+    """تشغّل إعداد بحث واحد وترسل (رقم العامل، الحل، الإحصاءات) إلى طابور النتائج."""
+    start = time.perf_counter()
+    model = compile_problem(problem_data)
+    course_names = list(dict.fromkeys(model["course_names"]))
+    schedule = {course_name: {"start_time": None, "end_time": None, "room": None} for course_name in course_names}
+    possible_times_and_rooms = build_possible_times_and_rooms(model, time_increment)
+
+    solution, stats = solve_with_restarts(schedule, model, course_names, possible_times_and_rooms,
+                                          should_stop=stop_event.is_set, strict_precedence=strict_precedence, **config)
+    stats.update({"worker": worker_index, "config": config, "elapsed_ms": (time.perf_counter() - start) * 1000})
+    result_queue.put((worker_index, solution, stats))
+
+def solve_portfolio(problem_data, configs=None, workers=None, time_increment=1.0, timeout=None, strict_precedence=True):
+    """
+    تشغّل عدة إعدادات بحث في عمليات منفصلة؛ أول حل كامل يفوز وتُلغى بقية العمليات
+    (إلغاء تعاوني عبر حدث مشترك، ثم إنهاء قسري لمن لم يستجب).
+    إذا أثبت عامل يبحث بحثاً كاملاً (بلا إعادة تشغيل) عدم وجود حل، يتوقف الجميع.
+    تُرجع قاموساً: schedule، winner (رقم العامل أو None)، wall_time_ms، workers (إحصاءات كل عامل).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if configs is None:
+        configs = default_portfolio_configs(workers)
+
+    start = time.perf_counter()
+    stop_event = multiprocessing.Event()
+    result_queue = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_portfolio_worker, daemon=True,
+                                args=(worker_index, problem_data, config, time_increment, strict_precedence,
+                                      stop_event, result_queue))
+        for worker_index, config in enumerate(configs)
+    ]
+    for process in processes:
+        process.start()
+
+    deadline = None if timeout is None else start + timeout
+    winner = None
+    solution = None
+    worker_stats = {}
+    while len(worker_stats) < len(processes):
+        wait = None if deadline is None else deadline - time.perf_counter()
+        if stop_event.is_set():
+            wait = 1.0 if wait is None else min(wait, 1.0)
+        if wait is not None and wait <= 0:
+            break
+        try:
+            worker_index, worker_solution, stats = result_queue.get(timeout=wait)
+        except queue.Empty:
+            break
+        worker_stats[worker_index] = stats
+        if worker_solution is not None and winner is None:
+            winner, solution = worker_index, worker_solution
+            stop_event.set()
+        elif stats["status"] == "infeasible":
+            stop_event.set()
+
+    stop_event.set()
+    for worker_index, process in enumerate(processes):
+        process.join(timeout=1.0)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        if worker_index not in worker_stats:
+            worker_stats[worker_index] = {"worker": worker_index, "config": configs[worker_index], "status": "terminated"}
+
+    return {
+        "schedule": solution,
+        "winner": winner,
+        "wall_time_ms": (time.perf_counter() - start) * 1000,
+        "workers": [worker_stats[worker_index] for worker_index in range(len(processes))],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="حل المحفظة المتوازي وقياس توسعه مع عدد العمليات.")
+    parser.add_argument("--problem", help="ملف JSON لبيانات المشكلة (الافتراضي: مسألة اصطناعية)")
+    parser.add_argument("--courses", type=int, default=200, help="عدد دورات المسألة الاصطناعية")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--timeout", type=float, default=None, help="المهلة بالثواني")
+    parser.add_argument("--default-problem", action="store_true", help="استخدام get_problem_data_default")
+    args = parser.parse_args()
+
+    if args.problem:
+        with open(args.problem, encoding="utf-8") as problem_file:
+            problem_data = json.load(problem_file)
+    elif args.default_problem:
+        problem_data = get_problem_data_default()
+    else:
+        problem_data = generate_problem_data(args.courses, seed=args.seed)
+
+    baseline_ms = None
+    for num_workers in args.workers:
+        result = solve_portfolio(problem_data, workers=num_workers, timeout=args.timeout)
+        if baseline_ms is None:
+            baseline_ms = result["wall_time_ms"]
+        status = f"الفائز: العامل {result['winner']}" if result["schedule"] else "لا حل"
+        print(f"  {num_workers:>3} عامل | {result['wall_time_ms']:>10.1f} مللي ثانية | "
+              f"تسريع ×{baseline_ms / result['wall_time_ms']:.2f} | {status}")
+        for stats in result["workers"]:
+            config = stats["config"]
+            print(f"      عامل {stats['worker']:>2}: {config['value_order']:<10} {config['tie_break']:<6} "
+                  f"{config['restart_policy']:<9} | {stats['status']:<10} | عقد: {stats.get('nodes', '-')} | "
+                  f"إعادات: {stats.get('restarts', '-')} | {stats.get('elapsed_ms', float('nan')):.1f} مللي ثانية")
@@ -0,0 +1,195 @@
+import random
+
+# مولّدات مسائل اصطناعية قابلة لإعادة الإنتاج (عبر seed) لقياس أداء الخوارزميات واختبارها
+
+# إعدادات جاهزة لكثافة القيود في generate_problem_data
+GENERATOR_PRESETS = {
+    "default": {},
+    "dense": {"precedence_density": 0.1, "chain_length": 4, "absolute_density": 0.2,
+              "unavailability_density": 0.3, "unavailable_hours": 2.0},
+    "tight": {"room_capacities": (20, 30, 40, 60), "students_range": (25, 58)},
+    "mixed_durations": {"durations": (0.5, 1.0, 1.5, 2.0)},
+}
+
+
+def generate_problem_data(num_courses, num_rooms=None, num_instructors=None, seed=0,
+                          precedence_density=0.05, chain_length=2, absolute_density=0.05,
+                          unavailability_density=0.1, unavailable_hours=1.0,
+                          room_capacities=(20, 30, 40, 60), students_range=(10, 40), durations=(1.0,)):
+    """
+    تولّد مسألة جدولة عشوائية (بنفس بنية get_problem_data_default) قابلة لإعادة الإنتاج عبر seed.
+    كثافة القيود قابلة للضبط:
+    - precedence_density: عدد سلاسل الأسبقية كنسبة من عدد الدورات، و chain_length طول كل سلسلة
+      (سلسلة بطول L تعطي L-1 قيد أسبقية متتالية: الأولى قبل الثانية قبل الثالثة...).
+    - absolute_density: نسبة الدورات ذات قيد زمني مطلق (start_after 12 أو end_before 14).
+    - unavailability_density: نسبة المحاضرين غير المتاحين لفترة طولها unavailable_hours.
+    - room_capacities و students_range: توزيع السعات وأعداد الطلاب (نطاق أعلى = سعات أضيق).
+    - durations: مدد الدورات الممكنة.
+    القيم الافتراضية تُنتج نفس المسائل السابقة لنفس seed.
+    """
+    rng = random.Random(seed)
+    if num_rooms is None:
+        num_rooms = max(3, num_courses // 5)
+    if num_instructors is None:
+        num_instructors = max(2, num_courses // 4)
+    working_start, working_end = 9.0, 17.0
+
+    instructors = [f"محاضر {i + 1}" for i in range(num_instructors)]
+
+    rooms_definition = []
+    for i in range(num_rooms):
+        rooms_definition.append({
+            "name": f"قاعة {i + 1}",
+            "capacity": rng.choice(room_capacities),
+            "available_times": [(working_start, working_end)],
+        })
+
+    courses_definition = []
+    for i in range(num_courses):
+        courses_definition.append({
+            "name": f"دورة {i + 1}",
+            "duration": durations[0] if len(durations) == 1 else rng.choice(durations),
+            "instructor": instructors[i % num_instructors],
+            "num_students": rng.randint(*students_range),
+        })
+
+    precedence_constraints = []
+    if num_courses >= chain_length >= 2:
+        for _ in range(int(num_courses * precedence_density)):
+            chain = rng.sample(courses_definition, chain_length)
+            for y_course, x_course in zip(chain, chain[1:]):
+                precedence_constraints.append({"y_course": y_course["name"], "x_course": x_course["name"]})
+
+    absolute_time_constraints = []
+    for course in rng.sample(courses_definition, int(num_courses * absolute_density)):
+        if rng.random() < 0.5:
+            absolute_time_constraints.append({"course_name": course["name"], "type": "start_after", "time_value": 12.0})
+        else:
+            absolute_time_constraints.append({"course_name": course["name"], "type": "end_before", "time_value": 14.0})
+
+    instructor_availability_constraints = []
+    for instructor in rng.sample(instructors, max(1, int(num_instructors * unavailability_density))):
+        unavailable_start = float(rng.randint(int(working_start), int(working_end - unavailable_hours) - 1))
+        instructor_availability_constraints.append({
+            "instructor_name": instructor,
+            "unavailable_times": [(unavailable_start, unavailable_start + unavailable_hours)],
+        })
+
+    return {
+        "courses": courses_definition,
+        "rooms": rooms_definition,
+        "constraints": {
+            "precedence_constraints": precedence_constraints,
+            "absolute_time_constraints": absolute_time_constraints,
+            "working_hours_constraints": {"start": working_start, "end": working_end},
+            "instructor_availability_constraints": instructor_availability_constraints,
+        },
+    }
+
+
+def generate_soft_constraints(problem_data, seed=0, room_preference_density=0.3, time_preference_density=0.5,
+                              group_density=0.1, group_size=(3, 5), balance_weight=0.05):
+    """
+    تولّد قيوداً مرنة عشوائية (soft_constraints) لمسألة مولّدة وتُرجع نسخة منها تتضمنها:
+    - room_preference_density: نسبة الدورات ذات قاعات مفضلة (1-3 قاعات، وزن 1-3).
+    - time_preference_density: نسبة المحاضرين ذوي فترة مفضلة (صباحية أو مسائية، وزن 1-2).
+    - group_density: عدد مجموعات الطلاب كنسبة من عدد الدورات، و group_size مدى حجم كل مجموعة.
+    - balance_weight: وزن توازن استخدام القاعات (0 يعطله).
+    """
+    rng = random.Random(seed)
+    course_names = [course["name"] for course in problem_data["courses"]]
+    room_names = [room["name"] for room in problem_data["rooms"]]
+    instructors = list(dict.fromkeys(course["instructor"] for course in problem_data["courses"] if course.get("instructor")))
+
+    room_preferences = []
+    for course_name in rng.sample(course_names, int(len(course_names) * room_preference_density)):
+        room_preferences.append({"course_name": course_name, "weight": float(rng.randint(1, 3)),
+                                 "rooms": rng.sample(room_names, min(len(room_names), rng.randint(1, 3)))})
+
+    instructor_time_preferences = []
+    for instructor in rng.sample(instructors, int(len(instructors) * time_preference_density)):
+        preferred_times = [(9.0, 13.0)] if rng.random() < 0.5 else [(13.0, 17.0)]
+        instructor_time_preferences.append({"instructor_name": instructor, "preferred_times": preferred_times,
+                                            "weight": float(rng.randint(1, 2))})
+
+    student_groups = []
+    if len(course_names) >= group_size[0]:
+        for _ in range(int(len(course_names) * group_density)):
+            size = min(len(course_names), rng.randint(*group_size))
+            student_groups.append({"courses": rng.sample(course_names, size), "weight": 1.0})
+
+    soft_constraints = {
+        "room_preferences": room_preferences,
+        "instructor_time_preferences": instructor_time_preferences,
+        "student_groups": student_groups,
+    }
+    if balance_weight:
+        soft_constraints["room_balance"] = {"weight": balance_weight}
+    return dict(problem_data, soft_constraints=soft_constraints)
+
+def generate_identical_rooms_problem(num_courses, num_rooms, seed=0, sections=3, load=0.9):
+    """
+    مسألة قاعات متطابقة (نفس السعة وفترات التوفر) ودورات على شكل شُعب متطابقة (sections شعبة لكل دورة بنفس
+    المحاضر والمدة وعدد الطلاب)، وعدد ساعات عمل (مقرَّب) يجعل نسبة الدورات إلى ساعات القاعات قرابة load
+    (نسبة أكبر من 1 تعني مسألة بلا حل يجب استكشاف فضائها كاملاً لإثبات ذلك).
+    """
+    hours = max(1, round(num_courses / (num_rooms * load)))
+    problem_data = generate_problem_data(num_courses, num_rooms=num_rooms, seed=seed, precedence_density=0.0,
+                                         absolute_density=0.0, unavailability_density=0.0, room_capacities=(40,))
+    for room in problem_data["rooms"]:
+        room["available_times"] = [(9.0, 9.0 + hours)]
+    courses = problem_data["courses"]
+    for index, course in enumerate(courses):
+        leader = courses[index - index % sections]
+        course.update(instructor=f"محاضر {index // sections + 1}", duration=leader["duration"],
+                      num_students=leader["num_students"])
+    constraints = problem_data["constraints"]
+    constraints["working_hours_constraints"] = {"start": 9.0, "end": 9.0 + hours}
+    constraints["instructor_availability_constraints"] = []
+    return problem_data
+
+def generate_chain_problem(num_courses, chain_length, seed=0, slack=0.0):
+    """
+    مسألة سلاسل أسبقية طويلة: الدورات مقسمة إلى سلاسل متتالية بطول chain_length (كل دورة قبل التي تليها)،
+    لكل دورة محاضر خاص وقاعة لكل سلسلة، وساعات العمل = مجموع مدد أطول سلسلة + slack.
+    slack سالب يعني أن السلاسل لا تتسع لساعات العمل (مسألة بلا حل)، و 0 يعني أن كل سلسلة تملأ اليوم بالضبط.
+    """
+    num_chains = -(-num_courses // chain_length)
+    problem_data = generate_problem_data(num_courses, num_rooms=num_chains, num_instructors=num_courses, seed=seed,
+                                         precedence_density=0.0, absolute_density=0.0, unavailability_density=0.0,
+                                         room_capacities=(60,))
+    courses = problem_data["courses"]
+    constraints = problem_data["constraints"]
+    constraints["instructor_availability_constraints"] = []
+    constraints["precedence_constraints"] = [
+        {"y_course": courses[index - 1]["name"], "x_course": courses[index]["name"]}
+        for index in range(1, num_courses) if index % chain_length]
+    longest = max(sum(course["duration"] for course in courses[first:first + chain_length])
+                  for first in range(0, num_courses, chain_length))
+    working_start = constraints["working_hours_constraints"]["start"]
+    constraints["working_hours_constraints"] = {"start": working_start, "end": working_start + longest + slack}
+    for room in problem_data["rooms"]:
+        room["available_times"] = [(working_start, working_start + longest + slack)]
+    return problem_data
+
+def generate_student_enrollments(problem_data, num_students, courses_per_student=(3, 5), program_size=6,
+                                 elective_rate=0.2, seed=0):
+    """
+    تضيف تسجيلات طلاب (constraints["student_enrollments"]) إلى problem_data وتُرجعها: الدورات مقسمة إلى برامج
+    من program_size دورة متتالية، وكل طالب يسجل في عدد من courses_per_student دورات من برنامج واحد،
+    ومع الاحتمال elective_rate في دورة اختيارية من أي برنامج (فيبقى رسم التعارض متفرقاً كما في الواقع).
+    """
+    rng = random.Random(seed)
+    course_names = [course["name"] for course in problem_data["courses"]]
+    programs = [course_names[first:first + program_size] for first in range(0, len(course_names), program_size)]
+    enrollments = []
+    for student_index in range(num_students):
+        program = rng.choice(programs)
+        enrolled = rng.sample(program, min(len(program), rng.randint(*courses_per_student)))
+        if rng.random() < elective_rate:
+            elective = rng.choice(course_names)
+            if elective not in enrolled:
+                enrolled.append(elective)
+        enrollments.append({"student": f"طالب {student_index + 1}", "courses": enrolled})
+    problem_data["constraints"]["student_enrollments"] = enrollments
+    return problem_data
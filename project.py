@@ -1,5 +1,18 @@
+import bisect
 import copy
+import hashlib
+import json
+import math
+import random
 import time
+from array import array
+from collections import deque
+from json.encoder import encode_basestring as _encode_json_string
+
+try:
+    import numpy as np
+except ImportError:  # NumPy اختيارية: بدونها تُبنى مصفوفة الجدوى بحلقات بايثون
+    np = None
 
 # تعريف بيانات المشكلة 
 def get_problem_data_default():
@@ -83,7 +96,424 @@ def print_schedule_table(schedule, problem_data, title="جدول الدورات"
     print("\n")
 
 
+#  تحويل بيانات المشكلة إلى نموذج مفهرس (compiled model) 
+
+def compile_problem(problem_data):
+    """
+    تحوّل قاموس problem_data (كما تُرجعه get_problem_data_default) إلى نموذج مفهرس:
+    معرّفات صحيحة للدورات والقاعات والمحاضرين، وقوائم القيود لكل دورة أو محاضر،
+    ومصفوفات لمدد الدورات وأعداد الطلاب وسعات القاعات.
+    النموذج قاموس يحتوي أيضاً المفاتيح الأصلية (courses, rooms, constraints)،
+    لذا يمكن تمريره في أي مكان يُتوقع فيه problem_data.
+    """
+    constraints = problem_data["constraints"]
+    courses = problem_data["courses"]
+    rooms = problem_data["rooms"]
+
+    model = dict(problem_data)
+
+    instructor_ids = {}
+    instructor_names = []
+    course_ids = {}
+    course_names = []
+    course_durations = array("d")
+    course_students = array("d")
+    course_instructor = array("i")
+    for course_id, course in enumerate(courses):
+        course_ids.setdefault(course["name"], course_id)
+        course_names.append(course["name"])
+        course_durations.append(course["duration"])
+        course_students.append(course["num_students"])
+        instructor_name = course.get("instructor")
+        if instructor_name:
+            if instructor_name not in instructor_ids:
+                instructor_ids[instructor_name] = len(instructor_names)
+                instructor_names.append(instructor_name)
+            course_instructor.append(instructor_ids[instructor_name])
+        else:
+            course_instructor.append(-1)
+
+    room_ids = {}
+    room_names = []
+    room_capacities = array("d")
+    room_available_times = []
+    for room_id, room in enumerate(rooms):
+        room_ids.setdefault(room["name"], room_id)
+        room_names.append(room["name"])
+        room_capacities.append(room["capacity"])
+        room_available_times.append(list(room["available_times"]))
+
+    # مجموعة القاعات المسموح بها لكل دورة (الحقل الاختياري "rooms")؛ None تعني أي قاعة
+    course_allowed_rooms = []
+    for course in courses:
+        allowed_names = course.get("rooms")
+        course_allowed_rooms.append(None if allowed_names is None else
+                                    frozenset(room_ids[name] for name in allowed_names if name in room_ids))
+
+    # قيود الأسبقية لكل دورة: السوابق (y) التي يجب أن تنتهي قبل بدء الدورة (x)، واللواحق
+    course_predecessors = [[] for _ in courses]
+    course_successors = [[] for _ in courses]
+    for p_const in constraints.get("precedence_constraints", []):
+        x_id = course_ids.get(p_const["x_course"])
+        y_id = course_ids.get(p_const["y_course"])
+        if x_id is None or y_id is None:
+            continue
+        course_predecessors[x_id].append(y_id)
+        course_successors[y_id].append(x_id)
+
+    # ترتيب طوبولوجي لرسم الأسبقية (خوارزمية Kahn)، أو None إذا احتوى دورة (فلا يوجد أي حل)
+    remaining_predecessors = [len(predecessors) for predecessors in course_predecessors]
+    precedence_order = [course_id for course_id, count in enumerate(remaining_predecessors) if count == 0]
+    for course_id in precedence_order:
+        for x_id in course_successors[course_id]:
+            remaining_predecessors[x_id] -= 1
+            if remaining_predecessors[x_id] == 0:
+                precedence_order.append(x_id)
+    if len(precedence_order) < len(courses):
+        precedence_order = None
+
+    course_absolute_constraints = [[] for _ in courses]
+    for abs_const in constraints.get("absolute_time_constraints", []):
+        course_id = course_ids.get(abs_const["course_name"])
+        if course_id is not None:
+            course_absolute_constraints[course_id].append((abs_const["type"], abs_const["time_value"]))
+
+    instructor_unavailable_times = [[] for _ in instructor_names]
+    for inst_const in constraints.get("instructor_availability_constraints", []):
+        instructor_id = instructor_ids.get(inst_const["instructor_name"])
+        if instructor_id is not None:
+            instructor_unavailable_times[instructor_id].extend(tuple(t) for t in inst_const["unavailable_times"])
+
+    # تسجيل الطلاب (student_enrollments): bitset طلاب لكل دورة (البت رقم معرّف الطالب)، ومنه رسم تعارض
+    # الدورات: دورتان تشتركان في طالب لا يجوز أن تتداخلا زمنياً. course_conflicts[c] = {دورة: عدد الطلاب
+    # المشتركين} و course_conflict_masks[c] bitset فوق معرّفات الدورات، فيصبح فحص التعارض وحساب درجته عمليات بتات.
+    student_ids = {}
+    student_names = []
+    course_student_bits = [0] * len(courses)
+    for enrollment in constraints.get("student_enrollments", []):
+        student_name = enrollment["student"]
+        student_id = student_ids.get(student_name)
+        if student_id is None:
+            student_id = student_ids[student_name] = len(student_names)
+            student_names.append(student_name)
+        bit = 1 << student_id
+        for course_name in enrollment["courses"]:
+            course_id = course_ids.get(course_name)
+            if course_id is not None:
+                course_student_bits[course_id] |= bit
+
+    # أزواج الدورات المرشحة من قوائم تسجيل كل طالب (بدلاً من مقارنة كل زوج)، والوزن من تقاطع الـ bitsets
+    course_conflicts = [{} for _ in courses]
+    course_conflict_masks = [0] * len(courses)
+    for enrollment in constraints.get("student_enrollments", []):
+        enrolled_ids = [course_ids[name] for name in dict.fromkeys(enrollment["courses"]) if name in course_ids]
+        for position, course_id in enumerate(enrolled_ids):
+            for other_id in enrolled_ids[position + 1:]:
+                if other_id == course_id or other_id in course_conflicts[course_id]:
+                    continue
+                weight = (course_student_bits[course_id] & course_student_bits[other_id]).bit_count()
+                course_conflicts[course_id][other_id] = weight
+                course_conflicts[other_id][course_id] = weight
+                course_conflict_masks[course_id] |= 1 << other_id
+                course_conflict_masks[other_id] |= 1 << course_id
+
+    working_hours_const = constraints["working_hours_constraints"]
+
+    # القيود المرنة (soft_constraints): تفضيلات موزونة لا تمنع الحل لكنها تحدد كلفته
+    soft_constraints = problem_data.get("soft_constraints") or {}
+    course_room_preferences = [[] for _ in courses]
+    for room_pref in soft_constraints.get("room_preferences", []):
+        course_id = course_ids.get(room_pref["course_name"])
+        if course_id is not None:
+            preferred_rooms = frozenset(room_ids[name] for name in room_pref["rooms"] if name in room_ids)
+            course_room_preferences[course_id].append((preferred_rooms, room_pref.get("weight", 1.0)))
+
+    instructor_time_preferences = [[] for _ in instructor_names]
+    for time_pref in soft_constraints.get("instructor_time_preferences", []):
+        instructor_id = instructor_ids.get(time_pref["instructor_name"])
+        if instructor_id is not None:
+            instructor_time_preferences[instructor_id].append(
+                ([tuple(t) for t in time_pref["preferred_times"]], time_pref.get("weight", 1.0)))
+
+    student_groups = []
+    course_student_groups = [[] for _ in courses]
+    for group in soft_constraints.get("student_groups", []):
+        member_ids = tuple(dict.fromkeys(course_ids[name] for name in group["courses"] if name in course_ids))
+        if len(member_ids) < 2:
+            continue
+        for course_id in member_ids:
+            course_student_groups[course_id].append(len(student_groups))
+        student_groups.append((member_ids, group.get("weight", 1.0)))
+
+    model.update({
+        "course_ids": course_ids,
+        "course_names": course_names,
+        "course_durations": course_durations,
+        "course_students": course_students,
+        "course_instructor": course_instructor,
+        "instructor_ids": instructor_ids,
+        "instructor_names": instructor_names,
+        "room_ids": room_ids,
+        "room_names": room_names,
+        "room_capacities": room_capacities,
+        "room_available_times": room_available_times,
+        "course_allowed_rooms": course_allowed_rooms,
+        "course_predecessors": course_predecessors,
+        "course_successors": course_successors,
+        "precedence_order": precedence_order,
+        "course_absolute_constraints": course_absolute_constraints,
+        "student_ids": student_ids,
+        "student_names": student_names,
+        "course_student_bits": course_student_bits,
+        "course_conflicts": course_conflicts,
+        "course_conflict_masks": course_conflict_masks,
+        "instructor_unavailable_times": instructor_unavailable_times,
+        "working_hours": (working_hours_const["start"], working_hours_const["end"]),
+        "course_room_preferences": course_room_preferences,
+        "instructor_time_preferences": instructor_time_preferences,
+        "student_groups": student_groups,
+        "course_student_groups": course_student_groups,
+        "room_balance_weight": (soft_constraints.get("room_balance") or {}).get("weight", 0.0),
+    })
+    return model
+
+def get_compiled_problem(problem_data):
+    """تُرجع النموذج المفهرس كما هو إن كان مُجمّعاً مسبقاً، وإلا تجمّعه."""
+    if "course_ids" in problem_data:
+        return problem_data
+    return compile_problem(problem_data)
+
+def _canonical_json(value):
+    """
+    نص JSON قانوني لبيانات المشكلة لا يعتمد على الترتيب: مفاتيح القواميس مرتبة، والقوائم تُرتب (الدورات،
+    القاعات، عناصر القيود، الفترات...) عدا قوائم الأرقام كالفترة (بداية، نهاية) التي يُحفظ ترتيبها،
+    والأعداد الصحيحة تُكتب كعشرية. يُبنى النص من الأسفل إلى الأعلى فيُرتَّب كل عنصر بنصه مرة واحدة.
+    """
+    if isinstance(value, dict):
+        return "{" + ",".join(_encode_json_string(str(key)) + ":" + _canonical_json(value[key])
+                              for key in sorted(value, key=str)) + "}"
+    if isinstance(value, (list, tuple)):
+        if all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value):
+            return "[" + ",".join(repr(float(item)) for item in value) + "]"
+        return "[" + ",".join(sorted(_canonical_json(item) for item in value)) + "]"
+    if isinstance(value, str):
+        return _encode_json_string(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(float(value))
+    return json.dumps(value)
+
+def problem_fingerprint(problem_data):
+    """
+    بصمة SHA-256 قانونية للمسألة (الدورات، القاعات، كل قوائم القيود، والقيود المرنة إن وُجدت):
+    نفس المسألة بترتيب مختلف للعناصر أو بأعداد صحيحة بدل العشرية تعطي البصمة نفسها.
+    تقبل problem_data خاماً أو نموذجاً مفهرساً.
+    """
+    payload = _canonical_json({key: problem_data[key] for key in ("courses", "rooms", "constraints", "soft_constraints")
+                               if problem_data.get(key)})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+#  تمثيل مضغوط للجدول داخل الخوارزميات 
+#  بدلاً من قاموس (اسم الدورة ← قاموس start_time/end_time/room) تُحفظ ثلاث مصفوفات متوازية مفهرسة بمعرّف
+#  الدورة: start و end (array("d")، وقيمة NaN تعني غير مجدولة) و room (array("i")، معرّف القاعة أو ‎-1).
+#  النسخ نسخ ذاكرة متصلة والقراءة لا تحتاج تجزئة نصوص، ويتم التحويل من صيغة القاموس وإليها عند حدود
+#  الواجهة فقط (compact_schedule / expand_schedule).
+
+def new_compact_schedule(problem_data):
+    """جدول مضغوط فارغ (كل الدورات غير مجدولة) بطول عدد الدورات في النموذج."""
+    num_courses = len(get_compiled_problem(problem_data)["course_names"])
+    return {"start": array("d", [math.nan]) * num_courses, "end": array("d", [math.nan]) * num_courses,
+            "room": array("i", [-1]) * num_courses}
+
+def copy_compact_schedule(compact):
+    """نسخة مستقلة من الجدول المضغوط (ثلاث نسخ ذاكرة متصلة)."""
+    return {"start": compact["start"][:], "end": compact["end"][:], "room": compact["room"][:]}
+
+def compact_schedule(schedule, problem_data):
+    """
+    تحوّل جدولاً بصيغة القاموس إلى جدول مضغوط. end_time الناقص يُحسب من المدة، والقاعات غير المعروفة
+    في النموذج تصبح ‎-1. الدورات المكررة الاسم تُعامل كأول دورة بالاسم نفسه كما في دوال التحقق.
+    """
+    model = get_compiled_problem(problem_data)
+    compact = new_compact_schedule(model)
+    for course_name, details in schedule.items():
+        course_id = model["course_ids"].get(course_name)
+        start_time = details.get("start_time")
+        if course_id is None or start_time is None:
+            continue
+        end_time = details.get("end_time")
+        compact["start"][course_id] = start_time
+        compact["end"][course_id] = start_time + model["course_durations"][course_id] if end_time is None else end_time
+        compact["room"][course_id] = model["room_ids"].get(details.get("room"), -1)
+    return compact
+
+def expand_schedule(compact, problem_data, course_names=None):
+    """
+    تحوّل جدولاً مضغوطاً إلى صيغة القاموس لأسماء الدورات course_names (الافتراضي: كل الأسماء الفريدة)؛
+    الدورات غير المجدولة تُعاد بقيم None.
+    """
+    model = get_compiled_problem(problem_data)
+    if course_names is None:
+        course_names = dict.fromkeys(model["course_names"])
+    room_names = model["room_names"]
+    starts, ends, rooms = compact["start"], compact["end"], compact["room"]
+    schedule = {}
+    for course_name in course_names:
+        course_id = model["course_ids"][course_name]
+        start_time = starts[course_id]
+        if start_time != start_time:  # NaN: غير مجدولة
+            schedule[course_name] = {"start_time": None, "end_time": None, "room": None}
+        else:
+            room_id = rooms[course_id]
+            schedule[course_name] = {"start_time": start_time, "end_time": ends[course_id],
+                                     "room": room_names[room_id] if room_id >= 0 else None}
+    return schedule
+
+#  جداول الإشغال (occupancy) لكل قاعة ولكل محاضر 
+#  كل مورد يحتفظ بقائمة فترات (start, end, course_id) مرتبة حسب البداية. الخوارزمية لا تضيف
+#  دورة إلا بعد نجاح فحص التداخل، لذا تبقى فترات كل مورد غير متداخلة وتكون نهاياتها مرتبة أيضاً،
+#  ويكفي فحص الفترة السابقة مباشرة لموضع الإدراج (O(log n) عبر bisect).
+
+def new_occupancy():
+    """
+    تُنشئ جداول إشغال فارغة للقاعات والمحاضرين، و bitset الدورات المجدولة (scheduled) مع فتراتها (times)
+    لفحص تعارض الطلاب: تقاطع scheduled مع course_conflict_masks للدورة يعطي مباشرة الدورات المجدولة التي
+    تشاركها طلاباً، ولا تُقارن فتراتها إلا مع هذه الدورات.
+    overlapping مفاتيح الموارد (("rooms", القاعة) أو ("instructors", المحاضر)) التي سُجلت فيها فترات متداخلة
+    (جدول غير صالح مبني بـ build_occupancy)؛ فحصها يمسح كل الفترات السابقة بدل أقربها.
+    """
+    return {"rooms": {}, "instructors": {}, "scheduled": 0, "times": {}, "overlapping": set()}
+
+def _occupancy_resources(occupancy, model, course_id, room):
+    """تُرجع أزواج (مفتاح المورد، قائمة فتراته) للموارد التي تشغلها الدورة (القاعة والمحاضر)."""
+    resources = []
+    if room:
+        resources.append((("rooms", room), occupancy["rooms"].setdefault(room, [])))
+    instructor_id = model["course_instructor"][course_id]
+    if instructor_id >= 0:
+        resources.append((("instructors", instructor_id), occupancy["instructors"].setdefault(instructor_id, [])))
+    return resources
+
+def occupancy_add(occupancy, model, course_id, start_time, end_time, room):
+    """
+    تسجل إشغال الدورة لقاعتها ومحاضرها وطلابها في الفترة [start_time, end_time). القائمة مرتبة بالبداية، فإن
+    كانت بلا تداخل قبل الإضافة فالفترة الجديدة تتداخل مع شيء منها فقط إذا تداخلت مع جارتيها.
+    """
+    for resource_key, intervals in _occupancy_resources(occupancy, model, course_id, room):
+        index = bisect.bisect_left(intervals, (start_time, end_time, course_id))
+        intervals.insert(index, (start_time, end_time, course_id))
+        if (index > 0 and intervals[index - 1][1] > start_time) or \
+           (index + 1 < len(intervals) and intervals[index + 1][0] < end_time):
+            occupancy["overlapping"].add(resource_key)
+    if model["course_conflict_masks"][course_id]:
+        occupancy["scheduled"] |= 1 << course_id
+        occupancy["times"][course_id] = (start_time, end_time)
+
+def occupancy_remove(occupancy, model, course_id, start_time, end_time, room):
+    """تلغي إشغالاً سبق تسجيله بواسطة occupancy_add (المورد يبقى في overlapping احتياطاً)."""
+    for _, intervals in _occupancy_resources(occupancy, model, course_id, room):
+        index = bisect.bisect_left(intervals, (start_time, end_time, course_id))
+        if index < len(intervals) and intervals[index] == (start_time, end_time, course_id):
+            del intervals[index]
+    if occupancy["times"].get(course_id) == (start_time, end_time):
+        occupancy["scheduled"] &= ~(1 << course_id)
+        del occupancy["times"][course_id]
+
+def _student_conflicts(occupancy, model, course_id, start_time, end_time):
+    """تُرجع معرّفات الدورات المجدولة التي تشارك الدورة طلاباً وتتداخل فتراتها مع [start_time, end_time)."""
+    candidates = model["course_conflict_masks"][course_id] & occupancy["scheduled"]
+    times = occupancy["times"]
+    conflicting = []
+    while candidates:
+        low_bit = candidates & -candidates
+        candidates ^= low_bit
+        other_id = low_bit.bit_length() - 1
+        other_start, other_end = times[other_id]
+        if start_time < other_end and other_start < end_time:
+            conflicting.append(other_id)
+    return conflicting
+
+def _intervals_conflict(intervals, course_id, start_time, end_time, overlapping=False):
+    """
+    تتحقق من وجود فترة (لدورة أخرى) تتداخل مع [start_time, end_time). في قائمة بلا تداخل تكفي أقرب فترة
+    تبدأ قبل end_time؛ مع overlapping=True قد تحتوي فترة أسبق على فترات أقصر، فتُمسح كل الفترات السابقة.
+    """
+    index = bisect.bisect_left(intervals, (end_time,))
+    if overlapping:
+        return any(other_course_id != course_id and start_time < other_end
+                   for _, other_end, other_course_id in intervals[:index])
+    while index > 0:
+        index -= 1
+        other_start, other_end, other_course_id = intervals[index]
+        if other_course_id != course_id:
+            return start_time < other_end and other_start < end_time
+    return False
+
+def occupancy_has_conflict(occupancy, model, course_id, start_time, end_time, room):
+    """تتحقق مما إذا كانت القاعة أو المحاضر أو أحد طلاب الدورة مشغولين بدورة أخرى خلال الفترة المقترحة."""
+    overlapping = occupancy["overlapping"]
+    if room:
+        intervals = occupancy["rooms"].get(room)
+        if intervals and _intervals_conflict(intervals, course_id, start_time, end_time,
+                                             ("rooms", room) in overlapping):
+            return True
+    instructor_id = model["course_instructor"][course_id]
+    if instructor_id >= 0:
+        intervals = occupancy["instructors"].get(instructor_id)
+        if intervals and _intervals_conflict(intervals, course_id, start_time, end_time,
+                                             ("instructors", instructor_id) in overlapping):
+            return True
+    if model["course_conflict_masks"][course_id] & occupancy["scheduled"]:
+        return bool(_student_conflicts(occupancy, model, course_id, start_time, end_time))
+    return False
+
+def occupancy_conflicting_courses(occupancy, model, course_id, start_time, end_time, room):
+    """تُرجع معرّفات الدورات الأخرى التي تشغل القاعة أو المحاضر أو تشارك الدورة طلاباً خلال الفترة المقترحة."""
+    conflicting = []
+    resources = []
+    if room and occupancy["rooms"].get(room):
+        resources.append((("rooms", room), occupancy["rooms"][room]))
+    instructor_id = model["course_instructor"][course_id]
+    if instructor_id >= 0 and occupancy["instructors"].get(instructor_id):
+        resources.append((("instructors", instructor_id), occupancy["instructors"][instructor_id]))
+    for resource_key, intervals in resources:
+        # بلا تداخل: أول فترة تنتهي قبل start_time تعني أن كل ما قبلها ينتهي قبلها أيضاً
+        stop_early = resource_key not in occupancy["overlapping"]
+        index = bisect.bisect_left(intervals, (end_time,))
+        while index > 0:
+            index -= 1
+            _, other_end, other_course_id = intervals[index]
+            if other_course_id == course_id:
+                continue
+            if other_end <= start_time:
+                if stop_early:
+                    break
+                continue
+            if other_course_id not in conflicting:
+                conflicting.append(other_course_id)
+    for other_course_id in _student_conflicts(occupancy, model, course_id, start_time, end_time):
+        if other_course_id not in conflicting:
+            conflicting.append(other_course_id)
+    return conflicting
+
+def build_occupancy(curr_schedule, problem_data):
+    """تبني جداول الإشغال من الدورات المجدولة مسبقاً في الجدول."""
+    model = get_compiled_problem(problem_data)
+    occupancy = new_occupancy()
+    for course_name, details in curr_schedule.items():
+        course_id = model["course_ids"].get(course_name)
+        if course_id is None or details.get("start_time") is None:
+            continue
+        end_time = details.get("end_time")
+        if end_time is None:
+            end_time = details["start_time"] + model["course_durations"][course_id]
+        occupancy_add(occupancy, model, course_id, details["start_time"], end_time, details.get("room"))
+    return occupancy
+
+
 #  دوال التحقق من القيود (منطق الخوارزمية) 
+#  جميع الدوال تقبل problem_data خاماً أو نموذجاً مفهرساً؛ يُفضّل تمرير النموذج لتجنب إعادة التجميع.
+#  check_all_constraints و explain_constraint_violation تجمّعان problem_data الخام مرة واحدة لكل استدعاء
+#  وتمرران النموذج إلى دوال التحقق الفرعية، والنموذج المُجمّع يُستخدم كما هو دون نسخ.
 
 def get_course_details(course_name, courses_definition):
     """تسترجع خصائص دورة معينة."""
@@ -104,105 +534,168 @@ def check_working_hours(curr_course_schedule, course_name, problem_data):
     if curr_course_schedule[course_name].get("start_time") is None:
         return True
 
+    model = get_compiled_problem(problem_data)
     start_time = curr_course_schedule[course_name]["start_time"]
     end_time = curr_course_schedule[course_name]["end_time"]
-    working_hours_const = problem_data["constraints"]["working_hours_constraints"]
+    working_start, working_end = model["working_hours"]
 
-    if not (working_hours_const["start"] <= start_time and
-            end_time <= working_hours_const["end"]):
+    if not (working_start <= start_time and end_time <= working_end):
         return False
     return True
 
 def check_precedence_constraint(curr_schedule, course_name, problem_data):
-    """تتأكد أن الدورة السابقة قد انتهت قبل أن تبدأ الدورة الحالية."""
+    """
+    تتأكد أن الدورات السابقة قد انتهت قبل أن تبدأ الدورة الحالية، وأن الدورات اللاحقة المجدولة
+    مسبقاً تبدأ بعد انتهائها (أي أن القيد يُفحص مهما كان ترتيب جدولة الدورتين).
+    """
     if curr_schedule[course_name].get("start_time") is None:
         return True
 
-    precedence_constraints = problem_data["constraints"]["precedence_constraints"]
-    
-    for p_const in precedence_constraints:
-        if p_const["x_course"] == course_name:
-            y_course_name = p_const["y_course"]
-            if y_course_name in curr_schedule and curr_schedule[y_course_name].get("start_time") is not None:
-                y_end_time = curr_schedule[y_course_name]["end_time"]
-                x_start_time = curr_schedule[course_name]["start_time"]
-                
-                if x_start_time < y_end_time:
-                    return False
+    model = get_compiled_problem(problem_data)
+    course_id = model["course_ids"].get(course_name)
+    if course_id is None:
+        return True
+
+    course_names = model["course_names"]
+    x_start_time = curr_schedule[course_name]["start_time"]
+    for y_id in model["course_predecessors"][course_id]:
+        y_course_schedule = curr_schedule.get(course_names[y_id])
+        if y_course_schedule is not None and y_course_schedule.get("start_time") is not None:
+            if x_start_time < y_course_schedule["end_time"]:
+                return False
+
+    y_end_time = curr_schedule[course_name].get("end_time")
+    if y_end_time is None:
+        y_end_time = x_start_time + model["course_durations"][course_id]
+    for x_id in model["course_successors"][course_id]:
+        x_course_schedule = curr_schedule.get(course_names[x_id])
+        if x_course_schedule is not None and x_course_schedule.get("start_time") is not None:
+            if x_course_schedule["start_time"] < y_end_time:
+                return False
     return True
 
+def _violates_absolute_time(const_type, time_value, start_time, end_time):
+    """تُرجع True إذا خالفت الفترة [start_time, end_time] قيداً زمنياً مطلقاً واحداً."""
+    if const_type == "start_after" and start_time < time_value:
+        return True
+    elif const_type == "start_before" and start_time > time_value:
+        return True
+    elif const_type == "end_after" and end_time < time_value:
+        return True
+    elif const_type == "end_before" and end_time > time_value:
+        return True
+    return False
+
 def check_absolute_time_constraint(curr_course_schedule, course_name, problem_data):
     """تتحقق من التزام الدورة بالقيود الزمنية المطلقة."""
     if curr_course_schedule[course_name].get("start_time") is None:
         return True
 
+    model = get_compiled_problem(problem_data)
+    course_id = model["course_ids"].get(course_name)
+    if course_id is None:
+        return True
+
     start_time = curr_course_schedule[course_name]["start_time"]
     end_time = curr_course_schedule[course_name]["end_time"]
-    abso_time_consts = problem_data["constraints"]["absolute_time_constraints"]
 
-    for abs_const in abso_time_consts:
-        if abs_const["course_name"] == course_name:
-            if abs_const["type"] == "start_after" and start_time < abs_const["time_value"]:
-                return False
-            elif abs_const["type"] == "start_before" and start_time > abs_const["time_value"]:
-                return False
-            elif abs_const["type"] == "end_after" and end_time < abs_const["time_value"]:
-                return False
-            elif abs_const["type"] == "end_before" and end_time > abs_const["time_value"]:
-                return False
+    for const_type, time_value in model["course_absolute_constraints"][course_id]:
+        if _violates_absolute_time(const_type, time_value, start_time, end_time):
+            return False
     return True
 
 def check_room_capacity(curr_course_schedule, course_name, problem_data):
-    """تتحقق من أن سعة القاعة كافية لعدد طلاب الدورة."""
+    """تتحقق من أن سعة القاعة كافية لعدد طلاب الدورة وأنها من القاعات المسموح بها للدورة (إن حُددت)."""
     if curr_course_schedule[course_name].get("start_time") is None:
         return True
 
     room_name = curr_course_schedule[course_name].get("room")
     if not room_name:
         return False # يجب أن يكون هناك قاعة مخصصة
-    
-    course_details = get_course_details(course_name, problem_data["courses"])
-    room_details = get_room_details(room_name, problem_data["rooms"])
 
-    if course_details and room_details and course_details["num_students"] > room_details["capacity"]:
+    model = get_compiled_problem(problem_data)
+    course_id = model["course_ids"].get(course_name)
+    room_id = model["room_ids"].get(room_name)
+
+    if course_id is not None and room_id is not None and \
+       model["course_students"][course_id] > model["room_capacities"][room_id]:
         return False
+    if course_id is not None and room_id is not None:
+        allowed_rooms = model["course_allowed_rooms"][course_id]
+        if allowed_rooms is not None and room_id not in allowed_rooms:
+            return False
     return True
 
+def _fits_in_windows(windows, start_time, end_time):
+    """تُرجع True إذا وقعت الفترة [start_time, end_time] بالكامل داخل إحدى فترات التوفر."""
+    for window_start, window_end in windows:
+        if window_start <= start_time and end_time <= window_end:
+            return True
+    return False
+
+def check_room_availability(curr_course_schedule, course_name, problem_data):
+    """
+    تتحقق من أن الدورة تقع بالكامل داخل إحدى فترات توفر القاعة (قد تكون للقاعة عدة فترات).
+    القاعات غير المعرّفة تُترك لفحص سعة القاعة.
+    """
+    if curr_course_schedule[course_name].get("start_time") is None:
+        return True
+
+    model = get_compiled_problem(problem_data)
+    room_id = model["room_ids"].get(curr_course_schedule[course_name].get("room"))
+    if room_id is None:
+        return True
+
+    return _fits_in_windows(model["room_available_times"][room_id],
+                            curr_course_schedule[course_name]["start_time"],
+                            curr_course_schedule[course_name]["end_time"])
+
 def check_instructor_availability(curr_course_schedule, course_name, problem_data):
     """تتحقق من توفر المحاضر في الوقت المجدول للدورة."""
     if curr_course_schedule[course_name].get("start_time") is None:
         return True
 
-    course_details = get_course_details(course_name, problem_data["courses"])
-    if not course_details: return True # لا يوجد تفاصيل للدورة
+    model = get_compiled_problem(problem_data)
+    course_id = model["course_ids"].get(course_name)
+    if course_id is None: return True # لا يوجد تفاصيل للدورة
+
+    instructor_id = model["course_instructor"][course_id]
+    if instructor_id < 0:
+        return True
 
-    instructor_name = course_details["instructor"]
-    
     start_time = curr_course_schedule[course_name]["start_time"]
     end_time = curr_course_schedule[course_name]["end_time"]
 
-    instructor_constraints = problem_data["constraints"].get("instructor_availability_constraints", [])
-
-    for inst_const in instructor_constraints:
-        if inst_const["instructor_name"] == instructor_name:
-            for unavailable_start, unavailable_end in inst_const["unavailable_times"]:
-                # If course time overlaps with instructor unavailable time
-                if (start_time < unavailable_end and unavailable_start < end_time):
-                    return False
+    for unavailable_start, unavailable_end in model["instructor_unavailable_times"][instructor_id]:
+        # If course time overlaps with instructor unavailable time
+        if (start_time < unavailable_end and unavailable_start < end_time):
+            return False
     return True
 
-def check_no_overlap_constraints(curr_schedule, current_course_name, problem_data):
-    """تتأكد أن الدورة الحالية لا تتداخل زمنيًا مع أي دورة أخرى مجدولة (قاعة أو محاضر)."""
+def check_no_overlap_constraints(curr_schedule, current_course_name, problem_data, occupancy=None):
+    """
+    تتأكد أن الدورة الحالية لا تتداخل زمنيًا مع أي دورة أخرى مجدولة (قاعة أو محاضر أو طلاب مشتركون).
+    إذا مُرّرت جداول الإشغال (occupancy) يتم الفحص عبرها بدلاً من المرور على كل الجدول.
+    """
     if curr_schedule[current_course_name].get("start_time") is None:
         return True
 
-    current_course_details = get_course_details(current_course_name, problem_data["courses"])
-    if not current_course_details: return True
+    model = get_compiled_problem(problem_data)
+    course_ids = model["course_ids"]
+    course_instructor = model["course_instructor"]
+    course_durations = model["course_durations"]
+
+    current_course_id = course_ids.get(current_course_name)
+    if current_course_id is None: return True
 
     current_start = curr_schedule[current_course_name]["start_time"]
     current_end = curr_schedule[current_course_name]["end_time"]
     current_room = curr_schedule[current_course_name].get("room")
-    current_instructor = current_course_details["instructor"]
+    current_instructor = course_instructor[current_course_id]
+    current_conflict_mask = model["course_conflict_masks"][current_course_id]
+
+    if occupancy is not None:
+        return not occupancy_has_conflict(occupancy, model, current_course_id, current_start, current_end, current_room)
 
     for other_course_name, other_schedule_details in curr_schedule.items():
         if other_course_name == current_course_name:
@@ -211,19 +704,16 @@ def check_no_overlap_constraints(curr_schedule, current_course_name, problem_dat
         if other_schedule_details.get("start_time") is None:
             continue
 
-        if other_schedule_details.get("end_time") is None:
-            other_course_details = get_course_details(other_course_name, problem_data["courses"])
-            if other_course_details and other_schedule_details.get("start_time") is not None:
-                other_schedule_details["end_time"] = other_schedule_details["start_time"] + other_course_details["duration"]
-            else:
-                continue
-            
+        other_course_id = course_ids.get(other_course_name)
+        if other_course_id is None: continue
+
+        # end_time الناقص يُحسب محلياً دون تعديل مدخل الدورة الأخرى
         other_start = other_schedule_details["start_time"]
-        other_end = other_schedule_details["end_time"]
+        other_end = other_schedule_details.get("end_time")
+        if other_end is None:
+            other_end = other_start + course_durations[other_course_id]
         other_room = other_schedule_details.get("room")
-        other_course_details = get_course_details(other_course_name, problem_data["courses"])
-        if not other_course_details: continue
-        other_instructor = other_course_details["instructor"]
+        other_instructor = course_instructor[other_course_id]
 
         # تحقق من التداخل الزمني
         if (current_start < other_end and other_start < current_end):
@@ -231,64 +721,476 @@ def check_no_overlap_constraints(curr_schedule, current_course_name, problem_dat
             if current_room and other_room and current_room == other_room:
                 return False
             # تعارض محاضر
-            if current_instructor and other_instructor and current_instructor == other_instructor:
+            if current_instructor >= 0 and current_instructor == other_instructor:
+                return False
+            # تعارض طلاب مسجلين في الدورتين
+            if current_conflict_mask >> other_course_id & 1:
                 return False
     return True
 
 
-def check_all_constraints(curr_schedule, course_name, problem_data):
+def check_all_constraints(curr_schedule, course_name, problem_data, occupancy=None):
     """
     الدالة الرئيسية التي تنسق عملية التحقق من جميع القيود.
     تُرجع True إذا كانت جميع القيود مستوفاة، False بخلاف ذلك.
+    problem_data خام أو مُجمّع: يُجمّع مرة واحدة هنا ثم يُمرَّر النموذج إلى دوال التحقق الفرعية.
+    occupancy (اختياري) يُمرَّر لفحص التداخل عبر جداول الإشغال.
     """
     if course_name not in curr_schedule or curr_schedule[course_name].get("start_time") is None:
         return True 
 
-    course_details = get_course_details(course_name, problem_data["courses"])
-    if not course_details:
+    model = get_compiled_problem(problem_data)
+    course_id = model["course_ids"].get(course_name)
+    if course_id is None:
         return False
     
     # حساب end_time للدورة التي يتم فحصها حاليًا (إذا لم تكن محددة بالفعل)
     if curr_schedule[course_name].get("end_time") is None:
-        curr_schedule[course_name]["end_time"] = curr_schedule[course_name]["start_time"] + course_details["duration"]
+        curr_schedule[course_name]["end_time"] = curr_schedule[course_name]["start_time"] + model["course_durations"][course_id]
+
+    if _active_instrumentation is not None:
+        return _check_all_constraints_instrumented(curr_schedule, course_name, model, occupancy, _active_instrumentation)
 
     # استدعاء دوال التحقق الفرعية
-    if not check_working_hours(curr_schedule, course_name, problem_data):
+    if not check_working_hours(curr_schedule, course_name, model):
+        return False
+    if not check_precedence_constraint(curr_schedule, course_name, model):
         return False
-    if not check_precedence_constraint(curr_schedule, course_name, problem_data):
+    if not check_absolute_time_constraint(curr_schedule, course_name, model):
         return False
-    if not check_absolute_time_constraint(curr_schedule, course_name, problem_data):
+    if not check_room_capacity(curr_schedule, course_name, model):
         return False
-    if not check_room_capacity(curr_schedule, course_name, problem_data):
+    if not check_room_availability(curr_schedule, course_name, model):
         return False
-    if not check_instructor_availability(curr_schedule, course_name, problem_data):
+    if not check_instructor_availability(curr_schedule, course_name, model):
         return False
-    if not check_no_overlap_constraints(curr_schedule, course_name, problem_data):
+    if not check_no_overlap_constraints(curr_schedule, course_name, model, occupancy):
         return False
 
     return True 
 
+def explain_constraint_violation(curr_schedule, course_name, problem_data, occupancy=None):
+    """
+    مثل check_all_constraints لكنها تشرح سبب الرفض: تُرجع None إذا كانت القيود مستوفاة،
+    وإلا (اسم القيد، قائمة الدورات المجدولة المسببة للرفض). القيود الأحادية (ساعات العمل،
+    الوقت المطلق، سعة القاعة وتوفرها، توفر المحاضر) تُفحص أولاً وقائمة مسببيها فارغة لأنها
+    لا تعتمد على أي تعيين آخر؛ ثم الأسبقية (السوابق التي تنتهي بعد بداية الدورة واللواحق التي
+    تبدأ قبل نهايتها) والتداخل
+    (الدورات التي تشغل القاعة أو المحاضر في الفترة نفسها).
+    """
+    if course_name not in curr_schedule or curr_schedule[course_name].get("start_time") is None:
+        return None
+
+    model = get_compiled_problem(problem_data)
+    course_id = model["course_ids"].get(course_name)
+    if course_id is None:
+        return ("unknown_course", [])
+
+    entry = curr_schedule[course_name]
+    if entry.get("end_time") is None:
+        entry["end_time"] = entry["start_time"] + model["course_durations"][course_id]
+
+    if not check_working_hours(curr_schedule, course_name, model):
+        return ("working_hours", [])
+    if not check_absolute_time_constraint(curr_schedule, course_name, model):
+        return ("absolute_time", [])
+    if not check_room_capacity(curr_schedule, course_name, model):
+        return ("room_capacity", [])
+    if not check_room_availability(curr_schedule, course_name, model):
+        return ("room_availability", [])
+    if not check_instructor_availability(curr_schedule, course_name, model):
+        return ("instructor_availability", [])
+
+    course_names = model["course_names"]
+    precedence_culprits = []
+    for y_id in model["course_predecessors"][course_id]:
+        y_schedule = curr_schedule.get(course_names[y_id])
+        if y_schedule is not None and y_schedule.get("start_time") is not None and \
+           entry["start_time"] < y_schedule["end_time"]:
+            precedence_culprits.append(course_names[y_id])
+    for x_id in model["course_successors"][course_id]:
+        x_schedule = curr_schedule.get(course_names[x_id])
+        if x_schedule is not None and x_schedule.get("start_time") is not None and \
+           x_schedule["start_time"] < entry["end_time"]:
+            precedence_culprits.append(course_names[x_id])
+    if precedence_culprits:
+        return ("precedence", precedence_culprits)
+
+    if occupancy is None:
+        occupancy = build_occupancy(curr_schedule, model)
+    conflicting = occupancy_conflicting_courses(occupancy, model, course_id, entry["start_time"], entry["end_time"],
+                                                entry.get("room"))
+    if conflicting:
+        return ("overlap", [course_names[other_id] for other_id in conflicting])
+    return None
+
+
+#  أدوات قياس البحث (instrumentation) 
+#  عند التفعيل تُعدّ عقد البحث والتراجعات وأقصى عمق، واستدعاءات وزمن ومرات رفض كل دالة تحقق،
+#  وتُرسل أحداث البحث إلى دالة callback أو ملف تتبع. عند التعطيل تكلف كل نقطة قياس
+#  فحصاً واحداً لمتغير عام (_active_instrumentation is None).
+
+_active_instrumentation = None
+
+# دوال التحقق بنفس ترتيب استدعائها في check_all_constraints
+_CONSTRAINT_CHECKERS = (
+    ("check_working_hours", check_working_hours),
+    ("check_precedence_constraint", check_precedence_constraint),
+    ("check_absolute_time_constraint", check_absolute_time_constraint),
+    ("check_room_capacity", check_room_capacity),
+    ("check_room_availability", check_room_availability),
+    ("check_instructor_availability", check_instructor_availability),
+    ("check_no_overlap_constraints", check_no_overlap_constraints),
+)
+
+def start_instrumentation(callback=None, trace_path=None, time_checkers=True):
+    """
+    تفعّل القياس وتُرجع قاموس الإحصاءات الذي يُحدَّث أثناء البحث:
+    nodes، backtracks، backjumps، nogoods، nogood_prunes، max_depth، solutions، checks (استدعاءات check_all_constraints)،
+    mcv_calls و mcv_time_ms، و checkers: {اسم دالة التحقق: {"calls", "time_ms", "rejections"}}.
+    callback (اختياري) تُستدعى لكل حدث بحث بقاموس {"event", "course", "depth", "elapsed_ms"}
+    حيث event أحد node / backtrack / backjump / solution، و trace_path (اختياري) ملف JSON Lines للأحداث نفسها.
+    time_checkers=False يكتفي بعدّ الاستدعاءات دون قياس زمن كل دالة تحقق (كلفة أقل).
+    """
+    global _active_instrumentation
+    stats = {
+        "nodes": 0,
+        "backtracks": 0,
+        "backjumps": 0,
+        "nogoods": 0,
+        "nogood_prunes": 0,
+        "max_depth": 0,
+        "solutions": 0,
+        "checks": 0,
+        "mcv_calls": 0,
+        "mcv_time_ms": 0.0,
+        "checkers": {checker_name: {"calls": 0, "time_ms": 0.0, "rejections": 0}
+                     for checker_name, _ in _CONSTRAINT_CHECKERS},
+        "callback": callback,
+        "trace_file": open(trace_path, "w", encoding="utf-8") if trace_path else None,
+        "time_checkers": time_checkers,
+        "started": time.perf_counter(),
+    }
+    _active_instrumentation = stats
+    return stats
+
+def stop_instrumentation():
+    """توقف القياس وتغلق ملف التتبع وتُرجع قاموس الإحصاءات (أو None إن لم يكن مفعّلاً)."""
+    global _active_instrumentation
+    stats = _active_instrumentation
+    _active_instrumentation = None
+    if stats is None:
+        return None
+    if stats["trace_file"] is not None:
+        stats["trace_file"].close()
+    stats["elapsed_ms"] = (time.perf_counter() - stats.pop("started")) * 1000
+    for key in ("callback", "trace_file", "time_checkers"):
+        del stats[key]
+    return stats
+
+def _record_search_event(stats, event, course_name, depth):
+    """تحدّث عدادات البحث لحدث واحد وترسله إلى callback وملف التتبع إن وُجدا."""
+    if event == "backtrack":
+        stats["backtracks"] += 1
+    elif event == "backjump":
+        stats["backjumps"] += 1
+    else:
+        stats["nodes"] += 1
+        if event == "solution":
+            stats["solutions"] += 1
+        if depth > stats["max_depth"]:
+            stats["max_depth"] = depth
+
+    if stats["callback"] is None and stats["trace_file"] is None:
+        return
+    record = {"event": event, "course": course_name, "depth": depth,
+              "elapsed_ms": (time.perf_counter() - stats["started"]) * 1000}
+    if stats["callback"] is not None:
+        stats["callback"](record)
+    if stats["trace_file"] is not None:
+        stats["trace_file"].write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def _check_all_constraints_instrumented(curr_schedule, course_name, model, occupancy, stats):
+    """نفس فحوص check_all_constraints مع عدّ استدعاءات ومرات رفض (وزمن) كل دالة تحقق."""
+    stats["checks"] += 1
+    checkers = stats["checkers"]
+    time_checkers = stats["time_checkers"]
+    for checker_name, checker in _CONSTRAINT_CHECKERS:
+        if time_checkers:
+            start = time.perf_counter()
+        if checker is check_no_overlap_constraints:
+            satisfied = checker(curr_schedule, course_name, model, occupancy)
+        else:
+            satisfied = checker(curr_schedule, course_name, model)
+        checker_stats = checkers[checker_name]
+        checker_stats["calls"] += 1
+        if time_checkers:
+            checker_stats["time_ms"] += (time.perf_counter() - start) * 1000
+        if not satisfied:
+            checker_stats["rejections"] += 1
+            return False
+    return True
+
+def _assigned_depth(curr_schedule, all_course_names):
+    """عمق العقدة في شجرة البحث: عدد الدورات المجدولة."""
+    return sum(1 for c_name in all_course_names if curr_schedule[c_name].get("start_time") is not None)
+
+def format_search_stats(stats):
+    """تحوّل إحصاءات القياس إلى أسطر نصية للعرض، مع ترتيب دوال التحقق حسب الزمن ثم الاستدعاءات."""
+    lines = [
+        f"    عقد البحث: {stats['nodes']} | تراجعات: {stats['backtracks']} | قفزات خلفية: {stats['backjumps']} | "
+        f"أقصى عمق: {stats['max_depth']} | "
+        f"فحوص القيود: {stats['checks']}",
+        f"    اختيار MCV: {stats['mcv_calls']} استدعاء، {stats['mcv_time_ms']:.2f} مللي ثانية",
+    ]
+    if stats["nogoods"] or stats["nogood_prunes"]:
+        lines.append(f"    nogoods متعلَّمة: {stats['nogoods']} | قيم حُذفت بها: {stats['nogood_prunes']}")
+    ordered_checkers = sorted(stats["checkers"].items(), key=lambda item: (-item[1]["time_ms"], -item[1]["calls"]))
+    for checker_name, checker_stats in ordered_checkers:
+        if not checker_stats["calls"]:
+            continue
+        rejection_rate = checker_stats["rejections"] / checker_stats["calls"] * 100
+        lines.append(f"    {checker_name:<32} | {checker_stats['calls']:>9} استدعاء | "
+                     f"{checker_stats['time_ms']:>9.2f} مللي ثانية | رفض {checker_stats['rejections']:>8} ({rejection_rate:.1f}%)")
+    return lines
+
+
+#  التحقق من جدول كامل وإرجاع سجلات مخالفات منظّمة بدلاً من نص مطبوع 
+
+def _find_overlap_conflicts(entries, model):
+    """
+    تجد تعارضات القاعات والمحاضرين لجدول كامل بمسح خطي بعد الترتيب (O(n log n))
+    بدلاً من مقارنة كل دورة بكل الدورات، ثم تعارضات الطلاب بمقارنة كل دورة بجيرانها في رسم التعارض فقط.
+    entries: قائمة (course_id, course_name, start, end, room).
+    تُرجع قاموساً {اسم الدورة: (اسم الدورة المتعارضة، "room" أو "instructor" أو "students")}.
+    """
+    resources = {}
+    for entry in entries:
+        course_id, _, _, _, room = entry
+        if room:
+            resources.setdefault(("room", room), []).append(entry)
+        instructor_id = model["course_instructor"][course_id]
+        if instructor_id >= 0:
+            resources.setdefault(("instructor", instructor_id), []).append(entry)
+
+    conflicts = {}
+    for (kind, _), resource_entries in resources.items():
+        if len(resource_entries) < 2:
+            continue
+        resource_entries.sort(key=lambda e: e[2])
+        active = []
+        for entry in resource_entries:
+            _, course_name, start_time, end_time, _ = entry
+            active = [other for other in active if other[3] > start_time]
+            for other in active:
+                other_name, other_start, other_end = other[1], other[2], other[3]
+                if start_time < other_end and other_start < end_time:
+                    conflicts.setdefault(course_name, (other_name, kind))
+                    conflicts.setdefault(other_name, (course_name, kind))
+            active.append(entry)
+
+    course_conflicts = model["course_conflicts"]
+    entries_by_id = {}
+    for entry in entries:
+        if course_conflicts[entry[0]]:
+            entries_by_id.setdefault(entry[0], entry)
+    for course_id, course_name, start_time, end_time, _ in entries_by_id.values():
+        for other_id in course_conflicts[course_id]:
+            other = entries_by_id.get(other_id)
+            if other is not None and start_time < other[3] and other[2] < end_time:
+                conflicts.setdefault(course_name, (other[1], "students"))
+    return conflicts
+
+def validate_schedule(schedule, problem_data):
+    """
+    تتحقق من جدول (قاموس بنفس صيغة حلول الخوارزمية) وتُرجع قائمة سجلات مخالفات،
+    سجل واحد لكل دورة مخالفة يصف أول قيد تخالفه بنفس ترتيب check_all_constraints.
+    كل سجل قاموس يحتوي "course" و "constraint" وتفاصيل القيد المخالف (للأسبقية: y_course السابقة التي لم تنتهِ
+    قبل بدء الدورة، أو x_course اللاحقة التي بدأت قبل انتهائها).
+    end_time يُعاد حسابه من المدة كما في التحقق من الجداول اليدوية.
+    """
+    model = get_compiled_problem(problem_data)
+    course_ids = model["course_ids"]
+    course_names = model["course_names"]
+    course_durations = model["course_durations"]
+    working_start, working_end = model["working_hours"]
+
+    violations = []
+    entries = []
+    normalized_schedule = {}
+    for course_name, details in schedule.items():
+        course_id = course_ids.get(course_name)
+        if course_id is None:
+            violations.append({"course": course_name, "constraint": "unknown_course"})
+            continue
+        start_time = details.get("start_time")
+        if start_time is None:
+            violations.append({"course": course_name, "constraint": "unassigned"})
+            continue
+        end_time = start_time + course_durations[course_id]
+        room = details.get("room")
+        normalized_schedule[course_name] = {"start_time": start_time, "end_time": end_time, "room": room}
+        entries.append((course_id, course_name, start_time, end_time, room))
+
+    for course_name in course_names:
+        if course_name not in schedule:
+            violations.append({"course": course_name, "constraint": "unassigned"})
+
+    overlap_conflicts = _find_overlap_conflicts(entries, model)
+
+    for course_id, course_name, start_time, end_time, room in entries:
+        if not (working_start <= start_time and end_time <= working_end):
+            violations.append({"course": course_name, "constraint": "working_hours",
+                               "working_hours": (working_start, working_end)})
+            continue
+
+        late_predecessor = None
+        for y_id in model["course_predecessors"][course_id]:
+            y_schedule = normalized_schedule.get(course_names[y_id])
+            if y_schedule is not None and start_time < y_schedule["end_time"]:
+                late_predecessor = course_names[y_id]
+                break
+        if late_predecessor is not None:
+            violations.append({"course": course_name, "constraint": "precedence", "y_course": late_predecessor})
+            continue
+        # الاتجاه الآخر كما في check_precedence_constraint: لاحقة تبدأ قبل انتهاء هذه الدورة (تُكتشف هنا حتى لو
+        # سُجلت للاحقة مخالفة أسبق في الترتيب)
+        early_successor = None
+        for x_id in model["course_successors"][course_id]:
+            x_schedule = normalized_schedule.get(course_names[x_id])
+            if x_schedule is not None and x_schedule["start_time"] < end_time:
+                early_successor = course_names[x_id]
+                break
+        if early_successor is not None:
+            violations.append({"course": course_name, "constraint": "precedence", "x_course": early_successor})
+            continue
+
+        violated_absolute = next(
+            ((const_type, time_value) for const_type, time_value in model["course_absolute_constraints"][course_id]
+             if _violates_absolute_time(const_type, time_value, start_time, end_time)),
+            None)
+        if violated_absolute is not None:
+            violations.append({"course": course_name, "constraint": "absolute_time",
+                               "type": violated_absolute[0], "time_value": violated_absolute[1]})
+            continue
+
+        if not check_room_capacity(normalized_schedule, course_name, model):
+            room_id = model["room_ids"].get(room)
+            if room_id is not None and model["course_students"][course_id] <= model["room_capacities"][room_id]:
+                violations.append({"course": course_name, "constraint": "room_pool", "room": room,
+                                   "allowed_rooms": list(model["courses"][course_id]["rooms"])})
+                continue
+            violations.append({"course": course_name, "constraint": "room_capacity", "room": room,
+                               "num_students": model["courses"][course_id]["num_students"],
+                               "capacity": model["rooms"][room_id]["capacity"] if room_id is not None else None})
+            continue
+
+        if not check_room_availability(normalized_schedule, course_name, model):
+            violations.append({"course": course_name, "constraint": "room_availability", "room": room,
+                               "available_times": list(model["room_available_times"][model["room_ids"][room]])})
+            continue
+
+        if not check_instructor_availability(normalized_schedule, course_name, model):
+            instructor_id = model["course_instructor"][course_id]
+            violations.append({"course": course_name, "constraint": "instructor_availability",
+                               "instructor": model["instructor_names"][instructor_id],
+                               "unavailable_times": list(model["instructor_unavailable_times"][instructor_id])})
+            continue
+
+        if course_name in overlap_conflicts:
+            other_course, conflict_kind = overlap_conflicts[course_name]
+            violation = {"course": course_name, "constraint": "overlap", "other_course": other_course,
+                         "resource": conflict_kind}
+            if conflict_kind == "students":
+                violation["shared_students"] = model["course_conflicts"][course_id][course_ids[other_course]]
+            violations.append(violation)
+
+    return violations
+
+def format_violation(violation):
+    """تحوّل سجل مخالفة إلى سطر نصي للعرض."""
+    course_name = violation["course"]
+    constraint = violation["constraint"]
+    if constraint == "working_hours":
+        working_start, working_end = violation["working_hours"]
+        return f"    - **{course_name}**: مخالفة ساعات العمل (خارج [{working_start:.0f}:00 - {working_end:.0f}:00])."
+    if constraint == "precedence":
+        if "x_course" in violation:
+            return f"    - **{course_name}**: مخالفة قيد الأسبقية (تنتهي بعد بدء {violation['x_course']})."
+        return f"    - **{course_name}**: مخالفة قيد الأسبقية (تبدأ قبل انتهاء {violation['y_course']})."
+    if constraint == "absolute_time":
+        return f"    - **{course_name}**: مخالفة قيد الوقت المطلق ({violation['type'].replace('_', ' ')} {violation['time_value']:.1f})."
+    if constraint == "room_capacity":
+        if violation["room"] is None:
+            return f"    - **{course_name}**: مخالفة سعة القاعة (لم تُحدد قاعة)."
+        return f"    - **{course_name}**: مخالفة سعة القاعة ({violation['num_students']} طلاب > سعة {violation['room']} {violation['capacity']})."
+    if constraint == "room_pool":
+        return f"    - **{course_name}**: القاعة {violation['room']} ليست من القاعات المسموح بها ({', '.join(violation['allowed_rooms'])})."
+    if constraint == "room_availability":
+        available_times_str = ", ".join([f"[{s:.1f}-{e:.1f}]" for s, e in violation["available_times"]])
+        return f"    - **{course_name}**: مخالفة توفر القاعة ({violation['room']} غير متاحة طوال مدة الدورة، فترات التوفر: {available_times_str})."
+    if constraint == "instructor_availability":
+        unavailable_times_str = ", ".join([f"[{s:.1f}-{e:.1f}]" for s, e in violation["unavailable_times"]])
+        return f"    - **{course_name}**: مخالفة توفر المحاضر ({violation['instructor']} غير متاح في الوقت المجدول، أوقات عدم التوفر: {unavailable_times_str})."
+    if constraint == "overlap":
+        if violation.get("resource") == "students":
+            return (f"    - **{course_name}**: مخالفة تداخل زمني مع {violation['other_course']} "
+                    f"({violation['shared_students']} طالب مسجل في الدورتين).")
+        return f"    - **{course_name}**: مخالفة تداخل زمني (قاعة أو محاضر آخر مشغول)."
+    if constraint == "unassigned":
+        return f"    - **{course_name}**: الدورة غير مجدولة."
+    return f"    - **{course_name}**: دورة غير معروفة في بيانات المشكلة."
+
+
 #  خوارزمية البحث بالتراجع مع تحسين MCV والفحص الأمامي المبسّط 
 
+def _unassigned_course_mask(model, unassigned_courses):
+    """
+    bitset معرّفات الدورات غير المجدولة لحساب درجة تعارض الطلاب، أو 0 إذا لم تكن في المسألة أي
+    تسجيلات طلاب (فلا يتغير ترتيب MCV).
+    """
+    if not any(model["course_conflict_masks"]):
+        return 0
+    course_ids = model["course_ids"]
+    mask = 0
+    for course_name in unassigned_courses:
+        course_id = course_ids.get(course_name)
+        if course_id is not None:
+            mask |= 1 << course_id
+    return mask
+
+def _conflict_degree(model, course_id, unassigned_mask):
+    """درجة تعارض الطلاب: عدد الدورات غير المجدولة التي تشارك الدورة طلاباً (تقاطع bitsets وعدّ بتات)."""
+    return (model["course_conflict_masks"][course_id] & unassigned_mask).bit_count()
+
 def find_mcv_course(curr_schedule, courses_names, possible_times, problem_data):
     """
     تجد الدورة الأكثر تقييداً (Most Constrained Variable - MCV)
     التي لم يتم جدولتها بعد، بناءً على عدد التعيينات الصالحة المحتملة لها.
+    عند التساوي تُفضَّل الدورة ذات درجة تعارض الطلاب الأعلى (_conflict_degree)، ثم الأولى في الترتيب.
     """
     unassigned_courses = [c_name for c_name in courses_names if curr_schedule[c_name]["start_time"] is None]
     
     if not unassigned_courses:
         return None
 
+    stats = _active_instrumentation
+    if stats is not None:
+        mcv_start = time.perf_counter()
+
+    model = get_compiled_problem(problem_data)
+    course_ids = model["course_ids"]
+    unassigned_mask = _unassigned_course_mask(model, unassigned_courses)
     min_remaining_values = float('inf')
+    max_degree = -1
     mcv_course = None
 
     for course_name in unassigned_courses:
         num_possible_assignments = 0
-        course_details = get_course_details(course_name, problem_data["courses"])
-        if not course_details: continue
+        course_id = course_ids.get(course_name)
+        if course_id is None: continue
 
-        course_duration = course_details["duration"]
+        course_duration = model["course_durations"][course_id]
 
         for time_slot in possible_times:
             proposed_start_time = time_slot[0]
@@ -302,30 +1204,50 @@ def find_mcv_course(curr_schedule, courses_names, possible_times, problem_data):
 
             # تحقق من جميع القيود للدورة نفسها مع هذا التعيين المقترح
             # هذا جزء من عملية MCV لتحديد "أكثر تقييدًا"
-            if check_all_constraints(temp_schedule, course_name, problem_data):
+            if check_all_constraints(temp_schedule, course_name, model):
                 num_possible_assignments += 1
         
         if num_possible_assignments < min_remaining_values:
             min_remaining_values = num_possible_assignments
+            max_degree = _conflict_degree(model, course_id, unassigned_mask)
             mcv_course = course_name
-    
+        elif num_possible_assignments == min_remaining_values and unassigned_mask:
+            degree = _conflict_degree(model, course_id, unassigned_mask)
+            if degree > max_degree:
+                max_degree = degree
+                mcv_course = course_name
+
+    if stats is not None:
+        stats["mcv_calls"] += 1
+        stats["mcv_time_ms"] += (time.perf_counter() - mcv_start) * 1000
     return mcv_course
 
 def backtracking_search_optimized(curr_schedule, problem_data, all_course_names, possible_times_and_rooms):
     """
     خوارزمية البحث بالتراجع لحل مشكلة جدولة الدورات مع تحسين بسيط للفحص الأمامي.
     """
+    problem_data = get_compiled_problem(problem_data)
+
+    stats = _active_instrumentation
+
     # الشرط الأساسي للتوقف: إذا تم جدولة جميع الدورات
     if all(curr_schedule[c_name].get("start_time") is not None for c_name in all_course_names):
+        if stats is not None:
+            _record_search_event(stats, "solution", None, len(all_course_names))
         return curr_schedule
 
     # اختيار الدورة الأكثر تقييدًا (MCV) لتقليل مساحة البحث
     course_to_assign = find_mcv_course(curr_schedule, all_course_names, possible_times_and_rooms, problem_data)
+    if stats is not None:
+        depth = _assigned_depth(curr_schedule, all_course_names)
+        _record_search_event(stats, "node", course_to_assign, depth)
 
     if course_to_assign is None:
         # قد يحدث إذا لم يكن هناك دورات غير مجدولة (وتم حل المشكلة)
         # أو إذا كانت هناك دورات غير مجدولة ولكن لا توجد حلول ممكنة لها (توقف الفحص الأمامي)
         # في هذه الحالة، إذا لم يتم حلها بالكامل، لا يوجد حل.
+        if stats is not None:
+            _record_search_event(stats, "backtrack", None, depth)
         return None 
 
     # تجربة كل تعيين ممكن (وقت وقاعة) للدورة المختارة
@@ -337,9 +1259,9 @@ def backtracking_search_optimized(curr_schedule, problem_data, all_course_names,
         new_schedule = copy.deepcopy(curr_schedule)
         new_schedule[course_to_assign]["start_time"] = proposed_start_time
         
-        course_details = get_course_details(course_to_assign, problem_data["courses"])
-        if course_details:
-            new_schedule[course_to_assign]["end_time"] = proposed_start_time + course_details["duration"]
+        course_id = problem_data["course_ids"].get(course_to_assign)
+        if course_id is not None:
+            new_schedule[course_to_assign]["end_time"] = proposed_start_time + problem_data["course_durations"][course_id]
         else: # حالة استثنائية إذا لم يتم العثور على تفاصيل الدورة
             continue 
         
@@ -352,141 +1274,3385 @@ def backtracking_search_optimized(curr_schedule, problem_data, all_course_names,
             result = backtracking_search_optimized(new_schedule, problem_data, all_course_names, possible_times_and_rooms)
             if result:
                 return result # تم العثور على حل كامل
-    
+
+    if stats is not None:
+        _record_search_event(stats, "backtrack", course_to_assign, depth)
     return None # لا يمكن العثور على حل في هذا المسار ضمن هذا المسار من البحث
 
 
-def run_test_scenario(scenario_name, initial_schedule, problem_data, run_solver=False):
+#  البحث بالتراجع في المكان (in-place) باستخدام سجل تراجع (trail) بدلاً من النسخ العميق 
+
+def _set_entry(curr_schedule, course_name, start_time, end_time, room, model=None, occupancy=None):
+    """تضبط قيم الدورة في الجدول وتحدّث جداول الإشغال (إن وُجدت) بما يطابقها."""
+    entry = curr_schedule[course_name]
+    if occupancy is not None:
+        course_id = model["course_ids"][course_name]
+        if entry.get("start_time") is not None:
+            occupancy_remove(occupancy, model, course_id, entry["start_time"], entry["end_time"], entry.get("room"))
+        if start_time is not None:
+            occupancy_add(occupancy, model, course_id, start_time, end_time, room)
+    entry["start_time"] = start_time
+    entry["end_time"] = end_time
+    entry["room"] = room
+
+def _trail_assign(curr_schedule, trail, course_name, start_time, end_time, room, model=None, occupancy=None):
+    """تعيّن الدورة مباشرة في الجدول وتحفظ قيمها السابقة في السجل للتراجع عنها لاحقاً."""
+    entry = curr_schedule[course_name]
+    trail.append((course_name, entry.get("start_time"), entry.get("end_time"), entry.get("room")))
+    _set_entry(curr_schedule, course_name, start_time, end_time, room, model, occupancy)
+
+def _trail_undo(curr_schedule, trail, mark, model=None, occupancy=None):
+    """تتراجع عن جميع التعيينات المسجلة بعد الموضع mark وتعيد القيم السابقة."""
+    while len(trail) > mark:
+        course_name, start_time, end_time, room = trail.pop()
+        _set_entry(curr_schedule, course_name, start_time, end_time, room, model, occupancy)
+
+def find_mcv_course_inplace(curr_schedule, courses_names, possible_times, problem_data, occupancy=None):
     """
-    يشغل سيناريو اختبار واحد ويعرض نتائجه مع قياس الوقت.
-    إذا كانت run_solver True، فسيحاول حل الجدولة بدلاً من مجرد التحقق.
+    نسخة من find_mcv_course تعمل على الجدول نفسه دون نسخه: تُجرّب كل تعيين مؤقتاً
+    ثم تعيد قيم الدورة كما كانت. تُرجع نفس الدورة التي تختارها find_mcv_course،
+    مع التوقف عن العدّ لدورة ما بمجرد أن يبلغ عدد قيمها الصالحة أقل عدد وُجد حتى الآن
+    ودرجة تعارضها لا تتجاوز درجة الدورة المختارة (لأنها لن تصبح الأكثر تقييداً عندها).
     """
-    print(f"\n--- بدء سيناريو: {scenario_name} ---")
-    start_time_scenario = time.time() # Start timer
+    unassigned_courses = [c_name for c_name in courses_names if curr_schedule[c_name]["start_time"] is None]
 
-    all_course_names = [c["name"] for c in problem_data["courses"]]
-    
-    # بناء جدول أولي كامل بجميع الدورات مع قيم None للوقت والغرفة إذا لم يتم تحديدها
-    full_initial_schedule = {}
-    for c_name in all_course_names:
-        full_initial_schedule[c_name] = initial_schedule.get(c_name, {"start_time": None, "end_time": None, "room": None})
+    if not unassigned_courses:
+        return None
 
-    # حساب end_time لجميع الدورات في الجدول الأولي قبل بدء أي تحققات
-    temp_schedule_for_check_all = copy.deepcopy(full_initial_schedule)
-    for course_name in temp_schedule_for_check_all:
-        course_details = get_course_details(course_name, problem_data["courses"])
-        if course_details and temp_schedule_for_check_all[course_name].get("start_time") is not None:
-            temp_schedule_for_check_all[course_name]["end_time"] = temp_schedule_for_check_all[course_name]["start_time"] + course_details["duration"]
+    stats = _active_instrumentation
+    if stats is not None:
+        mcv_start = time.perf_counter()
 
-    is_initial_schedule_complete = all(full_initial_schedule[c].get("start_time") is not None for c in full_initial_schedule)
-    
-    if is_initial_schedule_complete:
-        print("  ✅ الجدول الأولي المعطى مكتمل. جاري التحقق من قيوده...")
-        
-        # Measure time for validation
-        start_validation_time = time.time()
-        
-        violated_constraints_details = []
-        is_valid_initial_schedule = True
-        
-        for course_name in temp_schedule_for_check_all:
-            if not check_all_constraints(temp_schedule_for_check_all, course_name, problem_data):
-                is_valid_initial_schedule = False
-                
-                # تحديد القيد المخالف بالتفصيل
-                if not check_working_hours(temp_schedule_for_check_all, course_name, problem_data):
-                    violated_constraints_details.append(f"    - **{course_name}**: مخالفة ساعات العمل (خارج [{problem_data['constraints']['working_hours_constraints']['start']:.0f}:00 - {problem_data['constraints']['working_hours_constraints']['end']:.0f}:00]).")
-                elif not check_precedence_constraint(temp_schedule_for_check_all, course_name, problem_data):
-                    y_course = next((p['y_course'] for p in problem_data['constraints']['precedence_constraints'] if p['x_course'] == course_name), 'دورة سابقة غير محددة')
-                    violated_constraints_details.append(f"    - **{course_name}**: مخالفة قيد الأسبقية (تبدأ قبل انتهاء {y_course}).")
-                elif not check_absolute_time_constraint(temp_schedule_for_check_all, course_name, problem_data):
-                    abs_const = next((ac for ac in problem_data['constraints']['absolute_time_constraints'] if ac['course_name'] == course_name), None)
-                    if abs_const:
-                        violated_constraints_details.append(f"    - **{course_name}**: مخالفة قيد الوقت المطلق ({abs_const['type'].replace('_', ' ')} {abs_const['time_value']:.1f}).")
-                    else:
-                        violated_constraints_details.append(f"    - **{course_name}**: مخالفة قيد الوقت المطلق.")
-                elif not check_room_capacity(temp_schedule_for_check_all, course_name, problem_data):
-                    course_dets = get_course_details(course_name, problem_data["courses"])
-                    room_dets = get_room_details(temp_schedule_for_check_all[course_name].get("room"), problem_data["rooms"])
-                    violated_constraints_details.append(f"    - **{course_name}**: مخالفة سعة القاعة ({course_dets['num_students']} طلاب > سعة {room_dets['name']} {room_dets['capacity']}).")
-                elif not check_instructor_availability(temp_schedule_for_check_all, course_name, problem_data):
-                    course_dets = get_course_details(course_name, problem_data["courses"])
-                    unavailable_times_str = ""
-                    for inst_const in problem_data['constraints']['instructor_availability_constraints']:
-                        if inst_const['instructor_name'] == course_dets['instructor']:
-                            unavailable_times_str = ", ".join([f"[{s:.1f}-{e:.1f}]" for s, e in inst_const['unavailable_times']])
-                            break
-                    violated_constraints_details.append(f"    - **{course_name}**: مخالفة توفر المحاضر ({course_dets['instructor']} غير متاح في الوقت المجدول، أوقات عدم التوفر: {unavailable_times_str}).")
-                elif not check_no_overlap_constraints(temp_schedule_for_check_all, course_name, problem_data):
-                    violated_constraints_details.append(f"    - **{course_name}**: مخالفة تداخل زمني (قاعة أو محاضر آخر مشغول).")
-        
-        end_validation_time = time.time()
-        validation_duration_ms = (end_validation_time - start_validation_time) * 1000
+    model = get_compiled_problem(problem_data)
+    course_ids = model["course_ids"]
+    unassigned_mask = _unassigned_course_mask(model, unassigned_courses)
+    min_remaining_values = float('inf')
+    max_degree = -1
+    mcv_course = None
 
-        print(f"  (استغرق التحقق: {validation_duration_ms:.2f} مللي ثانية)")
-        
-        if is_valid_initial_schedule:
-            print("  ✅ **النتيجة**: الجدول الأولي المعطى **صالح** ولا توجد مخالفات.")
-            print_schedule_table(temp_schedule_for_check_all, problem_data, title="الجدول الأولي المعطى")
-        else:
-            print("  ❌ **النتيجة**: الجدول الأولي المعطى **غير صالح**. التفاصيل:")
-            for detail in violated_constraints_details:
-                print(detail)
-            print_schedule_table(temp_schedule_for_check_all, problem_data, title="الجدول الأولي المخالف")
+    for course_name in unassigned_courses:
+        if min_remaining_values == 0 and not unassigned_mask:
+            break
 
-    # 2. محاولة إيجاد حل باستخدام Backtracking Search إذا طُلب ذلك أو إذا كان الجدول الأولي غير مكتمل
-    if run_solver or not is_initial_schedule_complete:
-        print("\n  جاري محاولة إيجاد جدول صالح باستخدام خوارزمية البحث بالتراجع المحسّنة...")
-        
-        start_time_solver = time.time()
-        
-        courses_names = [c["name"] for c in problem_data["courses"]]
-        rooms_names = [r["name"] for r in problem_data["rooms"]]
+        course_id = course_ids.get(course_name)
+        if course_id is None: continue
+        degree = _conflict_degree(model, course_id, unassigned_mask)
+        if min_remaining_values == 0 and degree <= max_degree:
+            continue
+        # مع درجة أعلى يفوز التساوي، فيلزم العدّ حتى تجاوز أقل عدد لا بلوغه
+        count_limit = min_remaining_values + 1 if degree > max_degree else min_remaining_values
 
-        solver_initial_schedule = {
-            course_name: {"start_time": None, "end_time": None, "room": None}
-            for course_name in courses_names
-        }
+        course_duration = model["course_durations"][course_id]
+        entry = curr_schedule[course_name]
+        saved_entry = (entry.get("start_time"), entry.get("end_time"), entry.get("room"))
 
-        # توليد جميع التركيبات الممكنة من الأوقات والقاعات
-        all_possible_times_and_rooms = []
-        general_start = problem_data["constraints"]["working_hours_constraints"]["start"]
-        general_end = problem_data["constraints"]["working_hours_constraints"]["end"]
-
-        time_increment = 1.0 
-        current_time_slot = general_start
-        while current_time_slot < general_end:
-            for room_name in rooms_names:
-                room_details = get_room_details(room_name, problem_data["rooms"])
-                is_room_available_in_slot = False
-                if room_details:
-                    # تحقق من توفر القاعة للفترة الزمنية الكاملة للدورة (افتراض 1 ساعة)
-                    if current_time_slot >= room_details["available_times"][0][0] and \
-                       (current_time_slot + time_increment) <= room_details["available_times"][0][1]:
-                        is_room_available_in_slot = True
-                if is_room_available_in_slot:
-                    all_possible_times_and_rooms.append((current_time_slot, room_name))
-            current_time_slot += time_increment
-        
-        all_possible_times_and_rooms.sort(key=lambda x: x[0]) 
+        num_possible_assignments = 0
+        for proposed_start_time, proposed_room_name in possible_times:
+            entry["start_time"] = proposed_start_time
+            entry["end_time"] = proposed_start_time + course_duration
+            entry["room"] = proposed_room_name
 
-        solution = backtracking_search_optimized(solver_initial_schedule, problem_data, courses_names, all_possible_times_and_rooms)
+            if check_all_constraints(curr_schedule, course_name, model, occupancy):
+                num_possible_assignments += 1
+                if num_possible_assignments >= count_limit:
+                    break
 
-        end_time_solver = time.time()
-        solver_duration_ms = (end_time_solver - start_time_solver) * 1000
+        entry["start_time"], entry["end_time"], entry["room"] = saved_entry
 
-        if solution:
-            print(f"\n  ✅ **تم العثور على حل صالح للجدولة بواسطة الخوارزمية المحسّنة!** (استغرق {solver_duration_ms:.2f} مللي ثانية)")
-            print_schedule_table(solution, problem_data, title="الحل الذي تم إيجاده")
+        if num_possible_assignments < min_remaining_values or \
+           (num_possible_assignments == min_remaining_values and degree > max_degree):
+            min_remaining_values = num_possible_assignments
+            max_degree = degree
+            mcv_course = course_name
+
+    if stats is not None:
+        stats["mcv_calls"] += 1
+        stats["mcv_time_ms"] += (time.perf_counter() - mcv_start) * 1000
+    return mcv_course
+
+def backtracking_search_inplace(curr_schedule, problem_data, all_course_names, possible_times_and_rooms, trail=None, occupancy=None):
+    """
+    خوارزمية البحث بالتراجع نفسها (MCV + نفس ترتيب القيم) لكنها تعدّل جدولاً واحداً في المكان
+    وتسجل كل تعيين في سجل التراجع (trail) لتلغيه عند التراجع، بدلاً من copy.deepcopy لكل عقدة.
+    فحص التداخل يتم عبر جداول إشغال القاعات والمحاضرين التي تُحدَّث مع كل تعيين وتراجع.
+    تُرجع نفس الحل الذي تُرجعه backtracking_search_optimized (وهو الجدول المعطى نفسه بعد تعبئته)،
+    أو None مع إعادة الجدول إلى حالته الأصلية.
+    """
+    if trail is None:
+        trail = []
+    problem_data = get_compiled_problem(problem_data)
+    if occupancy is None:
+        occupancy = build_occupancy(curr_schedule, problem_data)
+
+    stats = _active_instrumentation
+
+    if all(curr_schedule[c_name].get("start_time") is not None for c_name in all_course_names):
+        if stats is not None:
+            _record_search_event(stats, "solution", None, len(all_course_names))
+        return curr_schedule
+
+    course_to_assign = find_mcv_course_inplace(curr_schedule, all_course_names, possible_times_and_rooms, problem_data, occupancy)
+    if stats is not None:
+        depth = _assigned_depth(curr_schedule, all_course_names)
+        _record_search_event(stats, "node", course_to_assign, depth)
+    course_id = problem_data["course_ids"].get(course_to_assign)
+    if course_id is None:
+        if stats is not None:
+            _record_search_event(stats, "backtrack", course_to_assign, depth)
+        return None
+    course_duration = problem_data["course_durations"][course_id]
+
+    mark = len(trail)
+    for proposed_start_time, proposed_room in possible_times_and_rooms:
+        _trail_assign(curr_schedule, trail, course_to_assign,
+                      proposed_start_time, proposed_start_time + course_duration, proposed_room,
+                      problem_data, occupancy)
+
+        if check_all_constraints(curr_schedule, course_to_assign, problem_data, occupancy):
+            result = backtracking_search_inplace(curr_schedule, problem_data, all_course_names, possible_times_and_rooms, trail, occupancy)
+            if result:
+                return result
+
+        _trail_undo(curr_schedule, trail, mark, problem_data, occupancy)
+
+    if stats is not None:
+        _record_search_event(stats, "backtrack", course_to_assign, depth)
+    return None
+
+
+#  القفز الخلفي الموجّه بالتعارضات (Conflict-directed Backjumping) مع تعلّم nogoods 
+#  نفس البحث في المكان (MCV + نفس ترتيب القيم)، لكن كل قيمة مرفوضة تُنسب إلى الدورة المجدولة
+#  التي سببت رفضها (عبر explain_constraint_violation). عند فشل دورة تُرجَع مجموعة التعارض
+#  (الدورات التي تكفي تعييناتها الحالية لاستحالة الحل)، فيقفز البحث مباشرة إلى أعمق دورة فيها
+#  متخطياً المستويات التي لا علاقة لها بالفشل. مجموعات التعارض الصغيرة تُحفظ كـ nogoods
+#  (تعيينات لا يمكن أن تجتمع في حل) وتُفحص عند كل تعيين لاحق كي لا يُستكشف الطريق المسدود نفسه مرتين.
+#  لا يُتخطى إلا ما ثبت فشله، لذا يُرجع البحث نفس حل backtracking_search_inplace.
+
+def _nogood_culprits(curr_schedule, search, course_name, start_time, room):
+    """
+    تُرجع الدورات الأخرى في أول nogood اكتملت تعييناته بالتعيين (course_name, start_time, room)،
+    أو None إن لم يكتمل أي nogood.
+    """
+    for nogood in search["nogoods"].get((course_name, start_time, room), ()):
+        complete = True
+        for other_name, other_start, other_room in nogood:
+            if other_name == course_name:
+                continue
+            other_entry = curr_schedule[other_name]
+            if other_entry.get("start_time") != other_start or other_entry.get("room") != other_room:
+                complete = False
+                break
+        if complete:
+            return [other_name for other_name, _, _ in nogood if other_name != course_name]
+    return None
+
+def _learn_nogood(curr_schedule, search, conflict_set):
+    """تحفظ التعيينات الحالية لدورات مجموعة التعارض كـ nogood إن كانت صغيرة بما يكفي."""
+    if not conflict_set or len(conflict_set) > search["max_nogood_size"] or \
+       len(search["learned"]) >= search["max_nogoods"]:
+        return
+    nogood = tuple(sorted((name, curr_schedule[name]["start_time"], curr_schedule[name]["room"]) for name in conflict_set))
+    if nogood in search["learned"]:
+        return
+    search["learned"].add(nogood)
+    for assignment in nogood:
+        search["nogoods"].setdefault(assignment, []).append(nogood)
+    if _active_instrumentation is not None:
+        _active_instrumentation["nogoods"] += 1
+
+def _backjumping_search(curr_schedule, model, all_course_names, possible_times_and_rooms, trail, occupancy, search):
+    """
+    تُرجع (True, None) عند إيجاد حل كامل (الجدول معبأ في المكان)، وإلا (False, مجموعة التعارض)
+    مع إعادة الجدول إلى حالته عند الاستدعاء.
+    """
+    stats = _active_instrumentation
+
+    if all(curr_schedule[c_name].get("start_time") is not None for c_name in all_course_names):
+        if stats is not None:
+            _record_search_event(stats, "solution", None, len(all_course_names))
+        return True, None
+
+    course_to_assign = find_mcv_course_inplace(curr_schedule, all_course_names, possible_times_and_rooms, model, occupancy)
+    levels = search["levels"]
+    depth = len(levels)
+    if stats is not None:
+        _record_search_event(stats, "node", course_to_assign, depth)
+    course_id = model["course_ids"].get(course_to_assign)
+    if course_id is None:
+        return False, set()
+    course_duration = model["course_durations"][course_id]
+
+    conflict_set = set()
+    mark = len(trail)
+    for proposed_start_time, proposed_room in possible_times_and_rooms:
+        _trail_assign(curr_schedule, trail, course_to_assign,
+                      proposed_start_time, proposed_start_time + course_duration, proposed_room,
+                      model, occupancy)
+
+        if check_all_constraints(curr_schedule, course_to_assign, model, occupancy):
+            culprits = _nogood_culprits(curr_schedule, search, course_to_assign, proposed_start_time, proposed_room) \
+                if search["nogoods"] else None
+            if culprits is None:
+                levels[course_to_assign] = depth
+                found, child_conflicts = _backjumping_search(curr_schedule, model, all_course_names,
+                                                             possible_times_and_rooms, trail, occupancy, search)
+                if found:
+                    return True, None
+                del levels[course_to_assign]
+                _trail_undo(curr_schedule, trail, mark, model, occupancy)
+                if course_to_assign not in child_conflicts:
+                    # الفشل لا يعتمد على هذه الدورة: القفز فوقها مباشرة دون تجربة بقية قيمها
+                    if stats is not None:
+                        _record_search_event(stats, "backjump", course_to_assign, depth)
+                    return False, child_conflicts
+                conflict_set.update(child_conflicts)
+                conflict_set.discard(course_to_assign)
+                continue
+            if stats is not None:
+                stats["nogood_prunes"] += 1
+            conflict_set.update(culprits)
+        else:
+            _, culprits = explain_constraint_violation(curr_schedule, course_to_assign, model, occupancy)
+            if culprits:
+                # أي مسبب واحد يكفي لتفسير الرفض؛ أقدمها تعييناً يسمح بأبعد قفزة
+                conflict_set.add(min(culprits, key=lambda name: levels.get(name, -1)))
+
+        _trail_undo(curr_schedule, trail, mark, model, occupancy)
+
+    _learn_nogood(curr_schedule, search, conflict_set)
+    if stats is not None:
+        _record_search_event(stats, "backtrack", course_to_assign, depth)
+    return False, conflict_set
+
+def backtracking_search_backjumping(curr_schedule, problem_data, all_course_names, possible_times_and_rooms,
+                                    max_nogoods=100000, max_nogood_size=4):
+    """
+    البحث بالتراجع في المكان مع القفز الخلفي الموجّه بالتعارضات وتعلّم nogoods.
+    max_nogoods يحد عدد nogoods المحفوظة و max_nogood_size حجم كل منها (الصغيرة أكثر فائدة).
+    تُرجع نفس حل backtracking_search_inplace (الجدول المعطى بعد تعبئته)، أو None مع إعادة الجدول إلى حالته.
+    """
+    model = get_compiled_problem(problem_data)
+    occupancy = build_occupancy(curr_schedule, model)
+    search = {
+        "levels": {},
+        "nogoods": {},
+        "learned": set(),
+        "max_nogoods": max_nogoods,
+        "max_nogood_size": max_nogood_size,
+    }
+    found, _ = _backjumping_search(curr_schedule, model, all_course_names, possible_times_and_rooms, [], occupancy, search)
+    return curr_schedule if found else None
+
+
+#  مصفوفة الجدوى للقيود الأحادية (دورة × وقت بداية × قاعة) 
+#  ساعات العمل، القيود الزمنية المطلقة، سعة القاعة، وعدم توفر المحاضر تعتمد فقط على الدورة
+#  والتعيين المقترح، لذا تُحسب مرة واحدة قبل البحث (بعمليات NumPy مجمّعة إن كانت متاحة).
+
+def _feasibility_tensor_numpy(model, starts, available):
+    """تحسب مصفوفة الجدوى بعمليات NumPy مجمّعة."""
+    start_array = np.asarray(starts, dtype=np.float64)
+    durations = np.asarray(model["course_durations"], dtype=np.float64)
+    end_array = start_array[None, :] + durations[:, None]
+
+    working_start, working_end = model["working_hours"]
+    time_ok = (start_array[None, :] >= working_start) & (end_array <= working_end)
+
+    for course_id, absolute_constraints in enumerate(model["course_absolute_constraints"]):
+        for const_type, time_value in absolute_constraints:
+            if const_type == "start_after":
+                time_ok[course_id] &= ~(start_array < time_value)
+            elif const_type == "start_before":
+                time_ok[course_id] &= ~(start_array > time_value)
+            elif const_type == "end_after":
+                time_ok[course_id] &= ~(end_array[course_id] < time_value)
+            elif const_type == "end_before":
+                time_ok[course_id] &= ~(end_array[course_id] > time_value)
+
+    course_instructor = np.asarray(model["course_instructor"], dtype=np.int64)
+    for instructor_id, unavailable_times in enumerate(model["instructor_unavailable_times"]):
+        if not unavailable_times:
+            continue
+        instructor_courses = np.nonzero(course_instructor == instructor_id)[0]
+        if not len(instructor_courses):
+            continue
+        instructor_ends = end_array[instructor_courses]
+        for unavailable_start, unavailable_end in unavailable_times:
+            time_ok[instructor_courses] &= ~((start_array[None, :] < unavailable_end) & (unavailable_start < instructor_ends))
+
+    students = np.asarray(model["course_students"], dtype=np.float64)
+    capacities = np.asarray(model["room_capacities"], dtype=np.float64)
+    capacity_ok = students[:, None] <= capacities[None, :]
+    for course_id, allowed_rooms in enumerate(model["course_allowed_rooms"]):
+        if allowed_rooms is not None:
+            allowed_mask = np.zeros(len(model["room_names"]), dtype=bool)
+            allowed_mask[list(allowed_rooms)] = True
+            capacity_ok[course_id] &= allowed_mask
+
+    available_array = np.zeros((len(starts), len(model["room_names"])), dtype=bool)
+    for start_index, room_id in available:
+        available_array[start_index, room_id] = True
+
+    # توفر القاعة طوال مدة الدورة: يكفي أن تقع الفترة داخل إحدى فترات توفر القاعة
+    window_ok = np.zeros((len(durations), len(starts), len(model["room_names"])), dtype=bool)
+    for room_id, windows in enumerate(model["room_available_times"]):
+        for window_start, window_end in windows:
+            window_ok[:, :, room_id] |= (start_array[None, :] >= window_start) & (end_array <= window_end)
+
+    return time_ok[:, :, None] & capacity_ok[:, None, :] & available_array[None, :, :] & window_ok
+
+def _feasibility_tensor_python(model, starts, available, course_ids):
+    """
+    نفس مصفوفة الجدوى كقوائم متداخلة باستخدام دوال التحقق نفسها (عند غياب NumPy).
+    القيود الزمنية تُفحص مرة لكل وقت بداية، وسعة القاعة مرة لكل قاعة، وتوفر القاعة مرة لكل مدة،
+    كي لا يتضاعف الزمن مع شبكات الأوقات الدقيقة.
+    """
+    room_names = model["room_names"]
+    room_available_times = model["room_available_times"]
+    # توفر القاعة يعتمد فقط على (وقت البداية، القاعة، المدة)، فيُحسب مرة لكل مدة مختلفة
+    window_ok_by_duration = {}
+    feasible = []
+    for course_id in course_ids:
+        course_name = model["course_names"][course_id]
+        course_duration = model["course_durations"][course_id]
+        window_ok = window_ok_by_duration.get(course_duration)
+        if window_ok is None:
+            window_ok = window_ok_by_duration[course_duration] = {
+                (start_index, room_id): _fits_in_windows(room_available_times[room_id], starts[start_index],
+                                                         starts[start_index] + course_duration)
+                for start_index, room_id in available
+            }
+        entry = {"start_time": None, "end_time": None, "room": None}
+        single_schedule = {course_name: entry}
+        # الدورات المكررة الاسم تُفحص بقيود أول دورة بنفس الاسم، كما في دوال التحقق
+        time_ok = []
+        for start_time in starts:
+            entry["start_time"] = start_time
+            entry["end_time"] = start_time + course_duration
+            time_ok.append(check_working_hours(single_schedule, course_name, model) and
+                           check_absolute_time_constraint(single_schedule, course_name, model) and
+                           check_instructor_availability(single_schedule, course_name, model))
+        capacity_ok = []
+        for room_name in room_names:
+            entry["room"] = room_name
+            capacity_ok.append(check_room_capacity(single_schedule, course_name, model))
+
+        course_rows = [[False] * len(room_names) for _ in starts]
+        for start_index, room_id in available:
+            if time_ok[start_index] and capacity_ok[room_id]:
+                course_rows[start_index][room_id] = window_ok[start_index, room_id]
+        feasible.append(course_rows)
+    return feasible
+
+def build_feasibility_tensor(problem_data, possible_times_and_rooms=None, use_numpy=True, course_names=None):
+    """
+    تبني مصفوفة جدوى منطقية بأبعاد (دورة × وقت بداية × قاعة) للقيود الأحادية فقط.
+    تُرجع قاموساً: starts (أوقات البداية المرتبة)، rooms (أسماء القاعات بترتيب معرّفاتها)،
+    feasible (مصفوفة NumPy أو قوائم متداخلة إن لم تكن NumPy متاحة أو use_numpy=False)،
+    course_ids (معرّف الدورة لكل صف، ويمكن حصرها بـ course_names)،
+    و value_positions (موضع كل قيمة من possible_times_and_rooms في المصفوفة).
+    القيم ذات القاعات غير المعرّفة في المسألة تُعتبر غير صالحة.
+    """
+    model = get_compiled_problem(problem_data)
+    if possible_times_and_rooms is None:
+        possible_times_and_rooms = build_possible_times_and_rooms(model)
+    if course_names is None:
+        course_ids = list(range(len(model["course_names"])))
+    else:
+        course_ids = [model["course_ids"][course_name] for course_name in course_names if course_name in model["course_ids"]]
+
+    starts = sorted({proposed_start_time for proposed_start_time, _ in possible_times_and_rooms})
+    start_indexes = {proposed_start_time: i for i, proposed_start_time in enumerate(starts)}
+    room_ids = model["room_ids"]
+
+    value_positions = []
+    available = set()
+    for proposed_start_time, proposed_room in possible_times_and_rooms:
+        room_id = room_ids.get(proposed_room, -1)
+        value_positions.append((start_indexes[proposed_start_time], room_id))
+        if room_id >= 0:
+            available.add((start_indexes[proposed_start_time], room_id))
+
+    if use_numpy and np is not None:
+        feasible = _feasibility_tensor_numpy(model, starts, available)
+        if course_names is not None:
+            feasible = feasible[np.asarray(course_ids, dtype=np.intp)]
+    else:
+        feasible = _feasibility_tensor_python(model, starts, available, course_ids)
+
+    return {
+        "model": model,
+        "course_ids": course_ids,
+        "starts": starts,
+        "rooms": model["room_names"],
+        "feasible": feasible,
+        "values": possible_times_and_rooms,
+        "value_positions": value_positions,
+    }
+
+def feasible_placements(tensor, course_names=None):
+    """
+    تجيب عن سؤال "أين يمكن وضع هذه الدورة؟" لمجموعة دورات دفعة واحدة:
+    تُرجع قاموساً {اسم الدورة: [(وقت البداية، القاعة), ...]} وفق القيود الأحادية.
+    """
+    model = tensor["model"]
+    if course_names is None:
+        course_names = model["course_names"]
+    starts = tensor["starts"]
+    rooms = tensor["rooms"]
+    feasible = tensor["feasible"]
+
+    rows = {course_id: row for row, course_id in enumerate(tensor["course_ids"])}
+
+    placements = {}
+    for course_name in course_names:
+        row = rows.get(model["course_ids"].get(course_name))
+        if row is None:
+            placements[course_name] = []
+            continue
+        if np is not None and isinstance(feasible, np.ndarray):
+            start_indexes, room_ids = np.nonzero(feasible[row])
+            placements[course_name] = [(starts[s], rooms[r]) for s, r in zip(start_indexes.tolist(), room_ids.tolist())]
+        else:
+            placements[course_name] = [
+                (starts[s], rooms[r])
+                for s, start_row in enumerate(feasible[row])
+                for r, is_feasible in enumerate(start_row) if is_feasible
+            ]
+    return placements
+
+def feasibility_domains(tensor):
+    """
+    تحوّل مصفوفة الجدوى إلى مجال bitset لكل دورة فوق فهارس possible_times_and_rooms
+    (قائمة بطول عدد الدورات؛ الدورات غير الموجودة في المصفوفة مجالها 0).
+    """
+    feasible = tensor["feasible"]
+    value_positions = tensor["value_positions"]
+    domains = [0] * len(tensor["model"]["course_names"])
+
+    if np is not None and isinstance(feasible, np.ndarray):
+        if not value_positions or not len(feasible):
+            return domains
+        start_indexes = np.fromiter((s for s, _ in value_positions), dtype=np.intp, count=len(value_positions))
+        room_ids = np.fromiter((r for _, r in value_positions), dtype=np.intp, count=len(value_positions))
+        known_rooms = room_ids >= 0
+        value_feasible = feasible[:, start_indexes, np.where(known_rooms, room_ids, 0)] & known_rooms[None, :]
+        packed = np.packbits(value_feasible, axis=1, bitorder="little")
+        for course_id, row in zip(tensor["course_ids"], packed):
+            domains[course_id] = int.from_bytes(row.tobytes(), "little")
+        return domains
+
+    for course_id, course_rows in zip(tensor["course_ids"], feasible):
+        domain = 0
+        for value_index, (start_index, room_id) in enumerate(value_positions):
+            if room_id >= 0 and course_rows[start_index][room_id]:
+                domain |= 1 << value_index
+        domains[course_id] = domain
+    return domains
+
+
+#  كشف التماثل (symmetry) لكسره أثناء البحث 
+#  القاعات المتكافئة: نفس السعة وفترات التوفر وأوقات البداية المقترحة، ولا تميّز بينها أي دورة (القاعات
+#  المسموح بها والقاعات المفضلة). قاعتان متكافئتان لهما الإشغال نفسه في الجدول الجزئي (نفس الفترات المحجوزة،
+#  ومنها حالة القاعات غير المستخدمة) قابلتان للتبديل في بقية البحث، فإذا فشلت الدورة في إحداهما في وقت ما
+#  فلا حاجة لتجربة الأخرى في الوقت نفسه.
+#  الدورات المتكافئة (شُعب متطابقة): نفس المدة وعدد الطلاب والمحاضر والقاعات المسموح بها والمفضلة والقيود
+#  الزمنية المطلقة، بلا قيود أسبقية ولا مجموعات طلاب؛ يُفرض بينها ترتيب غير تنازلي لأوقات البداية.
+#  الترتيب يعتمد على الوقت وحده فيبقى صحيحاً مع تبديل القاعات المتكافئة.
+#  الأوقات لا تُعامل كمتكافئة: ساعات العمل والأسبقية وتوفر القاعات تميّز بينها في أي مسألة عملية.
+
+def detect_symmetries(problem_data, possible_times_and_rooms, course_names=None):
+    """
+    تُرجع {"room_classes": [[أسماء قاعات متكافئة], ...], "course_classes": [[أسماء دورات متكافئة], ...]}
+    (الفئات ذات العنصرين فأكثر فقط). course_names يحصر كشف الدورات في دورات معينة (مثل غير المجدولة).
+    """
+    model = get_compiled_problem(problem_data)
+    room_ids = model["room_ids"]
+
+    room_starts = {}
+    for proposed_start_time, proposed_room in possible_times_and_rooms:
+        room_starts.setdefault(proposed_room, set()).add(proposed_start_time)
+
+    # كل مجموعة قاعات تذكرها دورة (مسموح بها أو مفضلة) تميّز أعضاءها عن غيرهم
+    room_memberships = [[] for _ in model["room_names"]]
+    room_sets = [allowed_rooms for allowed_rooms in model["course_allowed_rooms"] if allowed_rooms is not None]
+    room_sets.extend(preferred_rooms for preferences in model["course_room_preferences"] for preferred_rooms, _ in preferences)
+    for set_index, room_set in enumerate(room_sets):
+        for room_id in room_set:
+            room_memberships[room_id].append(set_index)
+
+    room_classes = {}
+    for room_id, room_name in enumerate(model["room_names"]):
+        if room_ids[room_name] != room_id or room_name not in room_starts:
+            continue
+        key = (model["room_capacities"][room_id], tuple(sorted(map(tuple, model["room_available_times"][room_id]))),
+               frozenset(room_starts[room_name]), tuple(room_memberships[room_id]))
+        room_classes.setdefault(key, []).append(room_name)
+
+    # الدورات المكررة الاسم تُستبعد لأن دوال التحقق تعاملها بقيود أول دورة بالاسم نفسه
+    seen_names, duplicate_names = set(), set()
+    for course_name in model["course_names"]:
+        (duplicate_names if course_name in seen_names else seen_names).add(course_name)
+
+    if course_names is None:
+        course_names = model["course_names"]
+    course_classes = {}
+    for course_name in dict.fromkeys(course_names):
+        course_id = model["course_ids"].get(course_name)
+        if course_id is None or course_name in duplicate_names:
+            continue
+        if model["course_predecessors"][course_id] or model["course_successors"][course_id] or \
+           model["course_student_groups"][course_id] or model["course_conflicts"][course_id]:
+            continue
+        key = (model["course_durations"][course_id], model["course_students"][course_id],
+               model["course_instructor"][course_id], model["course_allowed_rooms"][course_id],
+               tuple(sorted(model["course_absolute_constraints"][course_id])),
+               tuple(sorted((tuple(sorted(preferred_rooms)), weight)
+                            for preferred_rooms, weight in model["course_room_preferences"][course_id])))
+        course_classes.setdefault(key, []).append(course_name)
+
+    return {
+        "room_classes": [names for names in room_classes.values() if len(names) > 1],
+        "course_classes": [names for names in course_classes.values() if len(names) > 1],
+    }
+
+
+#  الفحص الأمامي الحقيقي: مجال لكل دورة على شكل bitset فوق أزواج (وقت، قاعة) 
+#  البت رقم v في مجال الدورة يعني أن القيمة possible_times_and_rooms[v] ما زالت صالحة لها.
+#  عند تعيين دورة تُحذف من مجالات الدورات غير المجدولة القيم المتعارضة معها (قاعة، محاضر، أسبقية)،
+#  ويُسجَّل كل تغيير في سجل تراجع للمجالات لإعادته عند التراجع.
+
+def _overlap_mask(state, start_time, end_time, duration, room=None):
+    """
+    قناع القيم (t, r) التي تتداخل فيها دورة مدتها duration مع الفترة [start_time, end_time)،
+    مقيدة بالقاعة room إن مُرّرت. النتائج مخزنة مؤقتاً لأنها تتكرر كثيراً.
+    """
+    key = (start_time, end_time, duration, room)
+    mask = state["mask_cache"].get(key)
+    if mask is not None:
+        return mask
+
+    starts = state["distinct_starts"]
+    masks_by_start = state["room_masks_by_start"].get(room, {}) if room is not None else state["masks_by_start"]
+    mask = 0
+    index = max(0, bisect.bisect_left(starts, start_time - duration) - 1)
+    while index < len(starts) and starts[index] < end_time:
+        other_start = starts[index]
+        if start_time < other_start + duration:
+            mask |= masks_by_start.get(other_start, 0)
+        index += 1
+    state["mask_cache"][key] = mask
+    return mask
+
+def _starts_before_mask(state, time_value):
+    """قناع القيم التي يبدأ فيها الوقت قبل time_value (لحذف قيم الدورة اللاحقة في قيد الأسبقية)."""
+    key = ("before", time_value)
+    mask = state["mask_cache"].get(key)
+    if mask is not None:
+        return mask
+
+    mask = 0
+    for other_start in state["distinct_starts"]:
+        if not other_start < time_value:
+            break
+        mask |= state["masks_by_start"][other_start]
+    state["mask_cache"][key] = mask
+    return mask
+
+def _ends_after_mask(state, time_value, duration):
+    """قناع القيم التي تنتهي فيها دورة مدتها duration بعد time_value (لحذف قيم الدورة السابقة في قيد الأسبقية)."""
+    key = ("ends_after", time_value, duration)
+    mask = state["mask_cache"].get(key)
+    if mask is not None:
+        return mask
+
+    mask = 0
+    for other_start in state["distinct_starts"]:
+        if other_start + duration > time_value:
+            mask |= state["masks_by_start"][other_start]
+    state["mask_cache"][key] = mask
+    return mask
+
+def _starts_after_mask(state, time_value):
+    """قناع القيم التي يبدأ فيها الوقت بعد time_value (لترتيب الشُعب المتكافئة)."""
+    key = ("after", time_value)
+    mask = state["mask_cache"].get(key)
+    if mask is not None:
+        return mask
+
+    mask = 0
+    for other_start in reversed(state["distinct_starts"]):
+        if not other_start > time_value:
+            break
+        mask |= state["masks_by_start"][other_start]
+    state["mask_cache"][key] = mask
+    return mask
+
+def _prune_after_assignment(state, course_id, start_time, end_time, room):
+    """
+    تحذف من مجالات الدورات غير المجدولة القيم التي تتعارض مع تعيين الدورة course_id.
+    مع state["strict_precedence"] تُحذف أيضاً قيم السوابق التي تنتهي بعد بداية الدورة،
+    ومع كسر التماثل تُحذف من الشُعب المتكافئة القيم التي تخالف ترتيب أوقات البداية.
+    الدورات التي تشارك الدورة طلاباً (course_conflict_masks) تُحذف منها القيم المتداخلة زمنياً كالمحاضر نفسه.
+    مع state["temporal_propagation"] تُنشر حدود الدورات المرتبطة بقيود أسبقية التي تغيّرت مجالاتها
+    عبر سلاسل الأسبقية (_propagate_precedence_bounds).
+    تُرجع False إذا أصبح مجال أي دورة فارغاً (wipe-out).
+    """
+    model = state["model"]
+    domains = state["domains"]
+    domain_trail = state["domain_trail"]
+    course_durations = model["course_durations"]
+    course_predecessors = model["course_predecessors"]
+    course_successors = model["course_successors"]
+    course_instructor = model["course_instructor"]
+    instructor_id = course_instructor[course_id]
+    student_conflict_mask = model["course_conflict_masks"][course_id]
+    successors = course_successors[course_id]
+    precedence_mask = _starts_before_mask(state, end_time) if successors else 0
+    predecessors = course_predecessors[course_id] if state["strict_precedence"] else ()
+    course_sections = state["course_sections"]
+    section = course_sections.get(course_id) if course_sections else None
+    temporal_propagation = state["temporal_propagation"]
+    changed_bounds = []
+
+    room_masks = {}
+    instructor_masks = {}
+    for other_id in state["unassigned"]:
+        duration = course_durations[other_id]
+        mask = 0
+        if room:
+            mask = room_masks.get(duration)
+            if mask is None:
+                mask = room_masks[duration] = _overlap_mask(state, start_time, end_time, duration, room)
+        if (instructor_id >= 0 and course_instructor[other_id] == instructor_id) or \
+           student_conflict_mask >> other_id & 1:
+            instructor_mask = instructor_masks.get(duration)
+            if instructor_mask is None:
+                instructor_mask = instructor_masks[duration] = _overlap_mask(state, start_time, end_time, duration)
+            mask |= instructor_mask
+        if successors and other_id in successors:
+            mask |= precedence_mask
+        if predecessors and other_id in predecessors:
+            mask |= _ends_after_mask(state, start_time, duration)
+        if section is not None:
+            other_section = course_sections.get(other_id)
+            if other_section is not None and other_section[0] == section[0]:
+                if other_section[1] > section[1]:
+                    mask |= _starts_before_mask(state, start_time)
+                else:
+                    mask |= _starts_after_mask(state, start_time)
+
+        domain = domains[other_id]
+        if domain & mask:
+            domain_trail.append((other_id, domain))
+            domain &= ~mask
+            domains[other_id] = domain
+            if not domain:
+                return False
+            if temporal_propagation and (course_predecessors[other_id] or course_successors[other_id]):
+                changed_bounds.append(other_id)
+    if changed_bounds:
+        return _propagate_precedence_bounds(state, changed_bounds)
+    return True
+
+def _propagate_precedence_bounds(state, changed):
+    """
+    انتشار الحدود الزمنية عبر سلاسل الأسبقية بين الدورات غير المجدولة (bounds consistency):
+    أبكر بداية لكل دورة لا تقل عن أبكر نهاية لكل سابقة لها، وآخر نهاية لها لا تتجاوز آخر بداية
+    لكل لاحقة (الاتجاه الثاني مع state["strict_precedence"] فقط). تبدأ من الدورات changed التي تغيّرت
+    مجالاتها، وكل دورة يضيق مجالها تُعاد إلى الطابور فيصل التضييق إلى نهاية السلسلة مهما طالت.
+    التغييرات تُسجَّل في سجل تراجع المجالات. تُرجع False إذا فرغ مجال أي دورة.
+    """
+    model = state["model"]
+    course_durations = model["course_durations"]
+    course_predecessors = model["course_predecessors"]
+    course_successors = model["course_successors"]
+    strict_precedence = state["strict_precedence"]
+    domains = state["domains"]
+    domain_trail = state["domain_trail"]
+    unassigned = set(state["unassigned"])
+
+    queue = deque(dict.fromkeys(changed))
+    queued = set(queue)
+    while queue:
+        course_id = queue.popleft()
+        queued.discard(course_id)
+        min_end, max_start = _domain_time_bounds(state, course_id)
+        neighbours = [(x_id, _starts_before_mask(state, min_end)) for x_id in course_successors[course_id]]
+        if strict_precedence:
+            neighbours.extend((y_id, _ends_after_mask(state, max_start, course_durations[y_id]))
+                              for y_id in course_predecessors[course_id])
+        for other_id, mask in neighbours:
+            if other_id not in unassigned:
+                continue
+            domain = domains[other_id]
+            if domain & mask:
+                domain_trail.append((other_id, domain))
+                state["temporal_prunes"] += (domain & mask).bit_count()
+                domain &= ~mask
+                domains[other_id] = domain
+                if not domain:
+                    return False
+                if other_id not in queued:
+                    queued.add(other_id)
+                    queue.append(other_id)
+    return True
+
+def _undo_domains(state, mark):
+    """تعيد المجالات إلى ما كانت عليه عند الموضع mark في سجل تراجع المجالات."""
+    domains = state["domains"]
+    domain_trail = state["domain_trail"]
+    while len(domain_trail) > mark:
+        course_id, domain = domain_trail.pop()
+        domains[course_id] = domain
+
+def new_domain_state(curr_schedule, problem_data, all_course_names, possible_times_and_rooms, strict_precedence=True,
+                     symmetry_breaking=False, temporal_propagation=True):
+    """
+    تبني حالة الفحص الأمامي: المجالات الأولية (من مصفوفة الجدوى للقيود الأحادية) بعد حذف ما يتعارض مع الدورات
+    المجدولة مسبقاً في الجدول. تُرجع None إذا كانت إحدى الدورات بلا قيم صالحة منذ البداية،
+    أو إذا كانت هناك دورة غير معروفة لم تُجدول بعد.
+    strict_precedence=True (الافتراضي) يفرض قيود الأسبقية في الاتجاهين أثناء البحث كما تفحصها
+    check_precedence_constraint؛ False يعيد السلوك القديم (تُفحص فقط عند جدولة اللاحقة بعد السابقة) للمقارنة.
+    symmetry_breaking=True يكشف القاعات والشُعب المتكافئة (detect_symmetries) لكسر تماثلها أثناء البحث.
+    temporal_propagation=True (الافتراضي) ينشر حدود أبكر بداية وآخر نهاية عبر سلاسل الأسبقية قبل البحث
+    وبعد كل تعيين (_propagate_precedence_bounds)، فتُكتشف السلاسل المستحيلة (ومنها دورات الأسبقية) فوراً.
+    """
+    model = get_compiled_problem(problem_data)
+    course_ids = model["course_ids"]
+
+    masks_by_start = {}
+    room_masks_by_start = {}
+    for value_index, (proposed_start_time, proposed_room) in enumerate(possible_times_and_rooms):
+        bit = 1 << value_index
+        masks_by_start[proposed_start_time] = masks_by_start.get(proposed_start_time, 0) | bit
+        room_masks = room_masks_by_start.setdefault(proposed_room, {})
+        room_masks[proposed_start_time] = room_masks.get(proposed_start_time, 0) | bit
+
+    state = {
+        "model": model,
+        "values": possible_times_and_rooms,
+        "distinct_starts": sorted(masks_by_start),
+        "values_sorted": all(possible_times_and_rooms[value_index - 1][0] <= possible_times_and_rooms[value_index][0]
+                             for value_index in range(1, len(possible_times_and_rooms))),
+        "masks_by_start": masks_by_start,
+        "room_masks_by_start": room_masks_by_start,
+        "mask_cache": {},
+        "domains": [0] * len(model["course_names"]),
+        "domain_trail": [],
+        "unassigned": [],
+        "preferred_values": {},
+        "reserved_values": 0,
+        "strict_precedence": strict_precedence,
+        "temporal_propagation": temporal_propagation,
+        "temporal_prunes": 0,
+        "student_conflicts": any(model["course_conflict_masks"]),
+        # كسر التماثل: فئة كل قاعة متكافئة وفتراتها المحجوزة (frozenset)، و(الفئة، الترتيب) لكل شعبة متكافئة
+        "room_classes": {},
+        "room_occupancy": {},
+        "course_sections": {},
+        "symmetry_prunes": 0,
+        # إعدادات البحث (تغيّرها solve_with_restarts وحل المحفظة)
+        "value_order": "ascending",
+        "tie_break": "first",
+        "rng": None,
+        "nodes": 0,
+        "node_limit": None,
+        "should_stop": None,
+        "aborted": False,
+    }
+
+    unassigned_names = [course_name for course_name in all_course_names if curr_schedule[course_name].get("start_time") is None]
+    unary_domains = feasibility_domains(build_feasibility_tensor(model, possible_times_and_rooms, course_names=unassigned_names))
+    for course_name in all_course_names:
+        if curr_schedule[course_name].get("start_time") is not None:
+            continue
+        course_id = course_ids.get(course_name)
+        if course_id is None:
+            return None
+        state["unassigned"].append(course_id)
+        state["domains"][course_id] = unary_domains[course_id]
+        if not state["domains"][course_id]:
+            return None
+
+    if symmetry_breaking:
+        symmetries = detect_symmetries(model, possible_times_and_rooms, unassigned_names)
+        for class_index, room_names in enumerate(symmetries["room_classes"]):
+            for room_name in room_names:
+                state["room_classes"][room_name] = class_index
+                state["room_occupancy"][room_name] = frozenset()
+        for class_index, section_names in enumerate(symmetries["course_classes"]):
+            for position, course_name in enumerate(section_names):
+                state["course_sections"][course_ids[course_name]] = (class_index, position)
+
+    if temporal_propagation and model["precedence_order"] is None:
+        return None
+
+    for course_name, details in curr_schedule.items():
+        course_id = course_ids.get(course_name)
+        if course_id is None or details.get("start_time") is None:
+            continue
+        end_time = details.get("end_time")
+        if end_time is None:
+            end_time = details["start_time"] + model["course_durations"][course_id]
+        if details.get("room") in state["room_occupancy"]:
+            state["room_occupancy"][details["room"]] |= {(details["start_time"], end_time)}
+        if not _prune_after_assignment(state, course_id, details["start_time"], end_time, details.get("room")):
+            return None
+
+    if temporal_propagation:
+        unassigned = set(state["unassigned"])
+        linked = [course_id for course_id in model["precedence_order"] if course_id in unassigned and
+                  (model["course_predecessors"][course_id] or model["course_successors"][course_id])]
+        if not _propagate_precedence_bounds(state, linked):
+            return None
+
+    state["domain_trail"].clear()
+    return state
+
+def precedence_time_bounds(problem_data, possible_times_and_rooms=None, time_increment=1.0):
+    """
+    تحسب لكل دورة أبكر بداية وآخر نهاية ممكنتين: من القيود الأحادية (ساعات العمل، القيود الزمنية المطلقة،
+    توفر القاعات والمحاضر) ثم عبر الإغلاق المتعدي لسلاسل الأسبقية في الاتجاهين.
+    تُرجع قاموساً (اسم الدورة ← (أبكر بداية، آخر نهاية))، أو None إذا ثبت قبل أي بحث أن إحدى السلاسل
+    مستحيلة (لا تتسع لها ساعات العمل أو تحتوي دورة أسبقية) أو أن إحدى الدورات بلا قيم صالحة.
+    """
+    model = get_compiled_problem(problem_data)
+    if possible_times_and_rooms is None:
+        possible_times_and_rooms = build_possible_times_and_rooms(model, time_increment)
+    course_names = list(dict.fromkeys(model["course_names"]))
+    curr_schedule = {course_name: {"start_time": None, "end_time": None, "room": None} for course_name in course_names}
+    state = new_domain_state(curr_schedule, model, course_names, possible_times_and_rooms)
+    if state is None:
+        return None
+
+    bounds = {}
+    for course_name in course_names:
+        course_id = model["course_ids"][course_name]
+        duration = model["course_durations"][course_id]
+        min_end, max_start = _domain_time_bounds(state, course_id)
+        bounds[course_name] = (min_end - duration, max_start + duration)
+    return bounds
+
+def _domain_time_bounds(state, course_id):
+    """تُرجع (أصغر نهاية، أكبر بداية) بين قيم مجال الدورة."""
+    duration = state["model"]["course_durations"][course_id]
+    values = state["values"]
+    domain = state["domains"][course_id]
+    if state["values_sorted"] and domain:
+        # القيم مرتبة حسب الوقت: أدنى بت يحمل أصغر بداية وأعلى بت أكبرها
+        return values[(domain & -domain).bit_length() - 1][0] + duration, values[domain.bit_length() - 1][0]
+    min_end = float('inf')
+    max_start = float('-inf')
+    while domain:
+        low_bit = domain & -domain
+        proposed_start_time = values[low_bit.bit_length() - 1][0]
+        if proposed_start_time + duration < min_end:
+            min_end = proposed_start_time + duration
+        if proposed_start_time > max_start:
+            max_start = proposed_start_time
+        domain ^= low_bit
+    return min_end, max_start
+
+def _revise(state, course_id, other_id, kind):
+    """
+    تحذف من مجال course_id القيم التي لا يوجد لها دعم في مجال other_id.
+    kind: "after" (course_id يجب أن يبدأ بعد انتهاء other_id)، "before" (العكس)، "instructor" (عدم تداخل).
+    تُرجع True إذا تغيّر المجال.
+    """
+    duration = state["model"]["course_durations"][course_id]
+    values = state["values"]
+    other_min_end, other_max_start = _domain_time_bounds(state, other_id)
+
+    domain = state["domains"][course_id]
+    remaining = domain
+    scan = domain
+    while scan:
+        low_bit = scan & -scan
+        scan ^= low_bit
+        proposed_start_time = values[low_bit.bit_length() - 1][0]
+        proposed_end_time = proposed_start_time + duration
+        if kind == "after":
+            supported = proposed_start_time >= other_min_end
+        elif kind == "before":
+            supported = proposed_end_time <= other_max_start
+        else:
+            supported = other_min_end <= proposed_start_time or other_max_start >= proposed_end_time
+        if not supported:
+            remaining ^= low_bit
+
+    if remaining != domain:
+        state["domains"][course_id] = remaining
+        return True
+    return False
+
+def enforce_arc_consistency(state):
+    """
+    معالجة مسبقة اختيارية (AC-3) على قيود الأسبقية وقيود عدم تداخل دورات المحاضر نفسه
+    والدورات التي تشترك في طلاب بين الدورات غير المجدولة. تُرجع False إذا فرغ مجال أي دورة (لا يوجد حل).
+    ملاحظة: هنا تُفرض الأسبقية في الاتجاهين دائماً، حتى مع strict_precedence=False.
+    """
+    model = state["model"]
+    unassigned = set(state["unassigned"])
+    neighbours = {course_id: [] for course_id in unassigned}
+
+    for x_id in unassigned:
+        for y_id in model["course_predecessors"][x_id]:
+            if y_id in unassigned:
+                neighbours[x_id].append((y_id, "after"))
+                neighbours[y_id].append((x_id, "before"))
+
+    courses_by_instructor = {}
+    for course_id in unassigned:
+        instructor_id = model["course_instructor"][course_id]
+        if instructor_id >= 0:
+            courses_by_instructor.setdefault(instructor_id, []).append(course_id)
+    for same_instructor_courses in courses_by_instructor.values():
+        for course_id in same_instructor_courses:
+            for other_id in same_instructor_courses:
+                if other_id != course_id:
+                    neighbours[course_id].append((other_id, "instructor"))
+    # تعارض الطلاب قيد عدم تداخل مثل المحاضر نفسه ("instructor" في _revise)
+    for course_id in unassigned:
+        for other_id in model["course_conflicts"][course_id]:
+            if other_id in unassigned and model["course_instructor"][other_id] != model["course_instructor"][course_id]:
+                neighbours[course_id].append((other_id, "instructor"))
+
+    queue = deque((course_id, other_id, kind) for course_id in neighbours for other_id, kind in neighbours[course_id])
+    while queue:
+        course_id, other_id, kind = queue.popleft()
+        if _revise(state, course_id, other_id, kind):
+            if not state["domains"][course_id]:
+                return False
+            for neighbour_id, _ in neighbours[course_id]:
+                if neighbour_id != other_id:
+                    for back_id, back_kind in neighbours[neighbour_id]:
+                        if back_id == course_id:
+                            queue.append((neighbour_id, course_id, back_kind))
+    return True
+
+def select_mrv_course(state):
+    """
+    تختار الدورة غير المجدولة ذات المجال الأصغر، بكلفة O(عدد الدورات غير المجدولة).
+    عند التساوي تُفضَّل الدورة ذات درجة تعارض الطلاب الأعلى (كما في find_mcv_course)، ثم تُختار أول دورة،
+    أو دورة عشوائية بين المتساوية إذا كان state["tie_break"] == "random".
+    """
+    domains = state["domains"]
+    conflict_masks = state["model"]["course_conflict_masks"]
+    unassigned_mask = None
+    mrv_course = None
+    mrv_degree = None
+    min_remaining_values = float('inf')
+    random_ties = state["tie_break"] == "random"
+    num_ties = 0
+    for course_id in state["unassigned"]:
+        remaining_values = domains[course_id].bit_count()
+        if remaining_values < min_remaining_values:
+            min_remaining_values = remaining_values
+            mrv_course = course_id
+            mrv_degree = None
+            num_ties = 1
+        elif remaining_values == min_remaining_values:
+            if state["student_conflicts"]:
+                # درجة التعارض تُحسب فقط عند التساوي: تقاطع bitset الجيران مع bitset الدورات غير المجدولة
+                if unassigned_mask is None:
+                    unassigned_mask = 0
+                    for unassigned_id in state["unassigned"]:
+                        unassigned_mask |= 1 << unassigned_id
+                if mrv_degree is None:
+                    mrv_degree = (conflict_masks[mrv_course] & unassigned_mask).bit_count()
+                degree = (conflict_masks[course_id] & unassigned_mask).bit_count()
+                if degree > mrv_degree:
+                    mrv_course, mrv_degree, num_ties = course_id, degree, 1
+                    continue
+                if degree < mrv_degree:
+                    continue
+            if random_ties:
+                num_ties += 1
+                if state["rng"].randrange(num_ties) == 0:
+                    mrv_course = course_id
+    return mrv_course
+
+def _ordered_value_bits(state, course_id):
+    """
+    تُرجع بتات قيم مجال الدورة بترتيب التجربة: القيمة المفضلة أولاً (إن وُجدت في
+    state["preferred_values"] وما زالت في المجال)، ثم القيم غير المفضلة لدورات أخرى،
+    ثم بقية القيم، كلٌّ منها حسب state["value_order"] (ascending أو descending أو random).
+    """
+    domain = state["domains"][course_id]
+    preferred_value = state["preferred_values"].get(course_id)
+    if preferred_value is not None and domain >> preferred_value & 1:
+        preferred_bit = 1 << preferred_value
+        domain ^= preferred_bit
+        yield preferred_bit
+    reserved = state["reserved_values"]
+    value_order = state["value_order"]
+    for part in (domain & ~reserved, domain & reserved):
+        if value_order == "ascending":
+            while part:
+                low_bit = part & -part
+                part ^= low_bit
+                yield low_bit
+        elif value_order == "descending":
+            while part:
+                high_bit = 1 << (part.bit_length() - 1)
+                part ^= high_bit
+                yield high_bit
+        else:
+            bits = []
+            while part:
+                low_bit = part & -part
+                part ^= low_bit
+                bits.append(low_bit)
+            state["rng"].shuffle(bits)
+            yield from bits
+
+def _symmetric_value_tried(state, tried, start_time, room):
+    """
+    كسر تماثل القاعات داخل عقدة واحدة: تُرجع True إذا جُرّبت في هذه العقدة وفي الوقت نفسه قاعة مكافئة لـ room
+    لها الإشغال نفسه (فالفرعان متماثلان)، وإلا تسجلها في tried وتُرجع False.
+    """
+    room_class = state["room_classes"].get(room)
+    if room_class is None:
+        return False
+    key = (room_class, start_time, state["room_occupancy"][room])
+    if key in tried:
+        state["symmetry_prunes"] += 1
+        return True
+    tried.add(key)
+    return False
+
+def _forward_checking_search(curr_schedule, state, trail):
+    """
+    البحث التكراري فوق حالة الفحص الأمامي؛ تُرجع True عند إيجاد حل كامل.
+    إذا تجاوز عدد العقد state["node_limit"] أو أعادت state["should_stop"] القيمة True
+    يُضبط state["aborted"] ويتراجع البحث إلى الحالة الأولية.
+    """
+    stats = _active_instrumentation
+    if not state["unassigned"]:
+        if stats is not None:
+            _record_search_event(stats, "solution", None, len(curr_schedule))
+        return True
+
+    state["nodes"] += 1
+    if state["node_limit"] is not None and state["nodes"] > state["node_limit"]:
+        state["aborted"] = True
+        return False
+    if state["should_stop"] is not None and state["nodes"] % 256 == 0 and state["should_stop"]():
+        state["aborted"] = True
+        return False
+
+    model = state["model"]
+    course_id = select_mrv_course(state)
+    course_name = model["course_names"][course_id]
+    course_duration = model["course_durations"][course_id]
+    values = state["values"]
+
+    position = state["unassigned"].index(course_id)
+    del state["unassigned"][position]
+    if stats is not None:
+        depth = len(curr_schedule) - len(state["unassigned"]) - 1
+        _record_search_event(stats, "node", course_name, depth)
+
+    mark = len(trail)
+    domain_mark = len(state["domain_trail"])
+    room_occupancy = state["room_occupancy"]
+    tried_symmetric = set()
+    for value_bit in _ordered_value_bits(state, course_id):
+        proposed_start_time, proposed_room = values[value_bit.bit_length() - 1]
+        proposed_end_time = proposed_start_time + course_duration
+        if room_occupancy and _symmetric_value_tried(state, tried_symmetric, proposed_start_time, proposed_room):
+            continue
+
+        _trail_assign(curr_schedule, trail, course_name, proposed_start_time, proposed_end_time, proposed_room)
+        if proposed_room in room_occupancy:
+            previous_occupancy = room_occupancy[proposed_room]
+            room_occupancy[proposed_room] = previous_occupancy | {(proposed_start_time, proposed_end_time)}
+        if _prune_after_assignment(state, course_id, proposed_start_time, proposed_end_time, proposed_room):
+            if _forward_checking_search(curr_schedule, state, trail):
+                return True
+        if proposed_room in room_occupancy:
+            room_occupancy[proposed_room] = previous_occupancy
+        _undo_domains(state, domain_mark)
+        _trail_undo(curr_schedule, trail, mark)
+        if state["aborted"]:
+            break
+
+    state["unassigned"].insert(position, course_id)
+    if stats is not None:
+        _record_search_event(stats, "backtrack", course_name, depth)
+    return False
+
+def backtracking_search_forward_checking(curr_schedule, problem_data, all_course_names, possible_times_and_rooms, use_ac3=False,
+                                         preferred_placements=None, strict_precedence=True, symmetry_breaking=False,
+                                         temporal_propagation=True):
+    """
+    البحث بالتراجع مع فحص أمامي حقيقي: لكل دورة مجال bitset يُقلَّص تدريجياً عند كل تعيين
+    ويُستعاد عند التراجع، مع فشل فوري عند فراغ أي مجال، واختيار MRV بعدّ بتات المجال فقط.
+    بدون use_ac3 ومع temporal_propagation=False يُرجع نفس الحل الذي يُرجعه backtracking_search_optimized.
+    use_ac3=True يضيف معالجة مسبقة (AC-3) على قيود الأسبقية والمحاضرين قبل البحث.
+    preferred_placements ({اسم الدورة: (وقت، قاعة)}) تُجرَّب أولاً لكل دورة إن كانت صالحة.
+    strict_precedence و temporal_propagation و symmetry_breaking كما في new_domain_state؛ نشر الحدود الزمنية
+    وكسر التماثل لا يغيّران وجود الحل لكنهما قد يغيّران الحل المُرجع (بتغيير أحجام المجالات وترتيب MRV).
+    """
+    problem_data = get_compiled_problem(problem_data)
+    state = new_domain_state(curr_schedule, problem_data, all_course_names, possible_times_and_rooms, strict_precedence,
+                             symmetry_breaking, temporal_propagation)
+    if state is None:
+        return None
+    if use_ac3 and not enforce_arc_consistency(state):
+        return None
+    if preferred_placements:
+        _set_preferred_placements(state, preferred_placements)
+
+    if _forward_checking_search(curr_schedule, state, []):
+        return curr_schedule
+    return None
+
+def _set_preferred_placements(state, preferred_placements):
+    """تسجل في حالة الفحص الأمامي القيمة المفضلة ({اسم الدورة: (وقت، قاعة)}) لكل دورة لتُجرَّب أولاً."""
+    model = state["model"]
+    value_indexes = {value: value_index for value_index, value in enumerate(state["values"])}
+    for course_name, placement in preferred_placements.items():
+        course_id = model["course_ids"].get(course_name)
+        if course_id is not None and tuple(placement) in value_indexes:
+            state["preferred_values"][course_id] = value_indexes[tuple(placement)]
+            state["reserved_values"] |= 1 << value_indexes[tuple(placement)]
+
+def _luby(index):
+    """العنصر رقم index (يبدأ من 1) في متتالية Luby: 1 1 2 1 1 2 4 ..."""
+    power = 1
+    while (1 << power) - 1 < index:
+        power += 1
+    while index != (1 << power) - 1:
+        index -= (1 << (power - 1)) - 1
+        power = 1
+        while (1 << power) - 1 < index:
+            power += 1
+    return 1 << (power - 1)
+
+def solve_with_restarts(curr_schedule, problem_data, all_course_names, possible_times_and_rooms,
+                        value_order="ascending", tie_break="first", seed=0,
+                        restart_policy="none", restart_base=200, should_stop=None, strict_precedence=True,
+                        symmetry_breaking=False, temporal_propagation=True):
+    """
+    الفحص الأمامي بإعدادات بحث قابلة للتغيير، مع سياسة إعادة تشغيل اختيارية:
+    "none" (بحث واحد كامل)، "luby" (حدود عقد restart_base × متتالية Luby)، أو
+    "geometric" (restart_base × 1.5^i). كل إعادة تشغيل تبدأ من المجالات الأولية نفسها
+    مع مولّد عشوائي يتابع من حيث توقف. should_stop دالة تُستدعى دورياً لإلغاء البحث.
+    تُرجع (الحل أو None، إحصاءات: nodes، restarts، symmetry_prunes، status).
+    """
+    problem_data = get_compiled_problem(problem_data)
+    state = new_domain_state(curr_schedule, problem_data, all_course_names, possible_times_and_rooms, strict_precedence,
+                             symmetry_breaking, temporal_propagation)
+    stats = {"nodes": 0, "restarts": 0, "symmetry_prunes": 0, "status": "infeasible"}
+    if state is None:
+        return None, stats
+
+    state["value_order"] = value_order
+    state["tie_break"] = tie_break
+    state["rng"] = random.Random(seed)
+    state["should_stop"] = should_stop
+
+    restart_index = 0
+    while True:
+        restart_index += 1
+        if restart_policy == "luby":
+            state["node_limit"] = restart_base * _luby(restart_index)
+        elif restart_policy == "geometric":
+            state["node_limit"] = int(restart_base * 1.5 ** (restart_index - 1))
+        state["nodes"] = 0
+        state["aborted"] = False
+
+        found = _forward_checking_search(curr_schedule, state, [])
+        stats["nodes"] += state["nodes"]
+        stats["symmetry_prunes"] = state["symmetry_prunes"]
+        if found:
+            stats["status"] = "solved"
+            return curr_schedule, stats
+        if not state["aborted"]:
+            return None, stats
+        if should_stop is not None and should_stop():
+            stats["status"] = "cancelled"
+            return None, stats
+        stats["restarts"] += 1
+
+def backtracking_search_ac3(curr_schedule, problem_data, all_course_names, possible_times_and_rooms):
+    """الفحص الأمامي مع معالجة AC-3 مسبقة (لاستخدامها ضمن SOLVER_MODES)."""
+    return backtracking_search_forward_checking(curr_schedule, problem_data, all_course_names, possible_times_and_rooms, use_ac3=True)
+
+def backtracking_search_symmetry(curr_schedule, problem_data, all_course_names, possible_times_and_rooms):
+    """الفحص الأمامي مع كسر تماثل القاعات والشُعب المتكافئة (لاستخدامها ضمن SOLVER_MODES)."""
+    return backtracking_search_forward_checking(curr_schedule, problem_data, all_course_names, possible_times_and_rooms,
+                                                symmetry_breaking=True)
+
+
+#  البحث التكراري (مكدس صريح) بميزانية: حد للعقد، مهلة زمنية، وإلغاء تعاوني 
+#  نفس الفحص الأمامي (نفس MRV ونفس ترتيب القيم، فيُرجع نفس الحل) لكن كل مستوى إطار في قائمة بدلاً من
+#  استدعاء تكراري، فلا يصل إلى حد التكرار في بايثون مهما كان عدد الدورات. عند انتهاء الميزانية يُرجع
+#  أعمق تعيين جزئي وصل إليه كجدول "أفضل جهد"، مع أحداث تقدّم دورية (العمق وعدد العقد في الثانية).
+
+def _iterative_next_value(compact, state, frame, value_rooms):
+    """
+    تتراجع عن القيمة الحالية لإطار المكدس (إن وُجدت) ثم تعيّن في الجدول المضغوط أول قيمة تالية صالحة
+    للدورة (لا تُفرغ أي مجال). تُرجع False إذا نفدت قيم الدورة.
+    frame: [course_id, position, domain_mark, values, tried_symmetric, current, previous_occupancy]
+    """
+    course_id, _, domain_mark, values, tried_symmetric, current, previous_occupancy = frame
+    starts, ends, rooms = compact["start"], compact["end"], compact["room"]
+    room_occupancy = state["room_occupancy"]
+    if current is not None:
+        if current[1] in room_occupancy:
+            room_occupancy[current[1]] = previous_occupancy
+        _undo_domains(state, domain_mark)
+        starts[course_id] = ends[course_id] = math.nan
+        rooms[course_id] = -1
+        frame[5] = None
+
+    course_duration = state["model"]["course_durations"][course_id]
+    for value_bit in values:
+        value_index = value_bit.bit_length() - 1
+        proposed_start_time, proposed_room = state["values"][value_index]
+        if room_occupancy and _symmetric_value_tried(state, tried_symmetric, proposed_start_time, proposed_room):
+            continue
+        proposed_end_time = proposed_start_time + course_duration
+
+        if proposed_room in room_occupancy:
+            frame[6] = room_occupancy[proposed_room]
+            room_occupancy[proposed_room] = frame[6] | {(proposed_start_time, proposed_end_time)}
+        if _prune_after_assignment(state, course_id, proposed_start_time, proposed_end_time, proposed_room):
+            starts[course_id], ends[course_id], rooms[course_id] = proposed_start_time, proposed_end_time, value_rooms[value_index]
+            frame[5] = (proposed_start_time, proposed_room)
+            return True
+        if proposed_room in room_occupancy:
+            room_occupancy[proposed_room] = frame[6]
+        _undo_domains(state, domain_mark)
+    return False
+
+def _iterative_advance(compact, state, stack, budget):
+    """
+    تنقل إطار قمة المكدس إلى قيمته الصالحة التالية، وتتراجع عند نفاد قيمه (تُعاد دورته إلى غير المجدولة)
+    حتى تجد إطاراً له قيمة تالية. تُرجع False إذا فرغ المكدس.
+    """
+    stats = _active_instrumentation
+    while not _iterative_next_value(compact, state, stack[-1], budget["value_rooms"]):
+        course_id, position = stack.pop()[:2]
+        state["unassigned"].insert(position, course_id)
+        if stats is not None:
+            _record_search_event(stats, "backtrack", state["model"]["course_names"][course_id],
+                                 budget["base_depth"] + len(stack))
+        if not stack:
+            return False
+    return True
+
+def _iterative_forward_checking_search(compact, state, budget):
+    """
+    حلقة البحث بالمكدس الصريح فوق جدول مضغوط. budget قاموس: node_limit، deadline (قيمة perf_counter)،
+    should_stop، on_progress، progress_interval، started، base_depth (عدد الدورات المجدولة مسبقاً)،
+    value_rooms (معرّف قاعة كل قيمة)، و stack (إطارات البحث)؛ وتُكتب فيه النتائج: nodes، max_depth، best
+    (نسخة مضغوطة من أعمق تعيين جزئي). تُرجع "solved" أو "infeasible" أو سبب التوقف ("node_limit" أو
+    "timeout" أو "cancelled"). بعد "solved" يبقى الحل في المكدس، واستدعاؤها مجدداً يستأنف البحث عن الحل التالي.
+    """
+    stats = _active_instrumentation
+    model = state["model"]
+    unassigned = state["unassigned"]
+    node_limit = budget["node_limit"]
+    deadline = budget["deadline"]
+    should_stop = budget["should_stop"]
+    on_progress = budget["on_progress"]
+    base_depth = budget["base_depth"]
+    search_started = time.perf_counter()
+    next_progress = search_started + budget["progress_interval"]
+    stack = budget["stack"]
+    # استئناف بعد حل سابق (iter_solutions): المكدس ما زال يحمل تعيينات الحل، فيُنقل آخر إطار إلى قيمته التالية
+    if stack and not _iterative_advance(compact, state, stack, budget):
+        return "infeasible"
+
+    while True:
+        if not unassigned:
+            if stats is not None:
+                _record_search_event(stats, "solution", None, base_depth + len(stack))
+            return "solved"
+
+        budget["nodes"] += 1
+        nodes = budget["nodes"]
+        if node_limit is not None and nodes > node_limit:
+            return "node_limit"
+        # كلفة العقدة (اختيار MRV وتقليص المجالات) أكبر بكثير من قراءة الساعة، لذا تُفحص الميزانية عند كل عقدة
+        if deadline is not None or should_stop is not None or on_progress is not None:
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                return "timeout"
+            if should_stop is not None and should_stop():
+                return "cancelled"
+            if on_progress is not None and now >= next_progress:
+                search_elapsed = now - search_started
+                on_progress({"nodes": nodes, "depth": base_depth + len(stack), "max_depth": budget["max_depth"],
+                             "nodes_per_second": nodes / search_elapsed if search_elapsed > 0 else 0.0,
+                             "elapsed_ms": (now - budget["started"]) * 1000})
+                next_progress = now + budget["progress_interval"]
+
+        course_id = select_mrv_course(state)
+        position = unassigned.index(course_id)
+        del unassigned[position]
+        if stats is not None:
+            _record_search_event(stats, "node", model["course_names"][course_id], base_depth + len(stack))
+        stack.append([course_id, position, len(state["domain_trail"]), _ordered_value_bits(state, course_id),
+                      set(), None, None])
+
+        if not _iterative_advance(compact, state, stack, budget):
+            return "infeasible"
+        if base_depth + len(stack) > budget["max_depth"]:
+            budget["max_depth"] = base_depth + len(stack)
+            budget["best"] = copy_compact_schedule(compact)
+
+def _new_iterative_budget(model, curr_schedule, all_course_names, possible_times_and_rooms, state, started,
+                          node_limit=None, time_limit=None, should_stop=None, on_progress=None, progress_interval=1.0):
+    """
+    تبني قاموس الميزانية والجدول المضغوط الأولي (الدورات المجدولة مسبقاً فقط) للبحث التكراري؛
+    started قيمة perf_counter التي تُحسب منها المهلة.
+    """
+    compact = compact_schedule(curr_schedule, model)
+    base_depth = len(all_course_names) - (len(state["unassigned"]) if state is not None else 0)
+    budget = {"node_limit": node_limit, "deadline": None if time_limit is None else started + time_limit,
+              "should_stop": should_stop, "on_progress": on_progress, "progress_interval": progress_interval,
+              "started": started, "base_depth": base_depth,
+              "value_rooms": [model["room_ids"].get(room, -1) for _, room in possible_times_and_rooms],
+              "nodes": 0, "max_depth": base_depth, "best": copy_compact_schedule(compact), "stack": []}
+    return compact, budget
+
+def solve_iteratively(problem_data, possible_times_and_rooms=None, initial_schedule=None, node_limit=None, time_limit=None,
+                      should_stop=None, on_progress=None, progress_interval=1.0, strict_precedence=True,
+                      symmetry_breaking=False, temporal_propagation=True):
+    """
+    الفحص الأمامي بمكدس صريح (بلا تكرار) مع ميزانية: node_limit عقدة، time_limit ثانية، و should_stop
+    دالة تُستدعى دورياً للإلغاء التعاوني (مثلاً عند إغلاق الطلب). on_progress تُستدعى كل progress_interval
+    ثانية تقريباً بقاموس: nodes، depth، max_depth، nodes_per_second (منذ بدء البحث)، elapsed_ms (منذ الاستدعاء).
+    بناء المجالات قبل البحث لا يُقاطع، لذا قد تتجاوز المهلة الفعلية time_limit بزمن هذا البناء.
+    الدورات المجدولة في initial_schedule تبقى ثابتة، وبقية المعاملات كما في backtracking_search_forward_checking.
+    البحث يعمل على جدول مضغوط ولا يُحوَّل إلى صيغة القاموس إلا في النتيجة.
+    تُرجع قاموساً: schedule (الحل الكامل أو None)، status ("solved" أو "infeasible" أو "node_limit" أو
+    "timeout" أو "cancelled")، partial_schedule (عند التوقف: أعمق تعيين جزئي وصل إليه البحث كجدول أفضل جهد،
+    والدورات غير المجدولة فيه قيمها None)، unscheduled (أسماؤها)، nodes، max_depth، temporal_prunes (عدد القيم
+    التي حذفها نشر الحدود الزمنية)، و elapsed_ms.
+    """
+    started = time.perf_counter()
+    model = get_compiled_problem(problem_data)
+    if possible_times_and_rooms is None:
+        possible_times_and_rooms = build_possible_times_and_rooms(model)
+    course_names = list(dict.fromkeys(model["course_names"]))
+    curr_schedule = {}
+    for course_name in course_names:
+        details = (initial_schedule or {}).get(course_name) or {}
+        curr_schedule[course_name] = {"start_time": details.get("start_time"), "end_time": details.get("end_time"),
+                                      "room": details.get("room")}
+
+    state = new_domain_state(curr_schedule, model, course_names, possible_times_and_rooms, strict_precedence,
+                             symmetry_breaking, temporal_propagation)
+    compact, budget = _new_iterative_budget(model, curr_schedule, course_names, possible_times_and_rooms, state, started,
+                                            node_limit, time_limit, should_stop, on_progress, progress_interval)
+    status = "infeasible" if state is None else _iterative_forward_checking_search(compact, state, budget)
+
+    partial_schedule = None
+    unscheduled = []
+    if status != "solved":
+        partial_schedule = expand_schedule(budget["best"], model, course_names)
+        unscheduled = [course_name for course_name, details in partial_schedule.items() if details["start_time"] is None]
+    return {
+        "schedule": expand_schedule(compact, model, course_names) if status == "solved" else None,
+        "status": status,
+        "partial_schedule": partial_schedule,
+        "unscheduled": unscheduled,
+        "nodes": budget["nodes"],
+        "max_depth": budget["max_depth"],
+        "temporal_prunes": state["temporal_prunes"] if state is not None else 0,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
+
+def backtracking_search_iterative(curr_schedule, problem_data, all_course_names, possible_times_and_rooms):
+    """
+    البحث التكراري بلا ميزانية بنفس توقيع بقية الأنماط (لاستخدامه ضمن SOLVER_MODES): نفس حل
+    backtracking_search_forward_checking دون حد لعدد الدورات.
+    """
+    problem_data = get_compiled_problem(problem_data)
+    state = new_domain_state(curr_schedule, problem_data, all_course_names, possible_times_and_rooms)
+    if state is None:
+        return None
+    compact, budget = _new_iterative_budget(problem_data, curr_schedule, all_course_names, possible_times_and_rooms, state,
+                                            time.perf_counter())
+    if _iterative_forward_checking_search(compact, state, budget) != "solved":
+        return None
+    for course_name, details in expand_schedule(compact, problem_data, all_course_names).items():
+        curr_schedule[course_name].update(details)
+    return curr_schedule
+
+
+#  تعداد الحلول وعدّها 
+#  iter_solutions مولّد فوق البحث التكراري: بعد كل حل يُستأنف البحث من المكدس نفسه (التراجع عن آخر تعيين)،
+#  فتُنتج حلول مختلفة تباعاً دون إعادة الحل أو تعديل القيود. مع min_distance=d يُقطع بعد كل حل الفرع الذي
+#  يشاركه كل الإطارات عدا آخر d-1 (حلوله تختلف عنه في أقل من d دورة)، ويُرفض كل حل قريب من حل سابق
+#  ويُقطع معه الفرع الأكبر الذي لا يمكن أن يبتعد فيه أي حل عن ذلك الحل السابق بـ d.
+#  count_solutions تعدّ الحلول دون إنتاجها: بعد الفحص الأمامي تحدد مجالات الدورات غير المجدولة المسألة
+#  المتبقية بالكامل، فتُقسم إلى مكوّنات مستقلة (لا محاضر ولا طلاب ولا أسبقية ولا قاعة مشتركة في مجالاتها)
+#  عدد حلولها حاصل ضرب أعداد المكوّنات، ويُخزَّن عدد كل مكوّن بمفتاح مجالات دوراته. للمسائل الكبيرة
+#  تقدير Knuth: مسار عشوائي في شجرة البحث، وحاصل ضرب أحجام المجالات على طوله تقدير غير متحيز لعدد الحلول.
+
+def _diverse_prune_depth(stack, compact, previous, positions, min_distance):
+    """
+    أقصر بادئة من إطارات المكدس (بقيمها الحالية في الجدول المضغوط) لا يصل أي حل يشاركها إلى مسافة
+    min_distance عن الحل previous: الدورات المختلفة فيها عن previous مع كل الدورات بعدها أقل من min_distance.
+    تُرجع طول البادئة (طول المكدس إذا لم تكن هناك بادئة كهذه).
+    """
+    differing = 0
+    remaining = len(stack)
+    if remaining < min_distance:
+        return 0
+    for depth, frame in enumerate(stack):
+        course_id = frame[0]
+        if (compact["start"][course_id], compact["room"][course_id]) != previous[positions[course_id]]:
+            differing += 1
+        remaining -= 1
+        if differing + remaining < min_distance:
+            return depth + 1
+    return len(stack)
+
+def iter_solutions(problem_data, possible_times_and_rooms=None, initial_schedule=None, limit=None, min_distance=1,
+                   node_limit=None, time_limit=None, should_stop=None, strict_precedence=True, temporal_propagation=True):
+    """
+    مولّد يُنتج حلولاً مختلفة تباعاً وبكسل (لا يُبحث عن الحل التالي إلا عند طلبه) كقواميس: schedule، distance
+    (أقل عدد دورات يختلف فيها وقتها أو قاعتها عن الحلول السابقة؛ None للأول أو إذا كانت min_distance=1)،
+    nodes، و elapsed_ms. limit أقصى عدد حلول، و min_distance أقل مسافة Hamming بين أي حلين منتَجين
+    (1 = كل الحلول المختلفة؛ الأكبر تُقارن كل حل بكل الحلول السابقة، فيناسب مجموعات بدائل صغيرة).
+    node_limit و time_limit و should_stop ميزانية التعداد كله كما في solve_iteratively. عند انتهائه يُرجع
+    (قيمة StopIteration) ملخصاً: status ("exhausted" إذا استُكشف الفضاء كاملاً، "limit"، أو سبب التوقف)،
+    solutions، rejected (حلول رُفضت لقربها من حل سابق)، nodes، و elapsed_ms.
+    الدورات المجدولة في initial_schedule تبقى ثابتة ولا تدخل في المسافة.
+    """
+    started = time.perf_counter()
+    model = get_compiled_problem(problem_data)
+    if possible_times_and_rooms is None:
+        possible_times_and_rooms = build_possible_times_and_rooms(model)
+    course_names = list(dict.fromkeys(model["course_names"]))
+    curr_schedule = {}
+    for course_name in course_names:
+        details = (initial_schedule or {}).get(course_name) or {}
+        curr_schedule[course_name] = {"start_time": details.get("start_time"), "end_time": details.get("end_time"),
+                                      "room": details.get("room")}
+
+    state = new_domain_state(curr_schedule, model, course_names, possible_times_and_rooms, strict_precedence,
+                             temporal_propagation=temporal_propagation)
+    compact, budget = _new_iterative_budget(model, curr_schedule, course_names, possible_times_and_rooms, state, started,
+                                            node_limit, time_limit, should_stop)
+    summary = {"status": "exhausted", "solutions": 0, "rejected": 0, "nodes": 0, "elapsed_ms": 0.0}
+    searched_ids = list(state["unassigned"]) if state is not None else []
+    positions = {course_id: position for position, course_id in enumerate(searched_ids)}
+    yielded = []
+
+    while state is not None and (limit is None or summary["solutions"] < limit):
+        status = _iterative_forward_checking_search(compact, state, budget)
+        if status != "solved":
+            if status != "infeasible":
+                summary["status"] = status
+            break
+        stack = budget["stack"]
+        assignment = [(compact["start"][course_id], compact["room"][course_id]) for course_id in searched_ids]
+        distance = closest = None
+        for previous in yielded:
+            differing = sum(1 for value, other in zip(assignment, previous) if value != other)
+            if distance is None or differing < distance:
+                distance, closest = differing, previous
+            if differing < min_distance:
+                break
+        if distance is not None and distance < min_distance:
+            summary["rejected"] += 1
+        else:
+            if min_distance > 1:
+                yielded.append(assignment)
+            closest = assignment
+            summary["solutions"] += 1
+            yield {"schedule": expand_schedule(compact, model, course_names), "distance": distance,
+                   "nodes": budget["nodes"], "elapsed_ms": (time.perf_counter() - started) * 1000}
+        # الفرع الذي يحتوي هذا الحل ولا يمكن أن يبتعد فيه أي حل عن closest بـ min_distance يُتخطى كله
+        for frame in stack[_diverse_prune_depth(stack, compact, closest, positions, min_distance):]:
+            frame[3] = iter(())
+        if not stack:
+            break
+    else:
+        if state is not None:
+            summary["status"] = "limit"
+
+    summary["nodes"] = budget["nodes"]
+    summary["elapsed_ms"] = (time.perf_counter() - started) * 1000
+    return summary
+
+def _residual_components(state, course_ids, room_value_masks):
+    """
+    تقسم الدورات غير المجدولة course_ids إلى مكوّنات مستقلة وفق مجالاتها الحالية: تُربط الدورتان إذا اشتركتا
+    في محاضر أو طلاب أو قيد أسبقية، أو إذا كان في مجاليهما قيم في القاعة نفسها.
+    """
+    model = state["model"]
+    domains = state["domains"]
+    parents = {course_id: course_id for course_id in course_ids}
+    first_by_key = {}
+
+    def union(first, second):
+        first_root, second_root = _find_root(parents, first), _find_root(parents, second)
+        if first_root != second_root:
+            parents[second_root] = first_root
+
+    for course_id in course_ids:
+        keys = [("room", room) for room, room_mask in room_value_masks.items() if domains[course_id] & room_mask]
+        if model["course_instructor"][course_id] >= 0:
+            keys.append(("instructor", model["course_instructor"][course_id]))
+        for key in keys:
+            union(first_by_key.setdefault(key, course_id), course_id)
+        for neighbours in (model["course_predecessors"][course_id], model["course_successors"][course_id],
+                           model["course_conflicts"][course_id]):
+            for other_id in neighbours:
+                if other_id in parents:
+                    union(course_id, other_id)
+
+    components = {}
+    for course_id in course_ids:
+        components.setdefault(_find_root(parents, course_id), []).append(course_id)
+    return list(components.values())
+
+def _count_component(state, course_ids, counting):
+    """
+    العدد الدقيق لحلول مكوّن (دورات غير مجدولة مستقلة عن بقية المسألة) ببحث بالعمق أولاً يعيد التقسيم
+    إلى مكوّنات بعد كل تعيين، مع تخزين العدد بمفتاح مجالات دورات المكوّن. الدورة المنفردة عددها حجم مجالها.
+    عند نفاد الميزانية يُضبط counting["aborted"] بسبب التوقف وتُرجع 0 دون تخزين.
+    """
+    domains = state["domains"]
+    if len(course_ids) == 1:
+        return domains[course_ids[0]].bit_count()
+    key = tuple(sorted((course_id, domains[course_id]) for course_id in course_ids))
+    count = counting["cache"].get(key)
+    if count is not None:
+        counting["cache_hits"] += 1
+        return count
+
+    counting["nodes"] += 1
+    if counting["node_limit"] is not None and counting["nodes"] > counting["node_limit"]:
+        counting["aborted"] = "node_limit"
+    elif counting["deadline"] is not None and time.perf_counter() >= counting["deadline"]:
+        counting["aborted"] = "timeout"
+    if counting["aborted"]:
+        return 0
+
+    course_id = min(course_ids, key=lambda other_id: domains[other_id].bit_count())
+    remaining = [other_id for other_id in course_ids if other_id != course_id]
+    unassigned = state["unassigned"]
+    position = unassigned.index(course_id)
+    del unassigned[position]
+    course_duration = state["model"]["course_durations"][course_id]
+    count = 0
+    domain = domains[course_id]
+    while domain and not counting["aborted"]:
+        value_bit = domain & -domain
+        domain ^= value_bit
+        proposed_start_time, proposed_room = state["values"][value_bit.bit_length() - 1]
+        mark = len(state["domain_trail"])
+        if _prune_after_assignment(state, course_id, proposed_start_time, proposed_start_time + course_duration,
+                                   proposed_room):
+            product = 1
+            for component in _residual_components(state, remaining, counting["room_value_masks"]):
+                product *= _count_component(state, component, counting)
+                if not product:
+                    break
+            count += product
+        _undo_domains(state, mark)
+    unassigned.insert(position, course_id)
+    if counting["aborted"]:
+        return 0
+    counting["cache"][key] = count
+    return count
+
+def _estimate_component(state, course_ids, rng):
+    """
+    تقدير Knuth لعدد حلول مكوّن: يعيّن دوراته بترتيب MRV بقيم عشوائية من مجالاتها ويُرجع حاصل ضرب
+    أحجام المجالات على المسار (أو 0 إذا فرغ مجال قبل اكتماله). متوسط عدة مسارات تقدير غير متحيز.
+    """
+    domains = state["domains"]
+    unassigned = state["unassigned"]
+    remaining = list(course_ids)
+    mark = len(state["domain_trail"])
+    removed = []
+    estimate = 1
+    try:
+        while len(remaining) > 1:
+            course_id = min(remaining, key=lambda other_id: domains[other_id].bit_count())
+            remaining.remove(course_id)
+            position = unassigned.index(course_id)
+            del unassigned[position]
+            removed.append((position, course_id))
+            domain = domains[course_id]
+            estimate *= domain.bit_count()
+            for _ in range(rng.randrange(domain.bit_count())):
+                domain &= domain - 1
+            value_index = (domain & -domain).bit_length() - 1
+            proposed_start_time, proposed_room = state["values"][value_index]
+            end_time = proposed_start_time + state["model"]["course_durations"][course_id]
+            if not _prune_after_assignment(state, course_id, proposed_start_time, end_time, proposed_room):
+                return 0
+        return estimate * domains[remaining[0]].bit_count()
+    finally:
+        _undo_domains(state, mark)
+        for position, course_id in reversed(removed):
+            unassigned.insert(position, course_id)
+
+def count_solutions(problem_data, possible_times_and_rooms=None, initial_schedule=None, method="exact", samples=200,
+                    seed=0, node_limit=None, time_limit=None, strict_precedence=True):
+    """
+    تعدّ حلول المسألة (الجداول الصالحة المختلفة في وقت أو قاعة دورة واحدة على الأقل) دون إنتاجها.
+    method="exact" عدّ دقيق بتقسيم المكوّنات والتخزين المؤقت (حتى node_limit عقدة أو time_limit ثانية)،
+    و method="estimate" تقدير Knuth بمتوسط samples مساراً عشوائياً لكل مكوّن مستقل (seed للتكرار)؛ مع
+    time_limit يُكتفى بالمسارات التي اكتملت قبل المهلة (مسار واحد على الأقل لكل مكوّن).
+    تُرجع قاموساً: count (عدد صحيح، مقرَّب للتقدير، أو None إذا نفدت الميزانية)، status ("exact" أو
+    "estimate" أو سبب التوقف)، log10_count، components (أحجام المكوّنات المستقلة عند الجذر)، nodes،
+    cache_hits، و elapsed_ms. الدورات المجدولة في initial_schedule تبقى ثابتة.
+    """
+    started = time.perf_counter()
+    model = get_compiled_problem(problem_data)
+    if possible_times_and_rooms is None:
+        possible_times_and_rooms = build_possible_times_and_rooms(model)
+    course_names = list(dict.fromkeys(model["course_names"]))
+    curr_schedule = {}
+    for course_name in course_names:
+        details = (initial_schedule or {}).get(course_name) or {}
+        curr_schedule[course_name] = {"start_time": details.get("start_time"), "end_time": details.get("end_time"),
+                                      "room": details.get("room")}
+
+    state = new_domain_state(curr_schedule, model, course_names, possible_times_and_rooms, strict_precedence)
+    counting = {"cache": {}, "cache_hits": 0, "nodes": 0, "node_limit": node_limit, "aborted": None,
+                "deadline": None if time_limit is None else started + time_limit, "room_value_masks": {}}
+    components = []
+    count = 0
+    log10_count = float("-inf")
+    status = method if method == "estimate" else "exact"
+    if state is not None:
+        for room, room_masks in state["room_masks_by_start"].items():
+            room_value_mask = 0
+            for mask in room_masks.values():
+                room_value_mask |= mask
+            counting["room_value_masks"][room] = room_value_mask
+        components = _residual_components(state, list(state["unassigned"]), counting["room_value_masks"])
+        count = 1
+        if method == "estimate":
+            # حاصل ضرب المتوسطات بأعداد صحيحة (البسط مجموع المسارات والمقام samples لكل مكوّن) لأن أعداد
+            # الحلول في المسائل الكبيرة تتجاوز مدى الأعداد العشرية
+            rng = random.Random(seed)
+            denominator = 1
+            for component in components:
+                total = taken = 0
+                while taken < samples and not (taken and counting["deadline"] is not None and
+                                               time.perf_counter() >= counting["deadline"]):
+                    total += _estimate_component(state, component, rng)
+                    taken += 1
+                count *= total
+                denominator *= taken
+                counting["nodes"] += taken * (len(component) - 1)
+            log10_count = math.log10(count) - math.log10(denominator) if count else float("-inf")
+            count = (count + denominator // 2) // denominator
+        else:
+            for component in components:
+                count *= _count_component(state, component, counting)
+                if not count:
+                    break
+            if counting["aborted"]:
+                count, status = None, counting["aborted"]
+            log10_count = None if count is None else (math.log10(count) if count else float("-inf"))
+
+    return {
+        "count": count,
+        "status": status,
+        "log10_count": log10_count,
+        "components": sorted((len(component) for component in components), reverse=True),
+        "nodes": counting["nodes"],
+        "cache_hits": counting["cache_hits"],
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+#  القيود المرنة والتحسين بالتفرع والتحديد (branch-and-bound) 
+#  problem_data["soft_constraints"] (اختياري، بجانب "constraints") يحدد كلفة الجدول الصالح:
+#    room_preferences: [{"course_name", "rooms": [...], "weight"}] — الكلفة weight إن وُضعت الدورة خارج قاعاتها المفضلة.
+#    instructor_time_preferences: [{"instructor_name", "preferred_times": [(بداية، نهاية)], "weight"}]
+#        — الكلفة weight لكل دورة للمحاضر لا تقع كاملة داخل إحدى فتراته المفضلة.
+#    student_groups: [{"courses": [...], "weight"}] — دورات يحضرها الطلاب أنفسهم؛ الكلفة weight × ساعات
+#        الفراغ بين أول بداية وآخر نهاية لدورات المجموعة.
+#    room_balance: {"weight"} — توازن استخدام القاعات؛ الكلفة weight × مجموع مربعات ساعات إشغال كل قاعة.
+#  البحث يبني على الفحص الأمامي (نفس المجالات وMRV) ويرتب قيم كل دورة حسب كلفتها الإضافية، ويقطع
+#  كل فرع يصل حده الأدنى للكلفة إلى كلفة أفضل حل وُجد. الحد الأدنى مقبول (لا يتجاوز الكلفة الحقيقية):
+#  الكلفة الدقيقة للدورات المجدولة + أقل كلفة أحادية في مجال كل دورة غير مجدولة + أقل مجموع مربعات ممكن
+#  لتوزيع الساعات المتبقية على القاعات (ملء مائي يتجاهل قيود السعة). لتفضيلات أوقات المحاضرين يُحسب أيضاً
+#  حد "برج الحمام": إذا لم تتسع الساعات الحرة في الفترة المفضلة لكل دوراته فبعضها سيقع خارجها حتماً.
+
+_COST_EPSILON = 1e-9
+
+def _soft_unary_cost(model, course_id, start_time, room_id):
+    """كلفة تفضيلات القاعة ووقت المحاضر لتعيين واحد (لا تعتمد على بقية الجدول)."""
+    cost = 0.0
+    for preferred_rooms, weight in model["course_room_preferences"][course_id]:
+        if room_id not in preferred_rooms:
+            cost += weight
+    instructor_id = model["course_instructor"][course_id]
+    if instructor_id >= 0:
+        end_time = start_time + model["course_durations"][course_id]
+        for preferred_times, weight in model["instructor_time_preferences"][instructor_id]:
+            if not _fits_in_windows(preferred_times, start_time, end_time):
+                cost += weight
+    return cost
+
+def _student_group_gap(intervals):
+    """ساعات الفراغ بين أول بداية وآخر نهاية لمجموعة فترات (صفر إن تداخلت الفترات أو تلاصقت)."""
+    span = max(end_time for _, end_time in intervals) - min(start_time for start_time, _ in intervals)
+    return max(0.0, span - sum(end_time - start_time for start_time, end_time in intervals))
+
+def _balanced_usage_bound(room_usage, remaining_hours):
+    """
+    أقل مجموع مربعات ممكن لإشغال القاعات بعد توزيع remaining_hours ساعة إضافية عليها
+    (ملء مائي: تُرفع القاعات الأقل إشغالاً إلى مستوى واحد).
+    """
+    usages = sorted(room_usage)
+    if remaining_hours <= 0 or not usages:
+        return sum(usage * usage for usage in usages)
+    filled_total = remaining_hours
+    for count, usage in enumerate(usages, start=1):
+        filled_total += usage
+        level = filled_total / count
+        if count == len(usages) or level <= usages[count]:
+            return count * level * level + sum(usage * usage for usage in usages[count:])
+
+def _free_hours(windows, working_hours, unavailable_times):
+    """طول اتحاد الفترات windows داخل ساعات العمل بعد طرح فترات عدم التوفر."""
+    points = []
+    for window_start, window_end in windows:
+        window_start, window_end = max(window_start, working_hours[0]), min(window_end, working_hours[1])
+        if window_start < window_end:
+            points.append((window_start, 1))
+            points.append((window_end, -1))
+    for unavailable_start, unavailable_end in unavailable_times:
+        points.append((unavailable_start, 1000))
+        points.append((unavailable_end, -1000))
+    points.sort()
+    total = 0.0
+    depth = 0
+    previous = None
+    for point, change in points:
+        # الزمن حر إذا كان داخل فترة مفضلة واحدة على الأقل وخارج كل فترات عدم التوفر
+        if previous is not None and 0 < depth < 1000:
+            total += point - previous
+        depth += change
+        previous = point
+    return total
+
+def soft_constraint_cost(schedule, problem_data):
+    """
+    تحسب كلفة القيود المرنة لجدول (الدورات المجدولة فقط) وتُرجع قاموساً:
+    room_preferences، instructor_time_preferences، student_gaps، room_balance، و total.
+    """
+    model = get_compiled_problem(problem_data)
+    course_ids = model["course_ids"]
+    breakdown = {"room_preferences": 0.0, "instructor_time_preferences": 0.0, "student_gaps": 0.0, "room_balance": 0.0}
+    intervals = {}
+    room_usage = [0.0] * len(model["room_names"])
+    for course_name, details in schedule.items():
+        course_id = course_ids.get(course_name)
+        if course_id is None or details.get("start_time") is None:
+            continue
+        start_time = details["start_time"]
+        end_time = start_time + model["course_durations"][course_id]
+        room_id = model["room_ids"].get(details.get("room"), -1)
+        intervals[course_id] = (start_time, end_time)
+        if room_id >= 0:
+            room_usage[room_id] += end_time - start_time
+        for preferred_rooms, weight in model["course_room_preferences"][course_id]:
+            if room_id not in preferred_rooms:
+                breakdown["room_preferences"] += weight
+        instructor_id = model["course_instructor"][course_id]
+        if instructor_id >= 0:
+            for preferred_times, weight in model["instructor_time_preferences"][instructor_id]:
+                if not _fits_in_windows(preferred_times, start_time, end_time):
+                    breakdown["instructor_time_preferences"] += weight
+
+    for member_ids, weight in model["student_groups"]:
+        member_intervals = [intervals[course_id] for course_id in member_ids if course_id in intervals]
+        if len(member_intervals) > 1:
+            breakdown["student_gaps"] += weight * _student_group_gap(member_intervals)
+    breakdown["room_balance"] = model["room_balance_weight"] * sum(usage * usage for usage in room_usage)
+    breakdown["total"] = sum(breakdown.values())
+    return breakdown
+
+def _new_branch_and_bound(state, curr_schedule, use_bound):
+    """
+    تبني حالة التحسين فوق حالة الفحص الأمامي: الكلفة الأحادية لكل (دورة، قيمة)، ومستويات الكلفة
+    لكل دورة [(كلفة، قناع القيم)] تصاعدياً لحساب أقل كلفة في المجال، وإشغال القاعات، والكلفة
+    الدقيقة للدورات المجدولة مسبقاً.
+    """
+    model = state["model"]
+    values = state["values"]
+    room_ids = model["room_ids"]
+    value_rooms = [room_ids.get(proposed_room, -1) for _, proposed_room in values]
+    num_courses = len(model["course_names"])
+
+    bnb = {
+        "use_bound": use_bound,
+        "value_rooms": value_rooms,
+        "unary_costs": [None] * num_courses,
+        "cost_levels": [None] * num_courses,
+        "room_usage": [0.0] * len(model["room_names"]),
+        "balance_weight": model["room_balance_weight"],
+        "balance_sq": 0.0,
+        "remaining_hours": sum(model["course_durations"][course_id] for course_id in state["unassigned"]),
+        "group_remaining": [0] * len(model["student_groups"]),
+        "start": [None] * num_courses,
+        "end": [None] * num_courses,
+        "cost": 0.0,
+        "best_cost": float('inf'),
+        "prunes": 0,
+        "solutions": 0,
+    }
+
+    for course_id in state["unassigned"]:
+        instructor_id = model["course_instructor"][course_id]
+        if not model["course_room_preferences"][course_id] and \
+           (instructor_id < 0 or not model["instructor_time_preferences"][instructor_id]):
+            continue
+        unary_costs = [_soft_unary_cost(model, course_id, proposed_start_time, value_rooms[value_index])
+                       for value_index, (proposed_start_time, _) in enumerate(values)]
+        levels = {}
+        for value_index, cost in enumerate(unary_costs):
+            levels[cost] = levels.get(cost, 0) | 1 << value_index
+        bnb["unary_costs"][course_id] = unary_costs
+        bnb["cost_levels"][course_id] = sorted(levels.items())
+
+    # حد برج الحمام لكل تفضيل وقت: (المحاضر، الفترات، الوزن، الساعات الحرة، قناع القيم داخل الفترات لكل دورة)
+    # مع مستويات كلفة تفضيلات القاعات وحدها للدورات غير المجدولة
+    bnb["time_preferences"] = []
+    bnb["room_cost_levels"] = [None] * num_courses
+    instructor_courses = [[] for _ in model["instructor_names"]]
+    for course_id in range(num_courses):
+        if model["course_instructor"][course_id] >= 0:
+            instructor_courses[model["course_instructor"][course_id]].append(course_id)
+    for instructor_id, preferences in enumerate(model["instructor_time_preferences"]):
+        for preferred_times, weight in preferences:
+            free_hours = _free_hours(preferred_times, model["working_hours"], model["instructor_unavailable_times"][instructor_id])
+            in_window_masks = {}
+            for course_id in instructor_courses[instructor_id]:
+                duration = model["course_durations"][course_id]
+                in_window_masks[course_id] = sum(
+                    1 << value_index for value_index, (proposed_start_time, _) in enumerate(values)
+                    if _fits_in_windows(preferred_times, proposed_start_time, proposed_start_time + duration))
+            bnb["time_preferences"].append((preferred_times, weight, free_hours, in_window_masks))
+    if bnb["time_preferences"]:
+        for course_id in state["unassigned"]:
+            if model["course_room_preferences"][course_id]:
+                levels = {}
+                for value_index, room_id in enumerate(value_rooms):
+                    cost = sum(weight for preferred_rooms, weight in model["course_room_preferences"][course_id]
+                               if room_id not in preferred_rooms)
+                    levels[cost] = levels.get(cost, 0) | 1 << value_index
+                bnb["room_cost_levels"][course_id] = sorted(levels.items())
+
+    unassigned = set(state["unassigned"])
+    assigned = [course_id for course_id in range(num_courses) if course_id not in unassigned]
+    for group_index, (member_ids, _) in enumerate(model["student_groups"]):
+        bnb["group_remaining"][group_index] = sum(1 for course_id in member_ids if course_id in unassigned)
+    for course_id in assigned:
+        details = curr_schedule.get(model["course_names"][course_id]) or {}
+        if details.get("start_time") is None:
+            continue
+        start_time = details["start_time"]
+        bnb["start"][course_id] = start_time
+        bnb["end"][course_id] = start_time + model["course_durations"][course_id]
+        room_id = room_ids.get(details.get("room"), -1)
+        bnb["cost"] += _soft_unary_cost(model, course_id, start_time, room_id)
+        if room_id >= 0:
+            bnb["room_usage"][room_id] += model["course_durations"][course_id]
+    bnb["balance_sq"] = sum(usage * usage for usage in bnb["room_usage"])
+    bnb["cost"] += bnb["balance_weight"] * bnb["balance_sq"]
+    for group_index, (member_ids, weight) in enumerate(model["student_groups"]):
+        if bnb["group_remaining"][group_index] == 0:
+            member_intervals = [(bnb["start"][course_id], bnb["end"][course_id]) for course_id in member_ids
+                                if bnb["start"][course_id] is not None]
+            if len(member_intervals) > 1:
+                bnb["cost"] += weight * _student_group_gap(member_intervals)
+    return bnb
+
+def _min_domain_cost(bnb, state, course_id):
+    """أقل كلفة أحادية بين القيم المتبقية في مجال الدورة."""
+    levels = bnb["cost_levels"][course_id]
+    if levels is None:
+        return 0.0
+    domain = state["domains"][course_id]
+    for cost, mask in levels:
+        if domain & mask:
+            return cost
+    return 0.0
+
+def _time_preference_bound(bnb, state):
+    """
+    حد أدنى بديل لكلفة الدورات غير المجدولة: أقل كلفة تفضيلات قاعات في كل مجال، مع عدد الدورات التي
+    ستقع خارج الفترة المفضلة لمحاضرها حتماً لكل تفضيل وقت (لا قيمة لها داخل الفترة، أو لا تتسع لها
+    الساعات الحرة المتبقية فيها بعد الدورات المجدولة، حتى بأقصر المدد أولاً).
+    """
+    model = state["model"]
+    domains = state["domains"]
+    bound = 0.0
+    for course_id in state["unassigned"]:
+        levels = bnb["room_cost_levels"][course_id]
+        if levels is not None:
+            for cost, mask in levels:
+                if domains[course_id] & mask:
+                    bound += cost
+                    break
+    for preferred_times, weight, free_hours, in_window_masks in bnb["time_preferences"]:
+        forced = 0
+        capable_durations = []
+        for course_id, mask in in_window_masks.items():
+            start_time = bnb["start"][course_id]
+            if start_time is not None:
+                end_time = bnb["end"][course_id]
+                for window_start, window_end in preferred_times:
+                    free_hours -= max(0.0, min(end_time, window_end) - max(start_time, window_start))
+            elif domains[course_id] & mask:
+                capable_durations.append(model["course_durations"][course_id])
+            else:
+                forced += 1
+        capable_durations.sort()
+        fitting = 0
+        for duration in capable_durations:
+            if duration > free_hours + _COST_EPSILON:
+                break
+            free_hours -= duration
+            fitting += 1
+        bound += weight * (forced + len(capable_durations) - fitting)
+    return bound
+
+def _cost_lower_bound(bnb, state):
+    """
+    تُرجع (حداً أدنى لكلفة أي حل يكمل الجدول الجزئي الحالي، مجموع أقل الكلف الأحادية للدورات غير المجدولة).
+    """
+    unassigned_bound = sum(_min_domain_cost(bnb, state, course_id) for course_id in state["unassigned"])
+    bound = bnb["cost"] + unassigned_bound
+    if bnb["time_preferences"]:
+        bound = max(bound, bnb["cost"] + _time_preference_bound(bnb, state))
+    if bnb["balance_weight"]:
+        bound += bnb["balance_weight"] * (_balanced_usage_bound(bnb["room_usage"], bnb["remaining_hours"]) - bnb["balance_sq"])
+    return bound, unassigned_bound
+
+def _value_costs(state, bnb, course_id):
+    """
+    تُرجع [(مفتاح الترتيب، الكلفة الإضافية، رقم القيمة)] لقيم مجال الدورة مرتبة تصاعدياً حسب المفتاح.
+    الكلفة الإضافية دقيقة: الكلفة الأحادية، وزيادة مجموع مربعات إشغال القاعة، وفراغات مجموعات الطلاب
+    التي تكتمل بهذه الدورة. المفتاح يضيف إليها تغيّر فراغ المجموعات التي لم تكتمل بعد (تقدير فقط،
+    لا يدخل في الحد الأدنى) كي تُجرَّب أولاً القيم التي تُبقي دورات المجموعة متقاربة.
+    """
+    model = state["model"]
+    values = state["values"]
+    duration = model["course_durations"][course_id]
+    unary_costs = bnb["unary_costs"][course_id]
+    balance_weight = bnb["balance_weight"]
+    room_usage = bnb["room_usage"]
+    value_rooms = bnb["value_rooms"]
+    groups = []
+    for group_index in model["course_student_groups"][course_id]:
+        member_ids, weight = model["student_groups"][group_index]
+        others = [(bnb["start"][other_id], bnb["end"][other_id]) for other_id in member_ids
+                  if other_id != course_id and bnb["start"][other_id] is not None]
+        if others:
+            closing = bnb["group_remaining"][group_index] == 1
+            groups.append((others, weight, closing, _student_group_gap(others)))
+
+    value_costs = []
+    domain = state["domains"][course_id]
+    while domain:
+        low_bit = domain & -domain
+        domain ^= low_bit
+        value_index = low_bit.bit_length() - 1
+        cost = unary_costs[value_index] if unary_costs is not None else 0.0
+        if balance_weight:
+            room_id = value_rooms[value_index]
+            if room_id >= 0:
+                cost += balance_weight * (2 * room_usage[room_id] + duration) * duration
+        key = cost
+        if groups:
+            proposed_start_time = values[value_index][0]
+            for others, weight, closing, previous_gap in groups:
+                gap = weight * _student_group_gap(others + [(proposed_start_time, proposed_start_time + duration)])
+                if closing:
+                    cost += gap
+                    key += gap
+                else:
+                    key += gap - weight * previous_gap
+        value_costs.append((key, cost, value_index))
+    if state["tie_break"] == "random":
+        # خلط القيم متساوية المفتاح فقط (الترتيب مستقر بعد الخلط)
+        state["rng"].shuffle(value_costs)
+        value_costs.sort(key=lambda value_cost: value_cost[0])
+    else:
+        value_costs.sort()
+    return value_costs
+
+def _branch_and_bound_search(curr_schedule, state, trail, bnb):
+    """
+    مولّد البحث بالتفرع والتحديد فوق حالة الفحص الأمامي: يُنتج نسخة من كل حل كامل أقل كلفة
+    من أفضل حل سابق. بدون bnb["use_bound"] يُستكشف كل الفضاء (للمقارنة) مع نفس ترتيب القيم.
+    """
+    stats = _active_instrumentation
+    if not state["unassigned"]:
+        if bnb["cost"] < bnb["best_cost"] - _COST_EPSILON:
+            bnb["best_cost"] = bnb["cost"]
+            bnb["solutions"] += 1
+            if stats is not None:
+                _record_search_event(stats, "solution", None, len(curr_schedule))
+            yield {course_name: dict(details) for course_name, details in curr_schedule.items()}
+        return
+
+    state["nodes"] += 1
+    if state["node_limit"] is not None and state["nodes"] > state["node_limit"]:
+        state["aborted"] = True
+        return
+    if state["should_stop"] is not None and state["nodes"] % 256 == 0 and state["should_stop"]():
+        state["aborted"] = True
+        return
+
+    use_bound = bnb["use_bound"]
+    unassigned_bound = 0.0
+    if use_bound:
+        bound, unassigned_bound = _cost_lower_bound(bnb, state)
+        if bound >= bnb["best_cost"] - _COST_EPSILON:
+            bnb["prunes"] += 1
+            return
+
+    model = state["model"]
+    course_id = select_mrv_course(state)
+    course_name = model["course_names"][course_id]
+    course_duration = model["course_durations"][course_id]
+    room_id_by_value = bnb["value_rooms"]
+    values = state["values"]
+    rest_bound = unassigned_bound - _min_domain_cost(bnb, state, course_id)
+
+    position = state["unassigned"].index(course_id)
+    del state["unassigned"][position]
+    if stats is not None:
+        depth = len(curr_schedule) - len(state["unassigned"]) - 1
+        _record_search_event(stats, "node", course_name, depth)
+
+    mark = len(trail)
+    domain_mark = len(state["domain_trail"])
+    saved = (bnb["cost"], bnb["balance_sq"], bnb["remaining_hours"])
+    room_occupancy = state["room_occupancy"]
+    tried_symmetric = set()
+    for _, delta, value_index in _value_costs(state, bnb, course_id):
+        if use_bound and saved[0] + delta + rest_bound >= bnb["best_cost"] - _COST_EPSILON:
+            bnb["prunes"] += 1
+            continue
+        proposed_start_time, proposed_room = values[value_index]
+        if room_occupancy and _symmetric_value_tried(state, tried_symmetric, proposed_start_time, proposed_room):
+            continue
+        proposed_end_time = proposed_start_time + course_duration
+        room_id = room_id_by_value[value_index]
+
+        bnb["cost"] = saved[0] + delta
+        bnb["remaining_hours"] = saved[2] - course_duration
+        if room_id >= 0:
+            bnb["room_usage"][room_id] += course_duration
+            bnb["balance_sq"] = saved[1] + (2 * bnb["room_usage"][room_id] - course_duration) * course_duration
+        bnb["start"][course_id], bnb["end"][course_id] = proposed_start_time, proposed_end_time
+        for group_index in model["course_student_groups"][course_id]:
+            bnb["group_remaining"][group_index] -= 1
+
+        _trail_assign(curr_schedule, trail, course_name, proposed_start_time, proposed_end_time, proposed_room)
+        if proposed_room in room_occupancy:
+            previous_occupancy = room_occupancy[proposed_room]
+            room_occupancy[proposed_room] = previous_occupancy | {(proposed_start_time, proposed_end_time)}
+        if _prune_after_assignment(state, course_id, proposed_start_time, proposed_end_time, proposed_room):
+            yield from _branch_and_bound_search(curr_schedule, state, trail, bnb)
+        if proposed_room in room_occupancy:
+            room_occupancy[proposed_room] = previous_occupancy
+        _undo_domains(state, domain_mark)
+        _trail_undo(curr_schedule, trail, mark)
+
+        for group_index in model["course_student_groups"][course_id]:
+            bnb["group_remaining"][group_index] += 1
+        bnb["start"][course_id] = bnb["end"][course_id] = None
+        if room_id >= 0:
+            bnb["room_usage"][room_id] -= course_duration
+        bnb["cost"], bnb["balance_sq"], bnb["remaining_hours"] = saved
+        if state["aborted"]:
+            break
+
+    state["unassigned"].insert(position, course_id)
+    if stats is not None:
+        _record_search_event(stats, "backtrack", course_name, depth)
+
+def iter_improving_schedules(curr_schedule, problem_data, all_course_names, possible_times_and_rooms,
+                             time_limit=None, node_limit=None, use_bound=True, strict_precedence=True, should_stop=None,
+                             restart_policy="luby", restart_base=1000, seed=0, symmetry_breaking=False):
+    """
+    مولّد يُنتج الحلول المحسّنة تباعاً فور إيجادها (كل حل أقل كلفة من سابقه) كقواميس:
+    schedule، cost، nodes، prunes، restarts، elapsed_ms. عند انتهائه يُرجع (قيمة StopIteration) ملخصاً:
+    best_cost، lower_bound (الحد الأدنى للكلفة عند الجذر)، nodes، prunes، restarts، solutions، و optimal
+    (True إذا استُكشف الفضاء كاملاً دون انقطاع، أي أن آخر حل أُنتج هو الأمثل). يتوقف البحث بعد time_limit ثانية أو node_limit عقدة (إجمالاً)
+    أو عندما تُرجع should_stop القيمة True. use_bound=False يعطل قطع الفروع بالحد الأدنى (للمقارنة).
+    البحث بالعمق أولاً يعلق في أسفل الشجرة بعد أول حل، لذا يُعاد تشغيله وفق restart_policy
+    (كما في solve_with_restarts: "luby" أو "geometric" أو "none") مع كسر تعادل عشوائي بعد التشغيل الأول؛
+    أفضل كلفة تبقى حداً للقطع عبر إعادات التشغيل.
+    strict_precedence=True افتراضياً كي تكون كل الحلول صالحة وفق validate_schedule.
+    symmetry_breaking=True يتخطى الفروع المتماثلة (القاعات والشُعب المتكافئة لها الكلفة نفسها).
+    """
+    start = time.perf_counter()
+    model = get_compiled_problem(problem_data)
+    state = new_domain_state(curr_schedule, model, all_course_names, possible_times_and_rooms, strict_precedence,
+                             symmetry_breaking)
+    summary = {"best_cost": None, "lower_bound": None, "nodes": 0, "prunes": 0, "restarts": 0, "solutions": 0,
+               "optimal": state is None}
+    if state is None:
+        return summary
+
+    deadline = None if time_limit is None else start + time_limit
+    if deadline is not None or should_stop is not None:
+        state["should_stop"] = lambda: ((deadline is not None and time.perf_counter() >= deadline) or
+                                        (should_stop is not None and should_stop()))
+    state["rng"] = random.Random(seed)
+    bnb = _new_branch_and_bound(state, curr_schedule, use_bound)
+    summary["lower_bound"] = _cost_lower_bound(bnb, state)[0]
+
+    total_nodes = 0
+    restart_index = 0
+    while True:
+        restart_index += 1
+        limit = None
+        if restart_policy == "luby":
+            limit = restart_base * _luby(restart_index)
+        elif restart_policy == "geometric":
+            limit = int(restart_base * 1.5 ** (restart_index - 1))
+        if node_limit is not None:
+            limit = node_limit - total_nodes if limit is None else min(limit, node_limit - total_nodes)
+        state["node_limit"] = limit
+        state["nodes"] = 0
+        state["aborted"] = False
+
+        for schedule in _branch_and_bound_search(curr_schedule, state, [], bnb):
+            yield {"schedule": schedule, "cost": bnb["best_cost"], "nodes": total_nodes + state["nodes"],
+                   "prunes": bnb["prunes"], "restarts": restart_index - 1, "elapsed_ms": (time.perf_counter() - start) * 1000}
+        total_nodes += state["nodes"]
+
+        if not state["aborted"]:
+            break
+        if (node_limit is not None and total_nodes >= node_limit) or \
+           (state["should_stop"] is not None and state["should_stop"]()):
+            break
+        state["tie_break"] = "random"
+
+    summary.update({
+        "best_cost": bnb["best_cost"] if bnb["solutions"] else None,
+        "nodes": total_nodes,
+        "prunes": bnb["prunes"],
+        "restarts": restart_index - 1,
+        "solutions": bnb["solutions"],
+        "optimal": not state["aborted"],
+    })
+    return summary
+
+def optimize_schedule(problem_data, possible_times_and_rooms=None, initial_schedule=None, time_limit=10.0,
+                      node_limit=None, use_bound=True, strict_precedence=True, on_solution=None,
+                      restart_policy="luby", restart_base=1000, seed=0, symmetry_breaking=False):
+    """
+    تبحث عن جدول صالح بأقل كلفة للقيود المرنة بالتفرع والتحديد (الدورات المجدولة في
+    initial_schedule تبقى ثابتة). on_solution تُستدعى مع كل حل محسّن فور إيجاده، وبقية المعاملات
+    كما في iter_improving_schedules.
+    تُرجع قاموساً: schedule (أفضل حل أو None)، cost (تفصيل soft_constraint_cost)، status
+    ("optimal" أو "feasible" عند انتهاء الميزانية قبل إثبات الأمثلية، أو "infeasible" أو "unknown")،
+    lower_bound (حد أدنى مثبت للكلفة المثلى)، nodes، prunes، restarts، solutions (عدد الحلول المحسّنة)،
+    first_cost، time_to_best_ms، و elapsed_ms.
+    """
+    start = time.perf_counter()
+    model = get_compiled_problem(problem_data)
+    if possible_times_and_rooms is None:
+        possible_times_and_rooms = build_possible_times_and_rooms(model)
+    course_names = list(dict.fromkeys(model["course_names"]))
+    curr_schedule = {}
+    for course_name in course_names:
+        details = (initial_schedule or {}).get(course_name) or {}
+        curr_schedule[course_name] = {"start_time": details.get("start_time"), "end_time": details.get("end_time"),
+                                      "room": details.get("room")}
+
+    best = None
+    first_cost = None
+    search = iter_improving_schedules(curr_schedule, model, course_names, possible_times_and_rooms, time_limit=time_limit,
+                                      node_limit=node_limit, use_bound=use_bound, strict_precedence=strict_precedence,
+                                      restart_policy=restart_policy, restart_base=restart_base, seed=seed,
+                                      symmetry_breaking=symmetry_breaking)
+    while True:
+        try:
+            improvement = next(search)
+        except StopIteration as stop:
+            summary = stop.value
+            break
+        best = improvement
+        if first_cost is None:
+            first_cost = improvement["cost"]
+        if on_solution is not None:
+            on_solution(improvement)
+
+    if best is not None:
+        status = "optimal" if summary["optimal"] else "feasible"
+    else:
+        status = "infeasible" if summary["optimal"] else "unknown"
+    return {
+        "schedule": best["schedule"] if best else None,
+        "cost": soft_constraint_cost(best["schedule"], model) if best else None,
+        "status": status,
+        "lower_bound": summary["lower_bound"],
+        "nodes": summary["nodes"],
+        "prunes": summary["prunes"],
+        "restarts": summary["restarts"],
+        "solutions": summary["solutions"],
+        "first_cost": first_cost,
+        "time_to_best_ms": best["elapsed_ms"] if best else None,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+def backtracking_search_branch_and_bound(curr_schedule, problem_data, all_course_names, possible_times_and_rooms, time_limit=10.0):
+    """
+    التفرع والتحديد بنفس توقيع بقية أنماط الحل: تكتب أفضل حل وُجد خلال time_limit ثانية
+    في curr_schedule وتُرجعه، أو None إن لم يوجد حل.
+    """
+    best = None
+    for improvement in iter_improving_schedules(curr_schedule, problem_data, all_course_names, possible_times_and_rooms,
+                                                time_limit=time_limit):
+        best = improvement["schedule"]
+    if best is None:
+        return None
+    curr_schedule.update(best)
+    return curr_schedule
+
+
+# أنماط الحل المتاحة (جميعها بنفس التوقيع)
+SOLVER_MODES = {
+    "deepcopy": backtracking_search_optimized,
+    "inplace": backtracking_search_inplace,
+    "backjumping": backtracking_search_backjumping,
+    "forward_checking": backtracking_search_forward_checking,
+    "ac3": backtracking_search_ac3,
+    "symmetry": backtracking_search_symmetry,
+    "iterative": backtracking_search_iterative,
+    "branch_and_bound": backtracking_search_branch_and_bound,
+}
+
+# أنماط تتوقف عند حد زمني، فإرجاعها None لا يثبت أن المسألة بلا حل
+BUDGET_LIMITED_MODES = frozenset({"branch_and_bound"})
+
+class _SearchAborted(Exception):
+    """تُرفع من callback القياس لقطع نمط حل تجاوز ميزانيته أو أُلغي."""
+
+def run_solver_mode(solver_mode, curr_schedule, problem_data, all_course_names, possible_times_and_rooms,
+                    node_limit=None, time_limit=None, should_stop=None):
+    """
+    تشغّل نمطاً من SOLVER_MODES بميزانية: الأنماط لا تأخذ ميزانية، لكنها كلها تُطلق أحداث بحث لكل عقدة،
+    فتُقيَّد بـ callback قياس يقطع البحث عند تجاوز node_limit أو time_limit (ثانية) أو عندما تُرجع should_stop
+    True. تستخدم القياس العام، فلا تُستدعى أثناء قياس مفعّل (start_instrumentation).
+    تُرجع قاموساً: schedule (أو None)، status ("solved"، "infeasible" إن أثبت بحث كامل عدم وجود حل،
+    "budget_exhausted"، أو "cancelled")، و nodes.
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    stopped = {"status": None}
+
+    def enforce_budget(record):
+        if node_limit is not None and stats["nodes"] > node_limit:
+            stopped["status"] = "budget_exhausted"
+        elif deadline is not None and time.perf_counter() > deadline:
+            stopped["status"] = "budget_exhausted"
+        elif should_stop is not None and should_stop():
+            stopped["status"] = "cancelled"
+        if stopped["status"] is not None:
+            raise _SearchAborted()
+
+    stats = start_instrumentation(callback=enforce_budget, time_checkers=False)
+    try:
+        solution = SOLVER_MODES[solver_mode](curr_schedule, problem_data, all_course_names, possible_times_and_rooms)
+    except _SearchAborted:
+        solution = None
+    finally:
+        stop_instrumentation()
+    if solution is not None:
+        status = "solved"
+    elif stopped["status"] is not None:
+        status = stopped["status"]
+    else:
+        status = "budget_exhausted" if solver_mode in BUDGET_LIMITED_MODES else "infeasible"
+    return {"schedule": solution, "status": status, "nodes": stats["nodes"]}
+
+
+def build_time_grid(problem_data, time_increment=1.0):
+    """
+    تبني شبكة أوقات مضغوطة: أوقات البداية الممكنة كفهارس صحيحة (working_start + k * time_increment)
+    بدلاً من جمع الأعداد العشرية المتكرر، ولكل قاعة فترات فهارس [أول، آخر) تكون فيها متاحة
+    لفترة time_increment كاملة (من جميع فترات توفرها)، وقناع bitset مكافئ فوق الفهارس.
+    """
+    if time_increment <= 0:
+        raise ValueError("time_increment يجب أن يكون موجباً")
+
+    model = get_compiled_problem(problem_data)
+    general_start, general_end = model["working_hours"]
+
+    starts = array("d")
+    slot_index = 0
+    while general_start + slot_index * time_increment < general_end:
+        starts.append(general_start + slot_index * time_increment)
+        slot_index += 1
+
+    room_slot_intervals = []
+    room_slot_masks = []
+    for windows in model["room_available_times"]:
+        intervals = []
+        for window_start, window_end in sorted(windows):
+            first = bisect.bisect_left(starts, window_start)
+            last = first
+            while last < len(starts) and starts[last] + time_increment <= window_end:
+                last += 1
+            if first >= last:
+                continue
+            if intervals and first <= intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], max(intervals[-1][1], last))
+            else:
+                intervals.append((first, last))
+        mask = 0
+        for first, last in intervals:
+            mask |= ((1 << (last - first)) - 1) << first
+        room_slot_intervals.append(intervals)
+        room_slot_masks.append(mask)
+
+    return {
+        "increment": time_increment,
+        "starts": starts,
+        "room_slot_intervals": room_slot_intervals,
+        "room_slot_masks": room_slot_masks,
+    }
+
+def build_possible_times_and_rooms(problem_data, time_increment=1.0):
+    """
+    تولّد جميع التركيبات الممكنة من (وقت البداية، القاعة) ضمن ساعات العمل،
+    مرتبة حسب الوقت. تدعم أي دقة زمنية (مثل 0.25 لربع ساعة) وعدة فترات توفر لكل قاعة.
+    """
+    model = get_compiled_problem(problem_data)
+    room_names = model["room_names"]
+    time_grid = build_time_grid(model, time_increment)
+    room_slot_masks = time_grid["room_slot_masks"]
+
+    all_possible_times_and_rooms = []
+    for slot_index, start_time in enumerate(time_grid["starts"]):
+        for room_id, room_name in enumerate(room_names):
+            # تحقق من توفر القاعة لفترة time_increment على الأقل من وقت البداية
+            if room_slot_masks[room_id] >> slot_index & 1:
+                all_possible_times_and_rooms.append((start_time, room_name))
+    return all_possible_times_and_rooms
+
+
+#  البحث المحلي (min-conflicts مع قائمة tabu) للمسائل الكبيرة جداً 
+#  يبدأ من تعيين جشع كامل ثم يحسّنه: في كل خطوة تُختار دورة متعارضة عشوائياً وتُنقل إلى أقل
+#  (وقت، قاعة) تعارضاً بين عينة من القيم المرشحة، مع منع العودة إلى قيم حديثة (tabu).
+#  عدد التعارضات لكل دورة يُحدَّث تدريجياً عند كل نقل عبر فهرس خلايا زمنية لكل قاعة ومحاضر،
+#  بنفس دلالات check_all_constraints على جدول كامل (التداخل، الأسبقية، والقيود الأحادية).
+#  البحث "anytime": يتوقف عند انتهاء الميزانية ويُرجع أفضل جدول وُجد مع مخالفاته المتبقية.
+
+def _ls_cells(ls, start_time, end_time):
+    """الخلايا الزمنية التي تغطيها الفترة [start_time, end_time)."""
+    origin = ls["cell_origin"]
+    width = ls["cell_width"]
+    return range(math.floor((start_time - origin) / width), math.ceil((end_time - origin) / width))
+
+def _ls_conflicting(ls, course_id, start_time, room_id):
+    """
+    الدورات المجدولة التي تتعارض مع وضع course_id في (start_time, room_id): تداخل القاعة،
+    تداخل المحاضر، تداخل دورة تشاركها طلاباً، والأسبقية في الاتجاهين (دورة تُحسب مرة لكل قيد تخالفه).
+    """
+    model = ls["model"]
+    starts = ls["start"]
+    ends = ls["end"]
+    end_time = start_time + model["course_durations"][course_id]
+    instructor_id = model["course_instructor"][course_id]
+    room_cells = ls["room_cells"]
+    instructor_cells = ls["instructor_cells"]
+
+    conflicting = []
+    seen_room = set()
+    seen_instructor = set()
+    for cell in _ls_cells(ls, start_time, end_time):
+        for other_id in room_cells.get((room_id, cell), ()):
+            if other_id != course_id and other_id not in seen_room and \
+               starts[other_id] < end_time and start_time < ends[other_id]:
+                seen_room.add(other_id)
+                conflicting.append(other_id)
+        if instructor_id >= 0:
+            for other_id in instructor_cells.get((instructor_id, cell), ()):
+                if other_id != course_id and other_id not in seen_instructor and \
+                   starts[other_id] < end_time and start_time < ends[other_id]:
+                    seen_instructor.add(other_id)
+                    conflicting.append(other_id)
+
+    rooms = ls["room"]
+    for other_id in model["course_conflicts"][course_id]:
+        if rooms[other_id] >= 0 and starts[other_id] < end_time and start_time < ends[other_id]:
+            conflicting.append(other_id)
+    for y_id in model["course_predecessors"][course_id]:
+        if rooms[y_id] >= 0 and y_id != course_id and start_time < ends[y_id]:
+            conflicting.append(y_id)
+    for x_id in model["course_successors"][course_id]:
+        if rooms[x_id] >= 0 and x_id != course_id and starts[x_id] < end_time:
+            conflicting.append(x_id)
+    return conflicting
+
+def _ls_unary_ok(ls, course_id, start_index, room_id):
+    """تتحقق من القيود الأحادية للقيمة (وقت البداية، القاعة) بنفس دلالات دوال التحقق."""
+    if not (ls["time_ok"][course_id] >> start_index & 1):
+        return False
+    model = ls["model"]
+    if model["course_students"][course_id] > model["room_capacities"][room_id]:
+        return False
+    allowed_rooms = model["course_allowed_rooms"][course_id]
+    if allowed_rooms is not None and room_id not in allowed_rooms:
+        return False
+    if (start_index, room_id) not in ls["available"]:
+        return False
+    start_time = ls["starts"][start_index]
+    return _fits_in_windows(model["room_available_times"][room_id], start_time,
+                            start_time + model["course_durations"][course_id])
+
+def _ls_place(ls, course_id, start_index, room_id):
+    """تضع الدورة في القيمة المعطاة وتحدّث فهارس الخلايا (الدورة غير موضوعة مسبقاً)."""
+    model = ls["model"]
+    start_time = ls["starts"][start_index]
+    end_time = start_time + model["course_durations"][course_id]
+    ls["start_index"][course_id] = start_index
+    ls["start"][course_id] = start_time
+    ls["end"][course_id] = end_time
+    ls["room"][course_id] = room_id
+    ls["start_load"][start_index] += 1
+    instructor_id = model["course_instructor"][course_id]
+    for cell in _ls_cells(ls, start_time, end_time):
+        ls["room_cells"].setdefault((room_id, cell), set()).add(course_id)
+        if instructor_id >= 0:
+            ls["instructor_cells"].setdefault((instructor_id, cell), set()).add(course_id)
+
+def _ls_unplace(ls, course_id):
+    """تزيل الدورة من فهارس الخلايا."""
+    model = ls["model"]
+    instructor_id = model["course_instructor"][course_id]
+    room_id = ls["room"][course_id]
+    for cell in _ls_cells(ls, ls["start"][course_id], ls["end"][course_id]):
+        ls["room_cells"][(room_id, cell)].discard(course_id)
+        if instructor_id >= 0:
+            ls["instructor_cells"][(instructor_id, cell)].discard(course_id)
+    ls["start_load"][ls["start_index"][course_id]] -= 1
+    ls["room"][course_id] = -1
+
+def _ls_set_conflicts(ls, course_id, conflicts):
+    """تحدّث عدد تعارضات دورة واحدة ومجموعة الدورات المتعارضة (قائمة + مواضع لاختيار عشوائي بـ O(1))."""
+    ls["total"] += conflicts - ls["conflicts"][course_id]
+    ls["conflicts"][course_id] = conflicts
+    positions = ls["conflicted_positions"]
+    conflicted = ls["conflicted"]
+    if conflicts and course_id not in positions:
+        positions[course_id] = len(conflicted)
+        conflicted.append(course_id)
+    elif not conflicts and course_id in positions:
+        position = positions.pop(course_id)
+        last_id = conflicted.pop()
+        if last_id != course_id:
+            conflicted[position] = last_id
+            positions[last_id] = position
+
+def _ls_move(ls, course_id, start_index, room_id):
+    """تنقل دورة (موضوعة أو غير موضوعة) إلى قيمة جديدة مع تحديث تعارضات جيرانها تدريجياً."""
+    conflicts = ls["conflicts"]
+    if ls["room"][course_id] >= 0:
+        for other_id in _ls_conflicting(ls, course_id, ls["start"][course_id], ls["room"][course_id]):
+            _ls_set_conflicts(ls, other_id, conflicts[other_id] - 1)
+        _ls_unplace(ls, course_id)
+
+    new_conflicting = _ls_conflicting(ls, course_id, ls["starts"][start_index], room_id)
+    _ls_place(ls, course_id, start_index, room_id)
+    for other_id in new_conflicting:
+        _ls_set_conflicts(ls, other_id, conflicts[other_id] + 1)
+    unary_penalty = 0 if _ls_unary_ok(ls, course_id, start_index, room_id) else 1
+    _ls_set_conflicts(ls, course_id, len(new_conflicting) + unary_penalty)
+
+def _ls_candidates(ls, course_id, rng, num_samples):
+    """
+    قيم مرشحة لدورة: كل أوقات البداية الصالحة في قاعتها الحالية، وكل القاعات الكافية في وقتها الحالي
+    (بحد num_samples)، وعينة عشوائية من أزواج (وقت، قاعة). تُستبعد القيم المخالفة للقيود الأحادية
+    ما لم تكن الدورة بلا أي قيمة صالحة أحادياً.
+    """
+    valid_starts = ls["valid_starts"][course_id]
+    first_room = ls["first_room_by_capacity"][course_id]
+    rooms_by_capacity = ls["rooms_by_capacity"]
+    num_starts = len(ls["starts"])
+    hopeless = not valid_starts or first_room >= len(rooms_by_capacity)
+
+    candidates = []
+    current_room = ls["room"][course_id]
+    if current_room >= 0 and not hopeless:
+        candidates.extend((start_index, current_room) for start_index in valid_starts)
+        current_start = ls["start_index"][course_id]
+        for _ in range(num_samples):
+            candidates.append((current_start, rooms_by_capacity[rng.randrange(first_room, len(rooms_by_capacity))]))
+    for _ in range(num_samples):
+        if hopeless:
+            candidates.append((rng.randrange(num_starts), rng.randrange(len(rooms_by_capacity))))
+        else:
+            candidates.append((rng.choice(valid_starts), rooms_by_capacity[rng.randrange(first_room, len(rooms_by_capacity))]))
+
+    if hopeless:
+        return [(s, r) for s, r in candidates if (s, r) in ls["available"]]
+    return [(s, r) for s, r in candidates if _ls_unary_ok(ls, course_id, s, r)]
+
+def _new_local_search_state(model, possible_times_and_rooms):
+    """تبني حالة البحث المحلي: أوقات البداية، القيم المتاحة، والقيم الصالحة أحادياً لكل دورة."""
+    starts = sorted({proposed_start_time for proposed_start_time, _ in possible_times_and_rooms})
+    start_indexes = {proposed_start_time: i for i, proposed_start_time in enumerate(starts)}
+    room_ids = model["room_ids"]
+    available = {(start_indexes[proposed_start_time], room_ids[proposed_room])
+                 for proposed_start_time, proposed_room in possible_times_and_rooms if proposed_room in room_ids}
+    gaps = [b - a for a, b in zip(starts, starts[1:]) if b > a]
+
+    num_courses = len(model["course_names"])
+    rooms_by_capacity = sorted(range(len(model["room_names"])), key=lambda room_id: model["room_capacities"][room_id])
+    sorted_capacities = [model["room_capacities"][room_id] for room_id in rooms_by_capacity]
+
+    time_ok = []
+    valid_starts = []
+    first_room_by_capacity = []
+    for course_id, course_name in enumerate(model["course_names"]):
+        entry = {"start_time": None, "end_time": None, "room": None}
+        single_schedule = {course_name: entry}
+        mask = 0
+        for start_index, start_time in enumerate(starts):
+            entry["start_time"] = start_time
+            entry["end_time"] = start_time + model["course_durations"][course_id]
+            if check_working_hours(single_schedule, course_name, model) and \
+               check_absolute_time_constraint(single_schedule, course_name, model) and \
+               check_instructor_availability(single_schedule, course_name, model):
+                mask |= 1 << start_index
+        time_ok.append(mask)
+        valid_starts.append([start_index for start_index in range(len(starts)) if mask >> start_index & 1])
+        first_room_by_capacity.append(bisect.bisect_left(sorted_capacities, model["course_students"][course_id]))
+
+    return {
+        "model": model,
+        "starts": starts,
+        "available": available,
+        "cell_origin": starts[0] if starts else 0.0,
+        "cell_width": min(gaps) if gaps else 1.0,
+        "time_ok": time_ok,
+        "valid_starts": valid_starts,
+        "rooms_by_capacity": rooms_by_capacity,
+        "first_room_by_capacity": first_room_by_capacity,
+        "start_index": array("i", [-1]) * num_courses,
+        "start": array("d", [0.0]) * num_courses,
+        "end": array("d", [0.0]) * num_courses,
+        "room": array("i", [-1]) * num_courses,
+        "start_load": [0] * len(starts),
+        "room_cells": {},
+        "instructor_cells": {},
+        "conflicts": array("i", [0]) * num_courses,
+        "conflicted": [],
+        "conflicted_positions": {},
+        "total": 0,
+    }
+
+def _ls_greedy_value(ls, course_id, rng, max_evaluations):
+    """
+    تختار قيمة جشعة لدورة غير موضوعة: أول (وقت، قاعة) صالح أحادياً بلا تعارض، مع تفضيل الأوقات
+    التي لا يكون فيها المحاضر مشغولاً والأقل إشغالاً، وأصغر قاعة كافية، وإلا أقل القيم تعارضاً بين ما فُحص.
+    """
+    model = ls["model"]
+    rooms_by_capacity = ls["rooms_by_capacity"]
+    first_room = ls["first_room_by_capacity"][course_id]
+    valid_starts = ls["valid_starts"][course_id]
+    if not valid_starts or first_room >= len(rooms_by_capacity):
+        candidates = _ls_candidates(ls, course_id, rng, max_evaluations) or sorted(ls["available"])[:1]
+        return min(candidates, key=lambda value: len(_ls_conflicting(ls, course_id, ls["starts"][value[0]], value[1])))
+
+    instructor_id = model["course_instructor"][course_id]
+    free_starts = []
+    busy_starts = []
+    for start_index in valid_starts:
+        start_time = ls["starts"][start_index]
+        end_time = start_time + model["course_durations"][course_id]
+        busy = False
+        if instructor_id >= 0:
+            for cell in _ls_cells(ls, start_time, end_time):
+                for other_id in ls["instructor_cells"].get((instructor_id, cell), ()):
+                    if ls["start"][other_id] < end_time and start_time < ls["end"][other_id]:
+                        busy = True
+                        break
+                if busy:
+                    break
+        (busy_starts if busy else free_starts).append(start_index)
+    # الأوقات الأقل إشغالاً أولاً لتوزيع الدورات على اليوم وإيجاد قاعة فارغة بسرعة
+    free_starts.sort(key=lambda start_index: ls["start_load"][start_index])
+
+    best_value = None
+    best_conflicts = None
+    evaluations = 0
+    for start_index in free_starts + busy_starts:
+        for room_id in rooms_by_capacity[first_room:]:
+            if not _ls_unary_ok(ls, course_id, start_index, room_id):
+                continue
+            conflicts = len(_ls_conflicting(ls, course_id, ls["starts"][start_index], room_id))
+            if best_conflicts is None or conflicts < best_conflicts:
+                best_value, best_conflicts = (start_index, room_id), conflicts
+                if not conflicts:
+                    return best_value
+            evaluations += 1
+            if evaluations >= max_evaluations:
+                break
+        if evaluations >= max_evaluations and best_value is not None:
+            return best_value
+    if best_value is None:
+        candidates = [value for value in sorted(ls["available"]) if value[0] in valid_starts] or sorted(ls["available"])[:1]
+        best_value = candidates[0]
+    return best_value
+
+def local_search_schedule(problem_data, possible_times_and_rooms=None, initial_schedule=None, time_limit=10.0,
+                          max_iterations=None, seed=0, tabu_tenure=10, num_samples=20, noise=0.02,
+                          greedy_evaluations=200, should_stop=None):
+    """
+    محرك بحث محلي (min-conflicts + tabu) للمسائل الكبيرة: يبدأ من initial_schedule (إن أُعطي،
+    للدورات ذات القيم المعروفة) ويكمل الباقي جشعاً، ثم يكرر: اختيار دورة متعارضة عشوائياً
+    ونقلها إلى أقل القيم المرشحة تعارضاً، مع منع القيم التي غادرتها خلال آخر tabu_tenure خطوة
+    إلا إذا أعطت أفضل نتيجة حتى الآن، ونقل عشوائي باحتمال noise.
+    يتوقف عند زوال التعارضات أو بعد time_limit ثانية أو max_iterations خطوة أو عندما تُرجع
+    should_stop القيمة True. تُرجع قاموساً: schedule (أفضل جدول وُجد، كاملاً)، violations
+    (مخالفاته المتبقية كما تُرجعها validate_schedule)، conflicts، iterations، elapsed_ms،
+    و status ("solved" أو "budget_exhausted").
+    """
+    start = time.perf_counter()
+    model = get_compiled_problem(problem_data)
+    if possible_times_and_rooms is None:
+        possible_times_and_rooms = build_possible_times_and_rooms(model)
+    rng = random.Random(seed)
+    ls = _new_local_search_state(model, possible_times_and_rooms)
+    course_names = model["course_names"]
+    num_courses = len(course_names)
+    deadline = None if time_limit is None else start + time_limit
+
+    start_indexes = {proposed_start_time: i for i, proposed_start_time in enumerate(ls["starts"])}
+    pending = []
+    for course_id, course_name in enumerate(course_names):
+        details = (initial_schedule or {}).get(course_name) or {}
+        value = (start_indexes.get(details.get("start_time")), model["room_ids"].get(details.get("room")))
+        if model["course_ids"][course_name] == course_id and value[0] is not None and value[1] is not None:
+            _ls_move(ls, course_id, *value)
+        else:
+            pending.append(course_id)
+
+    # الدورات الأكثر تقييداً أولاً (أقل أوقات صالحة ثم أكبر عدد طلاب)
+    pending.sort(key=lambda course_id: (len(ls["valid_starts"][course_id]), -model["course_students"][course_id]))
+    for course_id in pending:
+        if ls["available"]:
+            _ls_move(ls, course_id, *_ls_greedy_value(ls, course_id, rng, greedy_evaluations))
+
+    conflicts = ls["conflicts"]
+    best_total = ls["total"]
+    moves_since_best = []
+    tabu_until = {}
+    iterations = 0
+    while ls["conflicted"]:
+        if max_iterations is not None and iterations >= max_iterations:
+            break
+        if iterations % 256 == 0 and ((deadline is not None and time.perf_counter() >= deadline) or
+                                      (should_stop is not None and should_stop())):
+            break
+        iterations += 1
+
+        course_id = rng.choice(ls["conflicted"])
+        candidates = _ls_candidates(ls, course_id, rng, num_samples)
+        if not candidates:
+            continue
+        current_value = (ls["start_index"][course_id], ls["room"][course_id])
+        current_conflicts = conflicts[course_id]
+
+        if rng.random() < noise:
+            best_value = rng.choice(candidates)
+        else:
+            best_value = None
+            best_score = None
+            ties = 0
+            for value in candidates:
+                if value == current_value:
+                    continue
+                score = len(_ls_conflicting(ls, course_id, ls["starts"][value[0]], value[1]))
+                # قيمة tabu مسموحة فقط إذا كانت ستعطي أفضل مجموع تعارضات حتى الآن
+                if tabu_until.get((course_id, value), 0) > iterations and \
+                   ls["total"] + 2 * (score - current_conflicts) >= best_total:
+                    continue
+                if best_score is None or score < best_score:
+                    best_value, best_score, ties = value, score, 1
+                elif score == best_score:
+                    ties += 1
+                    if rng.randrange(ties) == 0:
+                        best_value = value
+            if best_value is None:
+                continue
+
+        tabu_until[(course_id, current_value)] = iterations + tabu_tenure
+        moves_since_best.append((course_id, current_value))
+        _ls_move(ls, course_id, *best_value)
+        if ls["total"] < best_total:
+            best_total = ls["total"]
+            moves_since_best.clear()
+
+    # العودة إلى أفضل تعيين وُجد بإلغاء النقلات التي تلته
+    for course_id, value in reversed(moves_since_best):
+        _ls_move(ls, course_id, *value)
+
+    schedule = {}
+    for course_id, course_name in enumerate(course_names):
+        if course_name in schedule or ls["room"][course_id] < 0:
+            continue
+        schedule[course_name] = {"start_time": ls["start"][course_id], "end_time": ls["end"][course_id],
+                                 "room": model["room_names"][ls["room"][course_id]]}
+    violations = validate_schedule(schedule, model) if num_courses else []
+    return {
+        "schedule": schedule,
+        "violations": violations,
+        "conflicts": ls["total"],
+        "iterations": iterations,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+        "status": "solved" if not violations else "budget_exhausted",
+    }
+
+
+#  تفكيك المسألة إلى مكوّنات مستقلة 
+#  رسم القيود: تُربط الدورات التي تشترك في محاضر، أو في قاعة يمكن أن تستخدمها كلتاهما (السعة والقاعات المسموح بها)، أو في قيد أسبقية.
+#  الدورات في مكوّنين مختلفين لا يمكن أن تتعارض، لذا يُحل كل مكوّن وحده وتُدمج الحلول.
+
+def _find_root(parents, node):
+    """جذر مجموعة العقدة في union-find مع ضغط المسار."""
+    root = node
+    while parents[root] != root:
+        root = parents[root]
+    while parents[node] != root:
+        parents[node], node = root, parents[node]
+    return root
+
+def course_components(problem_data):
+    """
+    تقسم الدورات إلى مكوّنات مترابطة في رسم القيود وتُرجع قائمة بأسماء دورات كل مكوّن،
+    الأكبر أولاً. الدورات التي تشترك في طلاب مترابطة، والقاعة تربط كل الدورات التي يمكن أن تستخدمها (السعة كافية، ولها فترات توفر، ومن
+    القاعات المسموح بها للدورة إن حُددت)، لذا تنفصل الأقسام فعلياً فقط عندما تُقيَّد دوراتها بقاعاتها.
+    """
+    model = get_compiled_problem(problem_data)
+    num_courses = len(model["course_names"])
+    num_rooms = len(model["room_names"])
+    num_instructors = len(model["instructor_names"])
+    # العقد: الدورات ثم القاعات ثم المحاضرون
+    parents = list(range(num_courses + num_rooms + num_instructors))
+
+    def union(first, second):
+        first_root, second_root = _find_root(parents, first), _find_root(parents, second)
+        if first_root != second_root:
+            parents[second_root] = first_root
+
+    room_order = sorted((capacity, room_id) for room_id, capacity in enumerate(model["room_capacities"])
+                        if model["room_available_times"][room_id])
+    room_capacities_sorted = [capacity for capacity, _ in room_order]
+    for course_id in range(num_courses):
+        instructor_id = model["course_instructor"][course_id]
+        if instructor_id >= 0:
+            union(course_id, num_courses + num_rooms + instructor_id)
+        for predecessor_id in model["course_predecessors"][course_id]:
+            union(course_id, predecessor_id)
+        for other_id in model["course_conflicts"][course_id]:
+            union(course_id, other_id)
+        first_fitting = bisect.bisect_left(room_capacities_sorted, model["course_students"][course_id])
+        allowed_rooms = model["course_allowed_rooms"][course_id]
+        for _, room_id in room_order[first_fitting:]:
+            if allowed_rooms is None or room_id in allowed_rooms:
+                union(course_id, num_courses + room_id)
+
+    components = {}
+    for course_id, course_name in enumerate(model["course_names"]):
+        components.setdefault(_find_root(parents, course_id), []).append(course_name)
+    return sorted((list(dict.fromkeys(names)) for names in components.values()), key=len, reverse=True)
+
+def restrict_problem(problem_data, course_names):
+    """
+    تُرجع problem_data جديدة تحتوي فقط الدورات course_names والقاعات التي يمكن أن تستخدمها إحداها، والقيود
+    التي تخصها (الأسبقية بين دوراتها، قيودها الزمنية المطلقة، توفر محاضريها، وتسجيلات الطلاب في دوراتها).
+    القيود المرنة لا تُنقل.
+    """
+    names = set(course_names)
+    courses = [course for course in problem_data["courses"] if course["name"] in names]
+    instructors = {course.get("instructor") for course in courses}
+    min_students = min((course["num_students"] for course in courses if course.get("rooms") is None), default=None)
+    pool_rooms = set()
+    for course in courses:
+        if course.get("rooms") is not None:
+            pool_rooms.update(course["rooms"])
+    constraints = problem_data["constraints"]
+
+    restricted_constraints = dict(constraints)
+    restricted_constraints.update({
+        "precedence_constraints": [p_const for p_const in constraints.get("precedence_constraints", [])
+                                   if p_const["x_course"] in names and p_const["y_course"] in names],
+        "absolute_time_constraints": [abs_const for abs_const in constraints.get("absolute_time_constraints", [])
+                                      if abs_const["course_name"] in names],
+        "instructor_availability_constraints": [inst_const for inst_const in constraints.get("instructor_availability_constraints", [])
+                                                if inst_const["instructor_name"] in instructors],
+    })
+    if constraints.get("student_enrollments"):
+        restricted_constraints["student_enrollments"] = [
+            {"student": enrollment["student"], "courses": [name for name in enrollment["courses"] if name in names]}
+            for enrollment in constraints["student_enrollments"]
+            if sum(name in names for name in enrollment["courses"]) > 1]
+    return {
+        "courses": courses,
+        "rooms": [room for room in problem_data["rooms"]
+                  if room["name"] in pool_rooms or (min_students is not None and room["capacity"] >= min_students)],
+        "constraints": restricted_constraints,
+    }
+
+
+#  إصلاح جدول قائم بعد تعديلات صغيرة على بيانات المشكلة (إعادة حل جزئية) 
+
+def _normalize_json_like(value):
+    """تحوّل tuple إلى list بشكل متداخل لمقارنة عناصر القيود القادمة من JSON وبايثون."""
+    if isinstance(value, (list, tuple)):
+        return [_normalize_json_like(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize_json_like(item) for key, item in value.items()}
+    return value
+
+def apply_problem_delta(problem_data, delta):
+    """
+    تُرجع نسخة جديدة من problem_data بعد تطبيق تعديل (delta) على شكل قاموس يدعم المفاتيح:
+    add_courses / remove_courses / update_courses ({الاسم: {حقل: قيمة}})،
+    add_rooms / remove_rooms / update_rooms، add_constraints / remove_constraints
+    ({اسم قائمة القيود: [عناصر]})، و working_hours_constraints (استبدال).
+    """
+    new_data = copy.deepcopy({key: problem_data[key] for key in ("courses", "rooms", "constraints")})
+    if problem_data.get("soft_constraints"):
+        new_data["soft_constraints"] = copy.deepcopy(problem_data["soft_constraints"])
+
+    for key, remove_key, update_key, add_key in (("courses", "remove_courses", "update_courses", "add_courses"),
+                                                  ("rooms", "remove_rooms", "update_rooms", "add_rooms")):
+        removed = set(delta.get(remove_key, []))
+        items = [item for item in new_data[key] if item["name"] not in removed]
+        updates = delta.get(update_key, {})
+        for item in items:
+            if item["name"] in updates:
+                item.update(copy.deepcopy(updates[item["name"]]))
+        items.extend(copy.deepcopy(delta.get(add_key, [])))
+        new_data[key] = items
+
+    constraints = new_data["constraints"]
+    for constraint_key, removed_items in delta.get("remove_constraints", {}).items():
+        removed = [_normalize_json_like(item) for item in removed_items]
+        constraints[constraint_key] = [item for item in constraints.get(constraint_key, [])
+                                       if _normalize_json_like(item) not in removed]
+    for constraint_key, added_items in delta.get("add_constraints", {}).items():
+        constraints.setdefault(constraint_key, []).extend(copy.deepcopy(added_items))
+    if "working_hours_constraints" in delta:
+        constraints["working_hours_constraints"] = dict(delta["working_hours_constraints"])
+
+    return new_data
+
+def _repair_neighbours(schedule, model, course_names_to_expand, tensor):
+    """
+    الجوار المباشر لمجموعة دورات: الدورات المجدولة التي تشترك معها في المحاضر أو الطلاب، أو ترتبط بها بقيد أسبقية،
+    أو تشغل قاعة وزمناً كان يمكن أن توضع فيهما إحدى دورات المجموعة.
+    """
+    course_ids = model["course_ids"]
+    course_names = model["course_names"]
+    placements = feasible_placements(tensor, course_names_to_expand)
+
+    assigned_by_room = {}
+    assigned_by_instructor = {}
+    for course_name, details in schedule.items():
+        if details.get("start_time") is None:
+            continue
+        assigned_by_room.setdefault(details.get("room"), []).append(course_name)
+        assigned_by_instructor.setdefault(model["course_instructor"][course_ids[course_name]], []).append(course_name)
+
+    neighbours = set()
+    for course_name in course_names_to_expand:
+        course_id = course_ids[course_name]
+        instructor_id = model["course_instructor"][course_id]
+        if instructor_id >= 0:
+            neighbours.update(assigned_by_instructor.get(instructor_id, []))
+        for linked_id in model["course_predecessors"][course_id] + model["course_successors"][course_id]:
+            neighbours.add(course_names[linked_id])
+        for linked_id in model["course_conflicts"][course_id]:
+            neighbours.add(course_names[linked_id])
+
+        course_duration = model["course_durations"][course_id]
+        for proposed_start_time, proposed_room in placements.get(course_name, []):
+            proposed_end_time = proposed_start_time + course_duration
+            for other_name in assigned_by_room.get(proposed_room, []):
+                other = schedule[other_name]
+                if proposed_start_time < other["end_time"] and other["start_time"] < proposed_end_time:
+                    neighbours.add(other_name)
+    return {name for name in neighbours if schedule.get(name, {}).get("start_time") is not None}
+
+def repair_schedule(solution, problem_data, delta=None, time_increment=1.0, max_rounds=3, node_limit=None,
+                    time_limit=None):
+    """
+    تصلح حلاً صالحاً قائماً بعد تعديل صغير (delta) على بيانات المشكلة بدلاً من الحل من الصفر:
+    تلغي جدولة الدورات المتأثرة فقط (المخالفة للقيود بعد التعديل، والمضافة، والتي فقدت قاعتها)
+    ثم تعيد حلها بالفحص الأمامي مع تثبيت البقية ومحاولة إبقاء كل دورة في مكانها السابق.
+    إذا فشل ذلك يُوسَّع الجوار حتى max_rounds مرة، ثم يُعاد الحل الكامل كملاذ أخير.
+    node_limit (عقد) و time_limit (ثانية) ميزانية الإصلاح كله بكل جولاته والحل الكامل.
+    تُرجع قاموساً: schedule (أو None)، status ("repaired"، "infeasible" إذا أثبت الحل الكامل عدم وجود حل،
+    أو "budget_exhausted" إذا نفدت الميزانية قبل الحسم)، changed_courses، num_changed، rounds، full_resolve،
+    nodes، violations_before (مخالفات دورات solution تحت المسألة المعدّلة قبل الإصلاح)، و elapsed_ms.
+    """
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    new_problem_data = apply_problem_delta(problem_data, delta) if delta else problem_data
+    model = compile_problem(new_problem_data)
+    possible_times_and_rooms = build_possible_times_and_rooms(model, time_increment)
+    course_names = list(dict.fromkeys(model["course_names"]))
+
+    base_schedule = {}
+    for course_name in course_names:
+        details = solution.get(course_name) or {}
+        course_id = model["course_ids"][course_name]
+        if details.get("start_time") is None:
+            base_schedule[course_name] = {"start_time": None, "end_time": None, "room": None}
+        else:
+            base_schedule[course_name] = {"start_time": details["start_time"],
+                                          "end_time": details["start_time"] + model["course_durations"][course_id],
+                                          "room": details.get("room")}
+
+    violations_before = validate_schedule(base_schedule, model)
+    affected = {violation["course"] for violation in violations_before if violation["course"] in base_schedule}
+    affected.update(course_name for course_name, details in base_schedule.items()
+                    if details["start_time"] is not None and details["room"] not in model["room_ids"])
+
+    preferred_placements = {course_name: (details["start_time"], details["room"])
+                            for course_name, details in base_schedule.items() if details["start_time"] is not None}
+    tensor = build_feasibility_tensor(model, possible_times_and_rooms)
+
+    result = None
+    status = "infeasible"
+    rounds = 0
+    nodes = 0
+    full_resolve = False
+    while True:
+        if deadline is not None and time.perf_counter() >= deadline:
+            status = "budget_exhausted"
+            break
+        trial_schedule = {course_name: dict(details) for course_name, details in base_schedule.items()}
+        for course_name in affected:
+            trial_schedule[course_name] = {"start_time": None, "end_time": None, "room": None}
+
+        result = None
+        state = new_domain_state(trial_schedule, model, course_names, possible_times_and_rooms, strict_precedence=True)
+        if state is not None:
+            _set_preferred_placements(state, preferred_placements)
+            state["node_limit"] = None if node_limit is None else node_limit - nodes
+            if deadline is not None:
+                state["should_stop"] = lambda: time.perf_counter() >= deadline
+            if _forward_checking_search(trial_schedule, state, []):
+                result = trial_schedule
+            nodes += state["nodes"]
+            if state["aborted"]:
+                status = "budget_exhausted"
+                break
+        if result is not None:
+            remaining_violations = {violation["course"] for violation in validate_schedule(result, model)}
+            if not remaining_violations:
+                break
+            result = None
+            affected.update(remaining_violations)
+
+        if full_resolve:
+            break
+        if rounds >= max_rounds:
+            affected = set(course_names)
+            full_resolve = True
+            continue
+        rounds += 1
+        kept_schedule = {name: details for name, details in base_schedule.items() if name not in affected}
+        expansion = _repair_neighbours(kept_schedule, model, sorted(affected), tensor)
+        if not expansion:
+            affected = set(course_names)
+            full_resolve = True
+        affected.update(expansion)
+
+    changed_courses = []
+    if result is not None:
+        status = "repaired"
+        for course_name in course_names:
+            old = solution.get(course_name) or {}
+            new = result[course_name]
+            if (old.get("start_time"), old.get("room")) != (new["start_time"], new["room"]):
+                changed_courses.append(course_name)
+
+    return {
+        "schedule": result,
+        "status": status,
+        "changed_courses": changed_courses,
+        "num_changed": len(changed_courses),
+        "removed_courses": [course_name for course_name in solution if course_name not in model["course_ids"]],
+        "rounds": rounds,
+        "full_resolve": full_resolve,
+        "nodes": nodes,
+        "violations_before": [violation for violation in violations_before if violation["course"] in solution],
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+#  تشخيص عدم قابلية الحل: مجموعة قيود متعارضة أصغرية 
+#  القيود القابلة للإرخاء: كل عنصر في قوائم الأسبقية والأوقات المطلقة وعدم توفر المحاضرين وتسجيلات الطلاب،
+#  وسعة القاعة لكل دورة. الباقي (الدورات، القاعات وتوفرها، ساعات العمل، عدم تداخل القاعة والمحاضر) خلفية ثابتة.
+#  الفحص متدرج من الأرخص: الأحادي (دورة بلا أي قيمة صالحة)، ثم الانتشار (المجالات الأولية ونشر حدود
+#  الأسبقية و AC-3) الذي يثبت التعارض دون بحث، ثم البحث التكراري بميزانية. داخل كل مرحلة تُستخرج المجموعة
+#  بـ QuickXplain (تقسيم ثنائي يحتاج نحو k·log(n/k) فحصاً لمجموعة من k قيود بين n).
+
+_RELAXABLE_CONSTRAINTS = ("precedence_constraints", "absolute_time_constraints",
+                          "instructor_availability_constraints", "student_enrollments")
+
+def _diagnosis_items(problem_data):
+    """عناصر القيود القابلة للإرخاء: (اسم القائمة، الموضع) لكل قيد، و ("room_capacity"، موضع الدورة)."""
+    constraints = problem_data["constraints"]
+    items = [(kind, index) for kind in _RELAXABLE_CONSTRAINTS for index in range(len(constraints.get(kind) or []))]
+    items.extend(("room_capacity", course_index) for course_index in range(len(problem_data["courses"])))
+    return items
+
+def _problem_with_constraints(problem_data, items):
+    """نسخة من المشكلة تحتفظ من القيود القابلة للإرخاء بـ items فقط (سعة بقية الدورات تُرخى بعدد طلاب 0)."""
+    kept = set(items)
+    constraints = dict(problem_data["constraints"])
+    for kind in _RELAXABLE_CONSTRAINTS:
+        if kind in constraints:
+            constraints[kind] = [item for index, item in enumerate(constraints[kind] or []) if (kind, index) in kept]
+    courses = [course if ("room_capacity", course_index) in kept else dict(course, num_students=0)
+               for course_index, course in enumerate(problem_data["courses"])]
+    return {"courses": courses, "rooms": problem_data["rooms"], "constraints": constraints}
+
+def _course_unary_items(problem_data, course_index):
+    """عناصر القيود الأحادية التي تمس دورة واحدة: أوقاتها المطلقة، عدم توفر محاضرها، وسعة قاعتها."""
+    course = problem_data["courses"][course_index]
+    constraints = problem_data["constraints"]
+    items = [("absolute_time_constraints", index)
+             for index, constraint in enumerate(constraints.get("absolute_time_constraints") or [])
+             if constraint["course_name"] == course["name"]]
+    items.extend(("instructor_availability_constraints", index)
+                 for index, constraint in enumerate(constraints.get("instructor_availability_constraints") or [])
+                 if course.get("instructor") and constraint["instructor_name"] == course["instructor"])
+    items.append(("room_capacity", course_index))
+    return items
+
+def _quickxplain(is_consistent, background, delta, candidates):
+    """
+    QuickXplain: تُرجع مجموعة أصغرية من candidates لا تتسق مع background. delta ما أُضيف إلى background
+    منذ آخر فحص؛ إن كان فارغاً فلا حاجة لإعادة الفحص لأن اتساق background ثبت مسبقاً.
+    """
+    if delta and not is_consistent(background):
+        return []
+    if len(candidates) == 1:
+        return list(candidates)
+    half = len(candidates) // 2
+    first, second = candidates[:half], candidates[half:]
+    second_conflict = _quickxplain(is_consistent, background + first, first, second)
+    first_conflict = _quickxplain(is_consistent, background + second_conflict, second_conflict, first)
+    return first_conflict + second_conflict
+
+def _deletion_filter(is_consistent, candidates):
+    """مرشح الحذف: يحاول حذف كل قيد بالترتيب ويُبقيه فقط إن زال التعارض بحذفه (فحص لكل قيد)."""
+    conflict = list(candidates)
+    for item in candidates:
+        remaining = [other for other in conflict if other != item]
+        if not is_consistent(remaining):
+            conflict = remaining
+    return conflict
+
+def describe_conflict_item(problem_data, item):
+    """سجل قابل للعرض لعنصر قيد: constraint (اسم القائمة أو "room_capacity") و details (القيد الأصلي)."""
+    kind, index = item
+    if kind == "room_capacity":
+        course = problem_data["courses"][index]
+        details = {"course_name": course["name"], "num_students": course["num_students"],
+                   "max_capacity": max((room["capacity"] for room in problem_data["rooms"]), default=0)}
+    else:
+        details = problem_data["constraints"][kind][index]
+    return {"constraint": kind, "details": details}
+
+def format_conflict_item(record):
+    """تحوّل سجل قيد من نتيجة diagnose_infeasibility إلى سطر نصي للعرض."""
+    constraint = record["constraint"]
+    details = record["details"]
+    if constraint == "precedence_constraints":
+        return f"    - قيد أسبقية: {details['y_course']} يجب أن تنتهي قبل بدء {details['x_course']}."
+    if constraint == "absolute_time_constraints":
+        return f"    - قيد وقت مطلق: {details['course_name']} ({details['type'].replace('_', ' ')} {details['time_value']:.1f})."
+    if constraint == "instructor_availability_constraints":
+        unavailable_times_str = ", ".join([f"[{s:.1f}-{e:.1f}]" for s, e in details["unavailable_times"]])
+        return f"    - عدم توفر المحاضر: {details['instructor_name']} ({unavailable_times_str})."
+    if constraint == "student_enrollments":
+        return f"    - تسجيل الطالب {details['student']} في: {', '.join(details['courses'])}."
+    return (f"    - سعة القاعة: {details['course_name']} ({details['num_students']} طالب، "
+            f"أكبر قاعة {details['max_capacity']}).")
+
+def diagnose_infeasibility(problem_data, time_increment=1.0, node_limit=20000, time_limit=None, method="quickxplain"):
+    """
+    تبحث عن سبب عدم وجود حل: مجموعة أصغرية من القيود القابلة للإرخاء لا يمكن تحقيقها معاً (حذف أي
+    قيد منها يزيل التعارض). تتحقق أولاً من القيود الثابتة وحدها بالبحث الكامل، ثم تجرب المراحل بالترتيب:
+    unary ثم propagation ثم search، وتكتفي بأول مرحلة تثبت التعارض، فلا يُشغّل البحث الكامل على كل
+    المجموعات إلا إذا لم يكشفه الانتشار؛ أصغرية النتيجة تُثبت دائماً بفحص البحث. node_limit و time_limit (ثانية) ميزانية
+    كل فحص بحث؛ الفحص الذي تنفد ميزانيته يُعتبر متسقاً، لذا قد تكون النتيجة حينها غير مثبتة.
+    تُرجع قاموساً: status ("feasible" إن وُجد حل، "conflict"، "background" إن كان التعارض في القيود
+    الثابتة وحدها، أو "unknown" إن نفدت الميزانية)، stage، conflicts (سجلات describe_conflict_item)،
+    items (أزواج (القائمة، الموضع))، checks (عدد الفحوص الفعلية بعد التخزين المؤقت)، و elapsed_ms.
+    method="deletion" يستخدم مرشح الحذف البسيط بدل QuickXplain للمقارنة.
+    """
+    started = time.perf_counter()
+    if "course_ids" in problem_data:
+        problem_data = {key: problem_data[key] for key in ("courses", "rooms", "constraints")}
+    possible_times_and_rooms = build_possible_times_and_rooms(problem_data, time_increment)
+    items = _diagnosis_items(problem_data)
+    cache = {}
+    search_status = {}
+    counters = {"checks": 0}
+
+    def is_consistent(stage, subset, course_name=None):
+        key = (stage, course_name, frozenset(subset))
+        if key not in cache:
+            counters["checks"] += 1
+            model = compile_problem(_problem_with_constraints(problem_data, subset))
+            if stage == "unary":
+                course_names = None if course_name is None else [course_name]
+                tensor = build_feasibility_tensor(model, possible_times_and_rooms, course_names=course_names)
+                domains = feasibility_domains(tensor)
+                cache[key] = all(domains[course_id] for course_id in tensor["course_ids"])
+            elif stage == "propagation":
+                course_names = list(dict.fromkeys(model["course_names"]))
+                curr_schedule = {name: {"start_time": None, "end_time": None, "room": None} for name in course_names}
+                state = new_domain_state(curr_schedule, model, course_names, possible_times_and_rooms)
+                cache[key] = state is not None and enforce_arc_consistency(state)
+            else:
+                search_status[key] = solve_iteratively(model, possible_times_and_rooms, node_limit=node_limit,
+                                                       time_limit=time_limit)["status"]
+                cache[key] = search_status[key] != "infeasible"
+        return cache[key]
+
+    if method == "deletion":
+        explain = _deletion_filter
+    else:
+        explain = lambda check, candidates: _quickxplain(check, [], [], candidates)
+
+    def result(status, stage=None, conflict=()):
+        return {
+            "status": status,
+            "stage": stage,
+            "conflicts": [describe_conflict_item(problem_data, item) for item in conflict],
+            "items": list(conflict),
+            "checks": counters["checks"],
+            "elapsed_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    search_check = lambda subset: is_consistent("search", subset)
+    if not search_check([]):
+        return result("background", "search")
+
+    def minimal_conflict(stage, conflict):
+        # unary و propagation فحصان أضعف من البحث: مجموعة أصغرية تحتهما قد تبقى متعارضة في البحث بعد حذف
+        # أحد قيودها، فتمر المجموعة المرشحة بمرشح حذف أخير بفحص البحث الكامل. فحوص البحث التي نفدت
+        # ميزانيتها اعتُبرت متسقة، فيُتحقق من أن المجموعة الناتجة متعارضة فعلاً
+        conflict = _deletion_filter(search_check, conflict)
+        return result("conflict" if not search_check(conflict) else "unknown", stage, conflict)
+
+    if not is_consistent("unary", items):
+        unary_domains = feasibility_domains(build_feasibility_tensor(problem_data, possible_times_and_rooms))
+        course_index = unary_domains.index(0)
+        course_name = problem_data["courses"][course_index]["name"]
+        check = lambda subset: is_consistent("unary", subset, course_name)
+        if not check([]):
+            return result("background", "unary")
+        return minimal_conflict("unary", explain(check, _course_unary_items(problem_data, course_index)))
+
+    for stage in ("propagation", "search"):
+        check = lambda subset: is_consistent(stage, subset)
+        if check(items):
+            continue
+        if not check([]):
+            return result("background", stage)
+        return minimal_conflict(stage, explain(check, items))
+
+    return result("feasible" if search_status[("search", None, frozenset(items))] == "solved" else "unknown", "search")
+
+def print_infeasibility_diagnosis(diagnosis):
+    """تطبع نتيجة diagnose_infeasibility: القيود المتعارضة أو سبب تعذر تحديدها."""
+    stage_names = {"unary": "القيود الأحادية", "propagation": "الانتشار", "search": "البحث"}
+    stage = stage_names.get(diagnosis["stage"], diagnosis["stage"])
+    if diagnosis["status"] == "conflict":
+        print(f"  السبب: هذه القيود لا يمكن تحقيقها معاً، وحذف أي منها يزيل التعارض "
+              f"(مرحلة الاكتشاف: {stage}، {diagnosis['checks']} فحص، {diagnosis['elapsed_ms']:.2f} مللي ثانية):")
+        for record in diagnosis["conflicts"]:
+            print(format_conflict_item(record))
+    elif diagnosis["status"] == "background":
+        print("  السبب: التعارض في القيود الثابتة (القاعات وتوفرها، ساعات العمل، أو عدم التداخل) لا في القيود القابلة للإرخاء.")
+    elif diagnosis["status"] == "feasible":
+        print("  التشخيص وجد حلاً للمشكلة؛ قد يكون نمط الحل المستخدم أضيق من القيود (مثلاً ترتيب الأسبقية).")
+    else:
+        print("  تعذر تحديد القيود المتعارضة ضمن ميزانية البحث؛ قد تكون المشكلة معقدة جداً.")
+
+
+def run_test_scenario(scenario_name, initial_schedule, problem_data, run_solver=False, solver_mode="forward_checking",
+                      time_increment=1.0, profile=False, trace_path=None, diagnose=True):
+    """
+    يشغل سيناريو اختبار واحد ويعرض نتائجه مع قياس الوقت.
+    إذا كانت run_solver True، فسيحاول حل الجدولة بدلاً من مجرد التحقق.
+    solver_mode يحدد نمط الحل من SOLVER_MODES، و time_increment دقة شبكة الأوقات بالساعات.
+    profile=True يطبع إحصاءات البحث (العقد، التراجعات، زمن ورفض كل دالة تحقق)،
+    و trace_path يكتب أحداث البحث في ملف JSON Lines.
+    diagnose=True يعرض عند عدم إيجاد حل مجموعة القيود المتعارضة الأصغرية (diagnose_infeasibility).
+    """
+    print(f"\n--- بدء سيناريو: {scenario_name} ---")
+    start_time_scenario = time.time() # Start timer
+
+    problem_data = get_compiled_problem(problem_data)
+
+    all_course_names = [c["name"] for c in problem_data["courses"]]
+    
+    # بناء جدول أولي كامل بجميع الدورات مع قيم None للوقت والغرفة إذا لم يتم تحديدها
+    full_initial_schedule = {}
+    for c_name in all_course_names:
+        full_initial_schedule[c_name] = initial_schedule.get(c_name, {"start_time": None, "end_time": None, "room": None})
+
+    # حساب end_time لجميع الدورات في الجدول الأولي قبل بدء أي تحققات
+    temp_schedule_for_check_all = copy.deepcopy(full_initial_schedule)
+    for course_name in temp_schedule_for_check_all:
+        course_id = problem_data["course_ids"].get(course_name)
+        if course_id is not None and temp_schedule_for_check_all[course_name].get("start_time") is not None:
+            temp_schedule_for_check_all[course_name]["end_time"] = temp_schedule_for_check_all[course_name]["start_time"] + problem_data["course_durations"][course_id]
+
+    is_initial_schedule_complete = all(full_initial_schedule[c].get("start_time") is not None for c in full_initial_schedule)
+    
+    if is_initial_schedule_complete:
+        print("  ✅ الجدول الأولي المعطى مكتمل. جاري التحقق من قيوده...")
+        
+        # Measure time for validation
+        start_validation_time = time.time()
+        
+        violations = validate_schedule(temp_schedule_for_check_all, problem_data)
+        is_valid_initial_schedule = not violations
+        violated_constraints_details = [format_violation(violation) for violation in violations]
+
+        end_validation_time = time.time()
+        validation_duration_ms = (end_validation_time - start_validation_time) * 1000
+
+        print(f"  (استغرق التحقق: {validation_duration_ms:.2f} مللي ثانية)")
+        
+        if is_valid_initial_schedule:
+            print("  ✅ **النتيجة**: الجدول الأولي المعطى **صالح** ولا توجد مخالفات.")
+            print_schedule_table(temp_schedule_for_check_all, problem_data, title="الجدول الأولي المعطى")
+        else:
+            print("  ❌ **النتيجة**: الجدول الأولي المعطى **غير صالح**. التفاصيل:")
+            for detail in violated_constraints_details:
+                print(detail)
+            print_schedule_table(temp_schedule_for_check_all, problem_data, title="الجدول الأولي المخالف")
+
+    # 2. محاولة إيجاد حل باستخدام Backtracking Search إذا طُلب ذلك أو إذا كان الجدول الأولي غير مكتمل
+    if run_solver or not is_initial_schedule_complete:
+        print("\n  جاري محاولة إيجاد جدول صالح باستخدام خوارزمية البحث بالتراجع المحسّنة...")
+        
+        start_time_solver = time.time()
+        
+        courses_names = [c["name"] for c in problem_data["courses"]]
+
+        solver_initial_schedule = {
+            course_name: {"start_time": None, "end_time": None, "room": None}
+            for course_name in courses_names
+        }
+
+        # توليد جميع التركيبات الممكنة من الأوقات والقاعات
+        all_possible_times_and_rooms = build_possible_times_and_rooms(problem_data, time_increment)
+
+        solver = SOLVER_MODES[solver_mode]
+        if profile or trace_path:
+            start_instrumentation(trace_path=trace_path)
+        try:
+            solution = solver(solver_initial_schedule, problem_data, courses_names, all_possible_times_and_rooms)
+        finally:
+            search_stats = stop_instrumentation() if profile or trace_path else None
+
+        end_time_solver = time.time()
+        solver_duration_ms = (end_time_solver - start_time_solver) * 1000
+
+        if solution:
+            print(f"\n  ✅ **تم العثور على حل صالح للجدولة بواسطة الخوارزمية المحسّنة!** (استغرق {solver_duration_ms:.2f} مللي ثانية)")
+            print_schedule_table(solution, problem_data, title="الحل الذي تم إيجاده")
         else:
             print(f"\n  ❌ **لم يتم العثور على حل صالح بواسطة الخوارزمية مع القيود المعطاة.** (استغرق {solver_duration_ms:.2f} مللي ثانية)")
-            print("  قد يكون السبب: تعارضات قوية في القيود، أو عدم وجود حل ممكن، أو تعقيد عالٍ للمشكلة.")
+            if diagnose:
+                print_infeasibility_diagnosis(diagnose_infeasibility(problem_data, time_increment))
+            else:
+                print("  قد يكون السبب: تعارضات قوية في القيود، أو عدم وجود حل ممكن، أو تعقيد عالٍ للمشكلة.")
+        if profile:
+            print("\n  إحصاءات البحث:")
+            for line in format_search_stats(search_stats):
+                print(line)
     
     end_time_scenario = time.time()
     scenario_duration_ms = (end_time_scenario - start_time_scenario) * 1000
     print(f"--- انتهاء سيناريو: {scenario_name} (إجمالي الوقت: {scenario_duration_ms:.2f} مللي ثانية) ---\n" + "="*80)
 
 
+def run_repair_scenario(scenario_name, solution, problem_data, delta, time_limit=10.0):
+    """يشغل سيناريو إصلاح جدول قائم بعد تعديل على بيانات المشكلة (بمهلة time_limit ثانية) ويعرض الدورات التي تغيّرت."""
+    print(f"\n--- بدء سيناريو: {scenario_name} ---")
+    repair_result = repair_schedule(solution, problem_data, delta, time_limit=time_limit)
+
+    if repair_result["schedule"]:
+        print(f"  ✅ **تم إصلاح الجدول** بتغيير {repair_result['num_changed']} تعيين "
+              f"(استغرق {repair_result['elapsed_ms']:.2f} مللي ثانية)")
+        for course_name in repair_result["changed_courses"]:
+            print(f"    - {course_name}")
+        print_schedule_table(repair_result["schedule"], apply_problem_delta(problem_data, delta), title="الجدول بعد الإصلاح")
+    elif repair_result["status"] == "budget_exhausted":
+        print(f"  ⚠️ **انتهت مهلة الإصلاح قبل إيجاد جدول أو إثبات عدم وجوده.** "
+              f"(استغرق {repair_result['elapsed_ms']:.2f} مللي ثانية)")
+    else:
+        print(f"  ❌ **لا يمكن إصلاح الجدول بعد التعديل.** (استغرق {repair_result['elapsed_ms']:.2f} مللي ثانية)")
+    print(f"--- انتهاء سيناريو: {scenario_name} ---\n" + "="*80)
+
+
+def run_optimization_scenario(scenario_name, problem_data, soft_constraints, time_limit=10.0):
+    """يشغل سيناريو تحسين بالتفرع والتحديد لقيود مرنة ويعرض كل حل محسّن فور إيجاده ثم أفضل جدول."""
+    print(f"\n--- بدء سيناريو: {scenario_name} ---")
+    problem_data = dict(problem_data, soft_constraints=soft_constraints)
+    on_solution = lambda improvement: print(f"  حل محسّن: كلفة {improvement['cost']:.2f} "
+                                            f"(بعد {improvement['nodes']} عقدة)")
+    result = optimize_schedule(problem_data, time_limit=time_limit, on_solution=on_solution)
+
+    if result["schedule"]:
+        status = "أمثل" if result["status"] == "optimal" else "أفضل ما وُجد ضمن المهلة"
+        print(f"  ✅ **الكلفة النهائية: {result['cost']['total']:.2f}** ({status}، الحد الأدنى "
+              f"{result['lower_bound']:.2f}، {result['nodes']} عقدة، استغرق {result['elapsed_ms']:.2f} مللي ثانية)")
+        print_schedule_table(result["schedule"], problem_data, title="الجدول الأقل كلفة")
+    else:
+        print(f"  ❌ **لم يتم العثور على حل صالح.** (استغرق {result['elapsed_ms']:.2f} مللي ثانية)")
+    print(f"--- انتهاء سيناريو: {scenario_name} ---\n" + "="*80)
+
+
+def run_alternatives_scenario(scenario_name, problem_data, num_alternatives=3, min_distance=3):
+    """يشغل سيناريو بدائل: عدد الحلول الممكنة ثم جداول بديلة يختلف كل منها عن غيره في min_distance دورة على الأقل."""
+    print(f"\n--- بدء سيناريو: {scenario_name} ---")
+    counted = count_solutions(problem_data)
+    print(f"  عدد الجداول الصالحة: {counted['count']} (استغرق العدّ {counted['elapsed_ms']:.2f} مللي ثانية)")
+    for index, alternative in enumerate(iter_solutions(problem_data, limit=num_alternatives, min_distance=min_distance)):
+        distance = "" if alternative["distance"] is None else f" (يختلف في {alternative['distance']} دورات على الأقل)"
+        print_schedule_table(alternative["schedule"], problem_data, title=f"البديل {index + 1}{distance}")
+    print(f"--- انتهاء سيناريو: {scenario_name} ---\n" + "="*80)
+
+
 if __name__ == "__main__":
     problem_data = get_problem_data_default() 
 
@@ -599,4 +4765,44 @@ if __name__ == "__main__":
     }
     run_test_scenario("11. إيجاد جدول صالح (Backtracking Solver)", scenario_11_schedule, problem_data, run_solver=True)
 
+    # سيناريو 12: إصلاح الجدول اليدوي الصالح بعد أن أصبح د. أحمد غير متاح صباحاً
+    scenario_12_delta = {
+        "add_constraints": {
+            "instructor_availability_constraints": [
+                {"instructor_name": "د. أحمد", "unavailable_times": [(9.0, 10.0)]}
+            ]
+        }
+    }
+    run_repair_scenario("12. إصلاح جدول بعد تعديل (د. أحمد غير متاح 9-10)", scenario_2_schedule, problem_data, scenario_12_delta)
+
+    # سيناريو 13: جدول بأقل كلفة لتفضيلات مرنة (قاعات مفضلة، فترة صباحية لد. أحمد، ومجموعة طلاب بلا فراغات)
+    scenario_13_soft_constraints = {
+        "room_preferences": [
+            {"course_name": "قواعد البيانات", "rooms": ["معمل الحاسوب"], "weight": 2.0}
+        ],
+        "instructor_time_preferences": [
+            {"instructor_name": "د. أحمد", "preferred_times": [(9.0, 12.0)], "weight": 1.0}
+        ],
+        "student_groups": [
+            {"courses": ["مقدمة في البرمجة", "هياكل البيانات", "قواعد البيانات"], "weight": 1.0}
+        ],
+        "room_balance": {"weight": 0.1}
+    }
+    run_optimization_scenario("13. تحسين الجدول لقيود مرنة (Branch and Bound)", problem_data, scenario_13_soft_constraints)
+
+    # سيناريو 14: مشكلة بلا حل (هياكل البيانات يجب أن تنتهي قبل 10:00 لكنها تأتي بعد مقدمة في البرمجة)
+    # فيُعرض تشخيص القيود المتعارضة
+    scenario_14_delta = {
+        "add_constraints": {
+            "absolute_time_constraints": [
+                {"course_name": "هياكل البيانات", "type": "end_before", "time_value": 10.0}
+            ]
+        }
+    }
+    run_test_scenario("14. تشخيص مشكلة بلا حل (قيود متعارضة)", {}, apply_problem_delta(problem_data, scenario_14_delta),
+                      run_solver=True)
+
+    # سيناريو 15: جداول بديلة متنوعة لعرضها على رؤساء الأقسام، مع عدد كل الجداول الممكنة
+    run_alternatives_scenario("15. جداول بديلة متنوعة وعدد الحلول", problem_data)
+
     print("\n انتهى تشغيل جميع السيناريوهات ")
@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from project import (
+    SOLVER_MODES,
+    apply_problem_delta,
+    build_possible_times_and_rooms,
+    compile_problem,
+    get_problem_data_default,
+    problem_fingerprint,
+    repair_schedule,
+    run_solver_mode,
+    solve_iteratively,
+    validate_schedule,
+)
+
+# خدمة جدولة محلية طويلة العمر (JSON عبر HTTP/1.1 على asyncio): تُجمَّع المسائل مرة واحدة وتبقى في الذاكرة،
+# والبحث (حل، ماذا لو) يعمل في مجموعة عمليات تحتفظ كل منها بنسخة مُجمّعة من كل مسألة رأتها.
+# الطلبات المتطابقة الجارية في الوقت نفسه تُدمج في مهمة واحدة.
+#   POST /problems {"problem": {...}}                                → problem_id (بصمة المسألة)
+#   GET  /problems                                                   → المسائل المحمّلة
+#   POST /solve    {"problem_id", "time_limit", "node_limit", "mode", "time_increment", "initial_schedule"}
+#   POST /validate {"problem_id", "schedule"}                        → violations
+#   POST /what-if  {"problem_id", "delta", "schedule", "time_limit", "node_limit"} → إصلاح schedule (أو حل جديد) بعد التعديل
+# time_limit و node_limit يقيّدان كل بحث (بما فيه أنماط mode والإصلاح)، ونفادهما يُرجع حالة budget_exhausted
+# (أو node_limit / timeout من solve_iteratively) لا infeasible.
+#   GET  /stats                                                      → عدادات الطلبات والدمج
+
+_worker_problems = {}
+
+def _worker_problem(problem_id, problem_data, time_increment):
+    """تُرجع (النموذج، الأوقات والقاعات الممكنة) من ذاكرة العملية العاملة، وتجمّعها عند أول طلب فقط."""
+    entry = _worker_problems.get(problem_id)
+    if entry is None:
+        entry = _worker_problems[problem_id] = {"model": compile_problem(problem_data), "values": {}}
+    values = entry["values"].get(time_increment)
+    if values is None:
+        values = entry["values"][time_increment] = build_possible_times_and_rooms(entry["model"], time_increment)
+    return entry["model"], values
+
+def _solve_job(problem_id, problem_data, options):
+    """تحل مسألة محمّلة داخل عملية عاملة (solve_iteratively بميزانية، أو نمط من SOLVER_MODES)."""
+    start = time.perf_counter()
+    model, possible_times_and_rooms = _worker_problem(problem_id, problem_data, options["time_increment"])
+    if options["mode"] is None:
+        result = solve_iteratively(model, possible_times_and_rooms, initial_schedule=options["initial_schedule"],
+                                   node_limit=options["node_limit"], time_limit=options["time_limit"])
+        return {"status": result["status"], "schedule": result["schedule"],
+                "partial_schedule": result["partial_schedule"], "unscheduled": result["unscheduled"],
+                "nodes": result["nodes"], "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    course_names = list(dict.fromkeys(model["course_names"]))
+    schedule = {course_name: {"start_time": None, "end_time": None, "room": None} for course_name in course_names}
+    result = run_solver_mode(options["mode"], schedule, model, course_names, possible_times_and_rooms,
+                             node_limit=options["node_limit"], time_limit=options["time_limit"])
+    return {"status": result["status"], "schedule": result["schedule"], "nodes": result["nodes"],
+            "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+def _what_if_job(problem_id, problem_data, options):
+    """
+    تطبّق تعديلاً (delta) على المسألة داخل عملية عاملة: إن أُعطي جدول يُصلح بـ repair_schedule
+    (مع مخالفاته تحت المسألة المعدّلة قبل الإصلاح)، وإلا تُحل المسألة المعدّلة من الصفر.
+    """
+    start = time.perf_counter()
+    schedule = options["schedule"]
+    if schedule is None:
+        new_model = compile_problem(apply_problem_delta(problem_data, options["delta"]))
+        result = solve_iteratively(new_model, build_possible_times_and_rooms(new_model, options["time_increment"]),
+                                   node_limit=options["node_limit"], time_limit=options["time_limit"])
+        return {"status": result["status"], "schedule": result["schedule"], "unscheduled": result["unscheduled"],
+                "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    # repair_schedule تطبّق التعديل وتُجمّع المسألة وتتحقق من الجدول مرة واحدة وتُرجع مخالفاته قبل الإصلاح
+    result = repair_schedule(schedule, problem_data, options["delta"], time_increment=options["time_increment"],
+                             node_limit=options["node_limit"], time_limit=options["time_limit"])
+    status = "solved" if result["status"] == "repaired" else result["status"]
+    return {"status": status, "schedule": result["schedule"], "nodes": result["nodes"],
+            "violations_before": result["violations_before"], "changed_courses": result["changed_courses"],
+            "removed_courses": result["removed_courses"], "full_resolve": result["full_resolve"],
+            "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+
+class RequestError(Exception):
+    """خطأ في طلب العميل يُرجع كاستجابة JSON بالرمز status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def new_service(workers=None, default_time_limit=30.0):
+    """
+    تنشئ حالة الخدمة: المسائل المحمّلة (problem_id ← البيانات والنموذج المُجمّع)، مجموعة العمليات،
+    المهام الجارية للدمج، والعدادات. default_time_limit حد زمني لكل حل لا يحدد time_limit (None = بلا حد).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return {"problems": {}, "executor": ProcessPoolExecutor(max_workers=workers), "workers": workers,
+            "in_flight": {}, "default_time_limit": default_time_limit,
+            "stats": {"requests": 0, "jobs": 0, "coalesced": 0, "errors": 0}}
+
+def close_service(service):
+    """توقف مجموعة العمليات وتلغي المهام التي لم تبدأ."""
+    service["executor"].shutdown(wait=False, cancel_futures=True)
+
+def load_problem(service, problem_data):
+    """تجمّع المسألة مرة واحدة (المسألة نفسها بأي ترتيب لها البصمة نفسها) وتُرجع وصفها."""
+    start = time.perf_counter()
+    problem_id = problem_fingerprint(problem_data)
+    entry = service["problems"].get(problem_id)
+    loaded = entry is None
+    if loaded:
+        entry = service["problems"][problem_id] = {"problem_data": problem_data, "model": compile_problem(problem_data)}
+    return {"problem_id": problem_id, "loaded": loaded, "courses": len(entry["model"]["course_names"]),
+            "rooms": len(entry["model"]["room_names"]), "compile_ms": (time.perf_counter() - start) * 1000}
+
+def _get_problem(service, payload):
+    problem_id = payload.get("problem_id")
+    entry = service["problems"].get(problem_id)
+    if entry is None:
+        raise RequestError(f"مسألة غير محمّلة: {problem_id}", status=404)
+    return problem_id, entry
+
+async def _coalesced(service, key, run):
+    """
+    تُرجع نتيجة المهمة الجارية بالمفتاح نفسه إن وُجدت، وإلا تبدأ run() كمهمة جديدة.
+    المهمة محمية من إلغاء أي طلب منفرد (انقطاع اتصال) لأن طلبات أخرى قد تنتظرها.
+    """
+    in_flight = service["in_flight"]
+    task = in_flight.get(key)
+    if task is None:
+        service["stats"]["jobs"] += 1
+        task = in_flight[key] = asyncio.ensure_future(run())
+        task.add_done_callback(lambda _: in_flight.pop(key, None))
+    else:
+        service["stats"]["coalesced"] += 1
+    return await asyncio.shield(task)
+
+async def _run_in_pool(service, function, *args):
+    return await asyncio.get_running_loop().run_in_executor(service["executor"], function, *args)
+
+async def handle_solve(service, payload):
+    problem_id, entry = _get_problem(service, payload)
+    mode = payload.get("mode")
+    if mode is not None and mode not in SOLVER_MODES:
+        raise RequestError(f"نمط حل غير معروف: {mode}")
+    if mode is not None and payload.get("initial_schedule") is not None:
+        raise RequestError("الحقل initial_schedule غير مدعوم مع mode")
+    options = {"mode": mode, "time_increment": float(payload.get("time_increment", 1.0)),
+               "time_limit": payload.get("time_limit", service["default_time_limit"]),
+               "node_limit": payload.get("node_limit"), "initial_schedule": payload.get("initial_schedule")}
+    key = ("solve", problem_id, json.dumps(options, sort_keys=True))
+    return await _coalesced(service, key, lambda: _run_in_pool(service, _solve_job, problem_id, entry["problem_data"],
+                                                               options))
+
+async def handle_validate(service, payload):
+    """التحقق خفيف (خطي تقريباً في حجم الجدول) فيُنفَّذ مباشرة على النموذج المُجمّع في العملية الرئيسية."""
+    problem_id, entry = _get_problem(service, payload)
+    schedule = payload.get("schedule")
+    if not isinstance(schedule, dict):
+        raise RequestError("الحقل schedule مطلوب")
+
+    async def run():
+        start = time.perf_counter()
+        violations = validate_schedule(schedule, entry["model"])
+        return {"valid": not violations, "violations": violations, "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    return await _coalesced(service, ("validate", problem_id, json.dumps(schedule, sort_keys=True)), run)
+
+async def handle_what_if(service, payload):
+    problem_id, entry = _get_problem(service, payload)
+    if not isinstance(payload.get("delta"), dict):
+        raise RequestError("الحقل delta مطلوب")
+    options = {"delta": payload["delta"], "schedule": payload.get("schedule"),
+               "time_increment": float(payload.get("time_increment", 1.0)),
+               "time_limit": payload.get("time_limit", service["default_time_limit"]),
+               "node_limit": payload.get("node_limit")}
+    key = ("what-if", problem_id, json.dumps(options, sort_keys=True))
+    return await _coalesced(service, key, lambda: _run_in_pool(service, _what_if_job, problem_id, entry["problem_data"],
+                                                               options))
+
+async def dispatch(service, method, path, payload):
+    """توجّه طلباً (الطريقة، المسار، جسم JSON) إلى معالجه وتُرجع قاموس الاستجابة."""
+    if (method, path) == ("POST", "/problems"):
+        if not isinstance(payload.get("problem"), dict):
+            raise RequestError("الحقل problem مطلوب")
+        return load_problem(service, payload["problem"])
+    if (method, path) == ("GET", "/problems"):
+        return {"problems": [{"problem_id": problem_id, "courses": len(entry["model"]["course_names"])}
+                             for problem_id, entry in service["problems"].items()]}
+    if (method, path) == ("GET", "/stats"):
+        return dict(service["stats"], in_flight=len(service["in_flight"]), workers=service["workers"])
+    handlers = {"/solve": handle_solve, "/validate": handle_validate, "/what-if": handle_what_if}
+    if method == "POST" and path in handlers:
+        return await handlers[path](service, payload)
+    raise RequestError(f"مسار غير معروف: {method} {path}", status=404)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+async def _read_request(reader):
+    """تقرأ طلب HTTP/1.1 واحداً وتُرجع (الطريقة، المسار، الترويسات، الجسم) أو None عند إغلاق الاتصال."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split(" ", 2)
+    if len(parts) != 3:
+        raise RequestError("سطر طلب HTTP غير صالح")
+    method, path, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        content_length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError("ترويسة Content-Length غير صالحة") from None
+    body = await reader.readexactly(content_length)
+    return method, path, headers, body
+
+def _write_response(writer, status, response, keep_alive):
+    data = json.dumps(response, ensure_ascii=False).encode("utf-8")
+    writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                 f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                 .encode("latin-1") + data)
+
+async def _handle_connection(service, reader, writer):
+    """
+    تخدم اتصالاً واحداً (مع keep-alive) حتى يغلقه العميل. طلب لا يمكن تحليله (سطر الطلب أو Content-Length)
+    يُجاب بـ 400 ثم يُغلق الاتصال لأن حدود الطلب التالي لم تعد معروفة.
+    """
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except RequestError as error:
+                service["stats"]["requests"] += 1
+                service["stats"]["errors"] += 1
+                _write_response(writer, error.status, {"error": str(error)}, keep_alive=False)
+                await writer.drain()
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            service["stats"]["requests"] += 1
+            status = 200
+            try:
+                payload = json.loads(body) if body else {}
+                if not isinstance(payload, dict):
+                    raise RequestError("جسم الطلب يجب أن يكون كائن JSON")
+                response = await dispatch(service, method, path.split("?", 1)[0], payload)
+            except RequestError as error:
+                status, response = error.status, {"error": str(error)}
+            except (ValueError, TypeError) as error:
+                status, response = 400, {"error": str(error)}
+            except Exception as error:
+                status, response = 500, {"error": f"{type(error).__name__}: {error}"}
+            if status != 200:
+                service["stats"]["errors"] += 1
+            keep_alive = headers.get("connection", "").lower() != "close"
+            _write_response(writer, status, response, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def start_server(service, host="127.0.0.1", port=8456):
+    """تبدأ الخادم وتُرجع كائن asyncio.Server (port=0 يختار منفذاً حراً، راجع server.sockets)."""
+    return await asyncio.start_server(lambda reader, writer: _handle_connection(service, reader, writer), host, port)
+
+async def open_client(host, port):
+    """تفتح اتصال keep-alive بالخدمة وتُرجع (reader، writer) لاستخدامهما مع request_json."""
+    return await asyncio.open_connection(host, port)
+
+async def request_json(connection, method, path, payload=None):
+    """ترسل طلباً عبر اتصال مفتوح وتُرجع (رمز الحالة، جسم الاستجابة كقاموس)."""
+    reader, writer = connection
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("أغلقت الخدمة الاتصال")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def serve(host, port, problems, workers=None, default_time_limit=30.0):
+    """تحمّل المسائل المعطاة وتخدم الطلبات حتى الإيقاف."""
+    service = new_service(workers, default_time_limit)
+    for problem_data in problems:
+        print(f"  مسألة محمّلة: {load_problem(service, problem_data)['problem_id']}", flush=True)
+    server = await start_server(service, host, port)
+    bound_host, bound_port = server.sockets[0].getsockname()[:2]
+    print(f"listening on {bound_host}:{bound_port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        close_service(service)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="خدمة جدولة محلية (JSON عبر HTTP) تبقي المسائل مُجمّعة في الذاكرة.")
+    parser.add_argument("--problem", nargs="*", default=[], help="ملفات JSON لمسائل تُحمّل عند البدء")
+    parser.add_argument("--default-problem", action="store_true", help="تحميل get_problem_data_default عند البدء")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8456, help="المنفذ (0 = منفذ حر يُطبع عند البدء)")
+    parser.add_argument("--workers", type=int, default=None, help="عدد العمليات العاملة للبحث")
+    parser.add_argument("--time-limit", type=float, default=30.0, help="الحد الزمني الافتراضي لكل حل بالثواني")
+    args = parser.parse_args()
+
+    problems = []
+    for path in args.problem:
+        with open(path, encoding="utf-8") as problem_file:
+            problems.append(json.load(problem_file))
+    if args.default_problem:
+        problems.append(get_problem_data_default())
+    try:
+        asyncio.run(serve(args.host, args.port, problems, args.workers, args.time_limit))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,181 @@
+import argparse
+import json
+import sqlite3
+import time
+
+from project import (
+    BUDGET_LIMITED_MODES,
+    SOLVER_MODES,
+    build_possible_times_and_rooms,
+    compile_problem,
+    get_problem_data_default,
+    problem_fingerprint,
+    solve_iteratively,
+    validate_schedule,
+)
+
+# ذاكرة تخزين دائمة (SQLite) للحلول ونتائج عدم القابلية للحل، مفهرسة ببصمة المسألة القانونية
+# كل مدخل يُحفظ تحت (البصمة، نمط الحل ودقة شبكة الأوقات)، ويُعاد التحقق من الجداول المحفوظة عند تحميلها.
+# عند تجاوز الحجم تُحذف المدخلات الأقدم استخداماً (LRU).
+
+def open_solution_cache(path, max_entries=1000, max_bytes=None):
+    """
+    تفتح (أو تنشئ) ملف الذاكرة وتُرجع قاموساً يُمرَّر إلى بقية الدوال. max_entries و max_bytes
+    (مجموع أحجام الجداول المحفوظة) يحدّان الحجم. وضع WAL يجعل تحديث وقت الاستخدام عند كل قراءة رخيصاً
+    ويسمح بعدة عمليات تقرأ الملف نفسه.
+    """
+    connection = sqlite3.connect(path, timeout=30.0)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS solutions ("
+        " fingerprint TEXT NOT NULL, variant TEXT NOT NULL, status TEXT NOT NULL, schedule TEXT,"
+        " size INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (fingerprint, variant))")
+    connection.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+    connection.commit()
+    return {"connection": connection, "max_entries": max_entries, "max_bytes": max_bytes,
+            "hits": 0, "misses": 0, "rejected": 0, "evictions": 0}
+
+def close_solution_cache(cache):
+    """تغلق ملف الذاكرة."""
+    cache["connection"].close()
+
+def _encode_schedule(schedule):
+    """صيغة مضغوطة: {اسم الدورة: [وقت البداية، القاعة]} (وقت النهاية يُحسب من المدة عند التحميل)."""
+    return json.dumps({course_name: [details["start_time"], details["room"]] for course_name, details in schedule.items()},
+                      ensure_ascii=False, separators=(",", ":"))
+
+def _decode_schedule(payload, model):
+    schedule = {}
+    for course_name, (start_time, room) in json.loads(payload).items():
+        course_id = model["course_ids"].get(course_name)
+        if course_id is None:
+            return None
+        schedule[course_name] = {"start_time": start_time, "end_time": start_time + model["course_durations"][course_id],
+                                 "room": room}
+    return schedule
+
+def cache_get(cache, fingerprint, variant, model):
+    """
+    تُرجع {"status", "schedule"} للمدخل المحفوظ أو None. الجدول المحفوظ يُقبل فقط إذا غطّى كل الدورات
+    ولم تُرجع validate_schedule أي مخالفة، وإلا يُحذف المدخل ويُعامل كأنه غير موجود.
+    """
+    connection = cache["connection"]
+    row = connection.execute("SELECT status, schedule FROM solutions WHERE fingerprint = ? AND variant = ?",
+                             (fingerprint, variant)).fetchone()
+    if row is None:
+        cache["misses"] += 1
+        return None
+
+    status, payload = row
+    schedule = None
+    if status == "solved":
+        schedule = _decode_schedule(payload, model)
+        if schedule is None or set(schedule) != set(model["course_ids"]) or validate_schedule(schedule, model):
+            connection.execute("DELETE FROM solutions WHERE fingerprint = ? AND variant = ?", (fingerprint, variant))
+            connection.commit()
+            cache["rejected"] += 1
+            cache["misses"] += 1
+            return None
+
+    connection.execute("UPDATE solutions SET last_used = ? WHERE fingerprint = ? AND variant = ?",
+                       (time.time(), fingerprint, variant))
+    connection.commit()
+    cache["hits"] += 1
+    return {"status": status, "schedule": schedule}
+
+def cache_put(cache, fingerprint, variant, status, schedule=None):
+    """تحفظ نتيجة ("solved" مع جدول، أو "infeasible") ثم تحذف الأقدم استخداماً إن تجاوز الحجم الحد."""
+    connection = cache["connection"]
+    payload = _encode_schedule(schedule) if schedule is not None else None
+    connection.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)",
+                       (fingerprint, variant, status, payload, len(payload or ""), time.time()))
+
+    evicted = 0
+    count, total_size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM solutions").fetchone()
+    if cache["max_entries"] is not None and count > cache["max_entries"]:
+        evicted += connection.execute(
+            "DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY last_used LIMIT ?)",
+            (count - cache["max_entries"],)).rowcount
+        count, total_size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM solutions").fetchone()
+    if cache["max_bytes"] is not None:
+        for rowid, size in connection.execute("SELECT rowid, size FROM solutions ORDER BY last_used").fetchall():
+            if total_size <= cache["max_bytes"] or count <= 1:
+                break
+            connection.execute("DELETE FROM solutions WHERE rowid = ?", (rowid,))
+            total_size -= size
+            count -= 1
+            evicted += 1
+    connection.commit()
+    cache["evictions"] += evicted
+
+def solve_cached(problem_data, cache, solver_mode=None, time_increment=1.0):
+    """
+    تحل المسألة عبر الذاكرة: إن وُجدت نتيجة صالحة لنفس البصمة ونفس الإعدادات تُرجع فوراً، وإلا تُحل
+    بنمط الحل solver_mode من SOLVER_MODES (الافتراضي: الفحص الأمامي مع فرض الأسبقية في الاتجاهين)
+    وتُحفظ النتيجة (الحلول التي لا تجتاز validate_schedule، وفشل الأنماط المحدودة بميزانية، لا تُحفظ).
+    تُرجع قاموساً: schedule (أو None)، status ("solved" أو "infeasible" أو "invalid"، أو "unknown" إن لم يجد
+    نمط محدود بميزانية حلاً)، cache_hit، fingerprint، و elapsed_ms.
+    """
+    start = time.perf_counter()
+    fingerprint = problem_fingerprint(problem_data)
+    variant = f"{solver_mode or 'forward_checking_strict'}@{time_increment:g}"
+    model = compile_problem(problem_data)
+
+    cached = cache_get(cache, fingerprint, variant, model)
+    if cached is not None:
+        return {"schedule": cached["schedule"], "status": cached["status"], "cache_hit": True,
+                "fingerprint": fingerprint, "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    course_names = list(dict.fromkeys(model["course_names"]))
+    schedule = {course_name: {"start_time": None, "end_time": None, "room": None} for course_name in course_names}
+    possible_times_and_rooms = build_possible_times_and_rooms(model, time_increment)
+    if solver_mode is None:
+        result = solve_iteratively(model, possible_times_and_rooms, strict_precedence=True)
+        solution, proven_infeasible = result["schedule"], result["status"] == "infeasible"
+    else:
+        solution = SOLVER_MODES[solver_mode](schedule, model, course_names, possible_times_and_rooms)
+        proven_infeasible = solver_mode not in BUDGET_LIMITED_MODES
+    if solution is None:
+        # عدم القابلية للحل يُحفظ فقط إذا أثبته بحث كامل؛ نفاد ميزانية نمط محدود قد لا يتكرر في محاولة لاحقة
+        status = "infeasible" if proven_infeasible else "unknown"
+        if proven_infeasible:
+            cache_put(cache, fingerprint, variant, status)
+    elif validate_schedule(solution, model):
+        status = "invalid"
+    else:
+        status = "solved"
+        cache_put(cache, fingerprint, variant, status, solution)
+    return {"schedule": solution if status == "solved" else None, "status": status, "cache_hit": False,
+            "fingerprint": fingerprint, "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="حل مسألة عبر ذاكرة الحلول الدائمة.")
+    parser.add_argument("--problem", help="ملف JSON لبيانات المشكلة (الافتراضي: get_problem_data_default)")
+    parser.add_argument("--cache", default="solutions.sqlite", help="ملف ذاكرة الحلول")
+    parser.add_argument("--mode", default=None, choices=list(SOLVER_MODES),
+                        help="نمط الحل (الافتراضي: الفحص الأمامي مع فرض الأسبقية في الاتجاهين)")
+    parser.add_argument("--time-increment", type=float, default=1.0)
+    parser.add_argument("--max-entries", type=int, default=1000)
+    parser.add_argument("--max-bytes", type=int, default=None)
+    parser.add_argument("--output", help="ملف JSON لكتابة الجدول")
+    args = parser.parse_args()
+
+    if args.problem:
+        with open(args.problem, encoding="utf-8") as problem_file:
+            problem_data = json.load(problem_file)
+    else:
+        problem_data = get_problem_data_default()
+
+    cache = open_solution_cache(args.cache, args.max_entries, args.max_bytes)
+    try:
+        result = solve_cached(problem_data, cache, args.mode, args.time_increment)
+    finally:
+        close_solution_cache(cache)
+
+    source = "من الذاكرة" if result["cache_hit"] else "حل جديد"
+    print(f"{result['fingerprint'][:16]} | {result['status']} ({source}) | {result['elapsed_ms']:.3f} مللي ثانية")
+    if args.output and result["schedule"] is not None:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(result["schedule"], output_file, ensure_ascii=False, indent=2)
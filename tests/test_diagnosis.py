@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from problem_generator import generate_problem_data
+from project import (
+    _problem_with_constraints,
+    apply_problem_delta,
+    build_possible_times_and_rooms,
+    compile_problem,
+    diagnose_infeasibility,
+    solve_iteratively,
+)
+
+
+def _tight_problem(seed):
+    """مسألة صغيرة بقاعات وساعات عمل ضيقة وقيود زمنية وأسبقية عشوائية (كثيراً ما تكون بلا حل)."""
+    rng = random.Random(seed)
+    problem_data = generate_problem_data(rng.randint(5, 9), seed=seed)
+    names = [course["name"] for course in problem_data["courses"]]
+    problem_data["rooms"] = problem_data["rooms"][:rng.randint(1, 2)]
+    working_hours = problem_data["constraints"]["working_hours_constraints"]
+    working_hours["end"] = working_hours["start"] + rng.randint(4, 8)
+    absolute = [{"course_name": rng.choice(names), "type": rng.choice(["start_after", "end_before"]),
+                 "time_value": float(rng.randint(int(working_hours["start"]), int(working_hours["end"])))}
+                for _ in range(rng.randint(1, 6))]
+    precedence = [dict(zip(("y_course", "x_course"), rng.sample(names, 2))) for _ in range(rng.randint(0, 4))]
+    return apply_problem_delta(problem_data, {"add_constraints": {"absolute_time_constraints": absolute,
+                                                                  "precedence_constraints": precedence}})
+
+
+def _search_status(problem_data, items):
+    model = compile_problem(_problem_with_constraints(problem_data, items))
+    return solve_iteratively(model, build_possible_times_and_rooms(model), node_limit=200000)["status"]
+
+
+# بذور كانت تعطي مجموعات غير أصغرية (مرحلتا unary و propagation) أو تعارضاً في القيود الثابتة
+@pytest.mark.parametrize("seed", [200, 218, 228, 279, 291, 299])
+def test_conflict_is_minimal_under_full_search(seed):
+    problem_data = _tight_problem(seed)
+    diagnosis = diagnose_infeasibility(problem_data, node_limit=200000)
+    if diagnosis["status"] == "background":
+        assert _search_status(problem_data, []) == "infeasible"
+        return
+    assert diagnosis["status"] == "conflict"
+    conflict = diagnosis["items"]
+    assert _search_status(problem_data, conflict) == "infeasible"
+    for item in conflict:
+        assert _search_status(problem_data, [other for other in conflict if other != item]) != "infeasible"
+
+
+def test_background_conflict_is_reported_separately():
+    problem_data = generate_problem_data(6, seed=1, precedence_density=0.0, absolute_density=0.0,
+                                         unavailability_density=0.0)
+    # ست دورات لمحاضر واحد في خمس ساعات عمل: التعارض في القيود الثابتة وحدها
+    for course in problem_data["courses"]:
+        course["instructor"] = "محاضر 1"
+    problem_data["constraints"]["instructor_availability_constraints"] = []
+    problem_data["constraints"]["working_hours_constraints"] = {"start": 9.0, "end": 14.0}
+    for room in problem_data["rooms"]:
+        room["available_times"] = [(9.0, 14.0)]
+    diagnosis = diagnose_infeasibility(problem_data)
+    assert diagnosis["status"] == "background"
+    assert diagnosis["items"] == []
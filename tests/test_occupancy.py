@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from problem_generator import generate_problem_data
+from project import (
+    build_occupancy,
+    check_no_overlap_constraints,
+    compile_problem,
+    explain_constraint_violation,
+    get_problem_data_default,
+)
+
+
+def _nested_room_schedule():
+    """ثلاث دورات في قاعة واحدة: A 9-13 تحتوي B 9.5-10 و C 12-13 (بمحاضرين مختلفين)."""
+    problem_data = get_problem_data_default()
+    for course, duration in zip(problem_data["courses"][:3], (4.0, 0.5, 1.0)):
+        course["duration"] = duration
+    problem_data["courses"][1]["instructor"] = "د. سامي"
+    problem_data["constraints"]["precedence_constraints"] = []
+    model = compile_problem(problem_data)
+    names = [course["name"] for course in problem_data["courses"][:3]]
+    schedule = {name: {"start_time": start, "end_time": start + duration, "room": "معمل الحاسوب"}
+                for name, start, duration in zip(names, (9.0, 9.5, 12.0), (4.0, 0.5, 1.0))}
+    return model, schedule, names
+
+
+def test_nested_intervals_are_detected_through_occupancy():
+    model, schedule, names = _nested_room_schedule()
+    occupancy = build_occupancy(schedule, model)
+    for name in names:
+        assert not check_no_overlap_constraints(schedule, name, model)
+        assert not check_no_overlap_constraints(schedule, name, model, occupancy=occupancy)
+
+
+def test_explain_reports_nested_room_clash():
+    model, schedule, names = _nested_room_schedule()
+    assert explain_constraint_violation(schedule, names[2], model) == ("overlap", [names[0]])
+    assert sorted(explain_constraint_violation(schedule, names[0], model)[1]) == sorted(names[1:])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_occupancy_matches_pairwise_check_on_arbitrary_schedules(seed):
+    rng = random.Random(seed)
+    problem_data = generate_problem_data(12, num_rooms=2, num_instructors=3, seed=seed,
+                                         durations=(0.5, 1.0, 2.0, 4.0))
+    model = compile_problem(problem_data)
+    rooms = [room["name"] for room in problem_data["rooms"]]
+    schedule = {}
+    for course in problem_data["courses"]:
+        start = 9.0 + 0.5 * rng.randrange(8)
+        schedule[course["name"]] = {"start_time": start, "end_time": start + course["duration"],
+                                    "room": rng.choice(rooms)}
+    occupancy = build_occupancy(schedule, model)
+    for name in schedule:
+        assert check_no_overlap_constraints(schedule, name, model, occupancy=occupancy) == \
+            check_no_overlap_constraints(schedule, name, model)
@@ -0,0 +1,46 @@
+import time
+
+from problem_generator import generate_problem_data
+from project import apply_problem_delta, compile_problem, repair_schedule, solve_iteratively, validate_schedule
+
+
+def _problem_and_delta():
+    """مسألة 30 دورة وتعديل (عدم توفر محاضر 9-13) لا يُصلح بتغيير محلي ويستنفد البحث الكامل."""
+    problem_data = generate_problem_data(30, seed=13)
+    schedule = solve_iteratively(compile_problem(problem_data))["schedule"]
+    delta = {"add_constraints": {"instructor_availability_constraints": [
+        {"instructor_name": "محاضر 1", "unavailable_times": [(9.0, 13.0)]}]}}
+    return problem_data, schedule, delta
+
+
+def test_repair_stops_at_node_limit():
+    problem_data, schedule, delta = _problem_and_delta()
+    result = repair_schedule(schedule, problem_data, delta, node_limit=2000)
+    assert result["status"] == "budget_exhausted"
+    assert result["schedule"] is None
+    assert result["nodes"] <= 2001
+
+
+def test_repair_stops_at_time_limit():
+    problem_data, schedule, delta = _problem_and_delta()
+    start = time.perf_counter()
+    result = repair_schedule(schedule, problem_data, delta, time_limit=0.5)
+    assert result["status"] == "budget_exhausted"
+    assert time.perf_counter() - start < 5.0
+
+
+def test_repair_within_budget_is_unchanged():
+    problem_data, schedule, _ = _problem_and_delta()
+    delta = {"add_constraints": {"instructor_availability_constraints": [
+        {"instructor_name": "محاضر 4", "unavailable_times": [(9.0, 13.0)]}]}}
+    result = repair_schedule(schedule, problem_data, delta, node_limit=2000, time_limit=10.0)
+    assert result["status"] == "repaired"
+    assert result["schedule"] is not None
+
+
+def test_repair_reports_violations_before_repair():
+    problem_data, schedule, delta = _problem_and_delta()
+    result = repair_schedule(schedule, problem_data, delta, node_limit=2000)
+    expected = validate_schedule(schedule, compile_problem(apply_problem_delta(problem_data, delta)))
+    assert result["violations_before"] == expected
+    assert any(violation["constraint"] == "instructor_availability" for violation in expected)
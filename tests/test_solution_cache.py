@@ -0,0 +1,44 @@
+import pytest
+
+from project import apply_problem_delta, get_problem_data_default
+from solution_cache import close_solution_cache, open_solution_cache, solve_cached
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = open_solution_cache(str(tmp_path / "solutions.sqlite"))
+    yield cache
+    close_solution_cache(cache)
+
+
+def _infeasible_problem():
+    """نافذة زمنية فارغة لدورة واحدة (تبدأ بعد 14 وتنتهي قبل 13)."""
+    course_name = get_problem_data_default()["courses"][0]["name"]
+    return apply_problem_delta(get_problem_data_default(), {"add_constraints": {"absolute_time_constraints": [
+        {"course_name": course_name, "type": "start_after", "time_value": 14.0},
+        {"course_name": course_name, "type": "end_before", "time_value": 13.0}]}})
+
+
+def test_budget_limited_failure_is_not_cached(cache):
+    problem_data = _infeasible_problem()
+    first = solve_cached(problem_data, cache, "branch_and_bound")
+    second = solve_cached(problem_data, cache, "branch_and_bound")
+    assert first["status"] == second["status"] == "unknown"
+    assert not second["cache_hit"]
+
+
+@pytest.mark.parametrize("solver_mode", [None, "forward_checking"])
+def test_proven_infeasibility_is_cached(cache, solver_mode):
+    problem_data = _infeasible_problem()
+    assert solve_cached(problem_data, cache, solver_mode)["status"] == "infeasible"
+    cached = solve_cached(problem_data, cache, solver_mode)
+    assert cached["status"] == "infeasible"
+    assert cached["cache_hit"]
+
+
+def test_solution_is_cached(cache):
+    problem_data = get_problem_data_default()
+    assert solve_cached(problem_data, cache)["status"] == "solved"
+    cached = solve_cached(problem_data, cache)
+    assert cached["cache_hit"]
+    assert cached["schedule"] is not None